@@ -0,0 +1,19 @@
+"""PyWO benchmarks.
+
+Benchmarks are run in the environment emulated by :mod:`tests.Xlib_mock`
+(like tests they need X server, for example Xvfb, to create Display).
+
+Run from the top directory::
+
+    python -m benchmarks.run --windows=10,100,2000 --latency=0,1 \\
+                             --output=results.json
+
+Results are written as JSON, and can be compared against stored baseline::
+
+    python -m benchmarks.run --baseline=baseline.json
+
+Exit status is 1 if any benchmark is slower than baseline by more than
+``--threshold``, or needs more round trips than before.
+
+"""
+
@@ -0,0 +1,170 @@
+"""Mocked X environment used by benchmarks.
+
+:class:`LatencyInjector` wraps methods of :mod:`tests.Xlib_mock` objects,
+counting requests and sleeping on every request that waits for reply from
+X Server (to simulate remote or slow connections).
+
+"""
+
+import random
+import threading
+import time
+
+from tests import Xlib_mock
+
+from pywo.core import dispatch, xlib
+from pywo import core
+
+
+DESKTOP_WIDTH = 1600
+DESKTOP_HEIGHT = 1200
+DESKTOPS = 2
+# Column on the right of the desktop not covered by windows, so
+# fill always finds free space for the spare window
+FREE_WIDTH = DESKTOP_WIDTH / 8
+
+# Window manager names recognized by WindowManager.update_type,
+# chosen to cover core.Hacks used by the mocked environment
+PERSONALITIES = {
+    'metacity': 'Metacity', # no hacks
+    'compiz': 'compiz', # DONT_TRANSLATE_COORDS, ADJUST_GEOMETRY
+    'kwin': 'KWin', # ADJUST_GEOMETRY
+    'gnome_shell': 'GNOME Shell', # ADJUST_TRANSLATE_COORDS, ADJUST_GEOMETRY
+    'openbox': 'Openbox', # no hacks, different ManagerType
+}
+# NOTE: PARENT_XY (Fluxbox, Window Maker) needs reparenting frame windows
+#       which are not emulated by Xlib_mock
+
+# Requests that wait for reply: {class: [method name, ]}
+ROUND_TRIPS = {
+    Xlib_mock.AbstractWindow: ['get_full_property'],
+    Xlib_mock.RootWindow: ['get_full_property', 'get_geometry'],
+    Xlib_mock.Window: ['get_wm_transient_for', 'get_wm_client_machine',
+                       'get_wm_class', 'get_wm_state', 'get_geometry',
+                       'translate_coords', 'query_tree',
+                       'get_wm_normal_hints', 'get_attributes'],
+    Xlib_mock.Display: ['sync'],
+}
+# Requests that don't wait for reply: {class: [method name, ]}
+ONE_WAY = {
+    Xlib_mock.Window: ['configure', 'map', 'unmap', 'change_attributes'],
+    Xlib_mock.RootWindow: ['change_attributes'],
+    Xlib_mock.Display: ['send_event'],
+}
+
+
+class LatencyInjector(object):
+
+    """Count requests sent to mocked X Server, inject latency."""
+
+    def __init__(self, latency=0):
+        self.latency = latency # seconds per round trip
+        self.round_trips = 0
+        self.requests = 0
+        self.__originals = []
+        self.__depth = threading.local()
+
+    def install(self):
+        """Wrap methods of the mock objects."""
+        for methods, round_trip in [(ROUND_TRIPS, True), (ONE_WAY, False)]:
+            for cls, names in methods.items():
+                for name in names:
+                    original = cls.__dict__.get(name)
+                    if original is None:
+                        continue
+                    self.__originals.append((cls, name, original))
+                    setattr(cls, name, self.__wrap(original, round_trip))
+
+    def uninstall(self):
+        """Restore original methods."""
+        for cls, name, original in reversed(self.__originals):
+            setattr(cls, name, original)
+        self.__originals = []
+
+    def reset(self):
+        """Reset counters."""
+        self.round_trips = 0
+        self.requests = 0
+
+    def __wrap(self, function, round_trip):
+        """Return function counting calls."""
+        def wrapper(*args, **kwargs):
+            depth = getattr(self.__depth, 'value', 0)
+            if not depth:
+                # NOTE: count only outermost call (one request)
+                self.requests += 1
+                if round_trip:
+                    self.round_trips += 1
+                    if self.latency:
+                        time.sleep(self.latency)
+            self.__depth.value = depth + 1
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.__depth.value = depth
+        wrapper.__name__ = function.__name__
+        return wrapper
+
+
+class Environment(object):
+
+    """Mocked display with given number of windows."""
+
+    def __init__(self, windows, personality='metacity', seed=0):
+        self.display = Xlib_mock.Display(screen_width=DESKTOP_WIDTH,
+                                         screen_height=DESKTOP_HEIGHT,
+                                         desktops=DESKTOPS,
+                                         extensions=['XINERAMA'])
+        xlib.ClientMessage = Xlib_mock.ClientMessage
+        xlib.XObject._XObject__DISPLAY = self.display
+        # NOTE: dispatcher is bound to display, and its thread can't be
+        #       started again after it stopped
+        xlib.XObject._XObject__EVENT_DISPATCHER = \
+                dispatch.EventDispatcher(self.display)
+        self.set_personality(personality)
+        self.WM = core.WindowManager()
+        self.WM.update_type()
+        self.random = random.Random(seed)
+        self.windows = [self.map_window(number)
+                        for number in range(windows)]
+        self.spare = self.map_window(windows, spare=True)
+
+    def set_personality(self, personality):
+        """Set name of the emulated window manager."""
+        root = self.display.root
+        supporting_id = root._prop('_NET_SUPPORTING_WM_CHECK')[0]
+        supporting = self.display.create_resource_object('window',
+                                                         supporting_id)
+        supporting._prop('_NET_WM_NAME', PERSONALITIES[personality])
+
+    def map_window(self, number, spare=False):
+        """Create and map new window.
+
+        Spare window is placed in the free column on the current desktop.
+
+        """
+        extents = Xlib_mock.EXTENTS_NORMAL
+        width = self.random.randint(100, DESKTOP_WIDTH / 2)
+        height = self.random.randint(100, DESKTOP_HEIGHT / 2)
+        x = self.random.randint(0, DESKTOP_WIDTH - FREE_WIDTH - width)
+        y = self.random.randint(0, DESKTOP_HEIGHT - height)
+        if spare:
+            width = FREE_WIDTH / 2
+            x = DESKTOP_WIDTH - FREE_WIDTH
+        geometry = Xlib_mock.Geometry(
+            x + extents.left, y + extents.top,
+            width - (extents.left + extents.right),
+            height - (extents.top + extents.bottom))
+        hints = [Xlib_mock.HINTS_NORMAL,
+                 Xlib_mock.HINTS_TERMINAL][number % 5 == 0]
+        window = Xlib_mock.Window(display=self.display,
+                                  name='Window %s' % number,
+                                  class_name=['app%s' % (number % 10),
+                                              'App%s' % (number % 10)],
+                                  geometry=geometry,
+                                  normal_hints=hints)
+        window.map()
+        win = core.Window(window.id)
+        win.set_desktop([number % DESKTOPS, 0][spare])
+        return win
+
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+
+"""Run PyWO benchmarks, and compare results against baseline.
+
+See :mod:`benchmarks` for usage.
+
+"""
+
+import logging
+import optparse
+import os
+import platform
+import shutil
+import StringIO
+import sys
+import tempfile
+import time
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from benchmarks.environment import Environment, LatencyInjector
+from benchmarks.environment import PERSONALITIES
+
+from pywo import actions, main
+from pywo.config import Config
+
+
+RESULTS_VERSION = 1
+
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'etc', 'pyworc')
+
+
+class CaseError(Exception):
+
+    """Raised when benchmarked operation failed."""
+
+
+class ErrorsHandler(logging.Handler):
+
+    """Collect logged errors (exceptions in actions are only logged)."""
+
+    def __init__(self):
+        logging.Handler.__init__(self, logging.ERROR)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class Case(object):
+
+    """Benchmarked operation."""
+
+    def __init__(self, name, function, needs_windows=True):
+        self.name = name
+        self.function = function
+        self.needs_windows = needs_windows
+
+    def __call__(self, env, config, iteration):
+        self.function(env, config, iteration)
+
+
+def target(env, iteration):
+    """Return window used in given iteration."""
+    return env.windows[iteration % len(env.windows)]
+
+
+def expand(env, config, iteration):
+    actions.perform_action(config, 'expand', direction='E',
+                           win_id=target(env, iteration).id)
+
+def shrink(env, config, iteration):
+    actions.perform_action(config, 'shrink', direction='W',
+                           win_id=target(env, iteration).id)
+
+def move(env, config, iteration):
+    direction = ['E', 'S', 'W', 'N'][iteration % 4]
+    actions.perform_action(config, 'float', direction=direction,
+                           win_id=target(env, iteration).id)
+
+def fill(env, config, iteration):
+    # NOTE: other windows might cover whole desktop, use the spare window
+    actions.perform_action(config, 'fill', win_id=env.spare.id)
+
+def put(env, config, iteration):
+    position = ['NW', 'NE', 'SE', 'SW', 'MIDDLE'][iteration % 5]
+    actions.perform_action(config, 'put', position=position,
+                           win_id=target(env, iteration).id)
+
+def grid_width(env, config, iteration):
+    section = ['top-left', 'top', 'top-right'][iteration % 3]
+    actions.perform_action(config, 'grid_width', section=section,
+                           win_id=target(env, iteration).id)
+
+def switch(env, config, iteration):
+    # NOTE: switch with the active window (top of the stack)
+    win = target(env, iteration)
+    if win == env.WM.active_window():
+        win = target(env, iteration + 1)
+    actions.perform_action(config, 'switch', win_id=win.id)
+
+def match(env, config, iteration):
+    name = u'Window %s' % (len(env.windows) - iteration - 1)
+    env.WM.windows(match=name)
+
+def list_windows(env, config, iteration):
+    stdout = sys.stdout
+    sys.stdout = StringIO.StringIO()
+    try:
+        main.list_windows(['id', 'desktop', 'state', 'name', 'class'],
+                          'tsv')
+    finally:
+        sys.stdout = stdout
+
+def config_load(env, config, iteration):
+    Config(CONFIG_FILE)
+
+def config_parse(env, config, iteration):
+    shutil.rmtree(os.environ['XDG_CACHE_HOME'], ignore_errors=True)
+    Config(CONFIG_FILE)
+
+
+CASES = [Case('expand', expand),
+         Case('shrink', shrink),
+         Case('float', move),
+         Case('put', put),
+         Case('fill', fill),
+         Case('grid_width', grid_width),
+         Case('switch', switch),
+         Case('match', match),
+         Case('list', list_windows),
+         Case('config_load', config_load, False),
+         Case('config_parse', config_parse, False), ]
+
+
+def run_case(case, env, config, injector, repeat):
+    """Run benchmark, return dict with results.
+
+    Raise :class:`CaseError` if operation raised, or logged an error,
+    instead of measuring the error path.
+
+    """
+    handler = ErrorsHandler()
+    logging.getLogger().addHandler(handler)
+    try:
+        try:
+            # NOTE: warm up caches
+            case(env, config, 0)
+            times = []
+            injector.reset()
+            for iteration in range(repeat):
+                start = time.time()
+                case(env, config, iteration)
+                times.append((time.time() - start) * 1000)
+                if handler.records:
+                    break
+        except Exception, exc:
+            raise CaseError('%s failed: %s' % (case.name, exc))
+    finally:
+        logging.getLogger().removeHandler(handler)
+    if handler.records:
+        raise CaseError('%s failed: %s' %
+                        (case.name, handler.records[0].getMessage()))
+    times.sort()
+    return {'time_min': times[0],
+            'time_median': times[len(times) / 2],
+            'time_mean': sum(times) / len(times),
+            'round_trips': injector.round_trips / float(repeat),
+            'requests': injector.requests / float(repeat), }
+
+
+def run(cases, windows, personalities, latencies, repeat):
+    """Run all benchmarks, return list of results."""
+    results = []
+    config = Config(CONFIG_FILE)
+    actions.manager.load()
+    for name in personalities:
+        for count in windows:
+            # NOTE: forget data related to windows of previous environment
+            #       (before its windows are gone)
+            for action in actions.manager.get_all():
+                action.reset()
+            env = Environment(count, name)
+            for latency in latencies:
+                injector = LatencyInjector(latency / 1000.0)
+                injector.install()
+                try:
+                    for case in cases:
+                        if not case.needs_windows and \
+                           (count != windows[0] or name != personalities[0]):
+                            continue
+                        result = run_case(case, env, config,
+                                          injector, repeat)
+                        result.update({'case': case.name,
+                                       'windows': count,
+                                       'wm': name,
+                                       'latency': latency, })
+                        results.append(result)
+                        print_result(result)
+                finally:
+                    injector.uninstall()
+    return results
+
+
+def result_key(result):
+    """Return key identifying benchmark."""
+    return (result['case'], result['windows'],
+            result['wm'], result['latency'])
+
+
+def print_result(result, baseline=None):
+    """Print result (compared to baseline)."""
+    line = '%(case)-14s windows=%(windows)-5s wm=%(wm)-12s ' \
+           'latency=%(latency)-4s %(time_median)9.3fms ' \
+           'round_trips=%(round_trips)-8.1f' % result
+    if baseline:
+        line += ' (%+.1f%%, %+.1f)' % \
+                ((result['time_median'] / baseline['time_median'] - 1) * 100,
+                 result['round_trips'] - baseline['round_trips'])
+    print line
+
+
+def compare(results, baseline, threshold):
+    """Print comparison with baseline, return list of regressions."""
+    baseline = dict([(result_key(result), result)
+                     for result in baseline['results']])
+    regressions = []
+    for result in results:
+        old = baseline.get(result_key(result))
+        if not old:
+            continue
+        print_result(result, old)
+        if result['round_trips'] > old['round_trips'] or \
+           result['time_median'] > old['time_median'] * threshold:
+            regressions.append(result)
+    return regressions
+
+
+def parse_list(value, convert=str):
+    """Parse comma separated list of values."""
+    return [convert(item.strip()) for item in value.split(',')
+                                  if item.strip()]
+
+
+def parse_args(args):
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option('--windows', default='10,100,2000',
+                      help='comma separated window counts '
+                           '[default: %default]')
+    parser.add_option('--latency', default='0',
+                      help='comma separated latencies of round trip '
+                           'in milliseconds [default: %default]')
+    parser.add_option('--wm', default='metacity',
+                      help='comma separated window manager personalities: '
+                           '%s [default: %%default]' %
+                           ', '.join(sorted(PERSONALITIES)))
+    parser.add_option('--cases', default='',
+                      help='comma separated benchmarks to run: %s '
+                           '[default: all]' %
+                           ', '.join([case.name for case in CASES]))
+    parser.add_option('--repeat', type='int', default=20,
+                      help='iterations of every benchmark '
+                           '[default: %default]')
+    parser.add_option('--output', metavar='FILE',
+                      help='write results to FILE')
+    parser.add_option('--baseline', metavar='FILE',
+                      help='compare results with baseline FILE')
+    parser.add_option('--threshold', type='float', default=1.2,
+                      help='allowed ratio of time to baseline time '
+                           '[default: %default]')
+    (options, args) = parser.parse_args(args)
+    options.windows = parse_list(options.windows, int)
+    options.latency = parse_list(options.latency, float)
+    options.wm = parse_list(options.wm)
+    invalid = [name for name in options.wm if not name in PERSONALITIES]
+    if invalid:
+        parser.error('invalid wm: %s' % ', '.join(invalid))
+    names = parse_list(options.cases)
+    options.cases = [case for case in CASES
+                          if not names or case.name in names]
+    if min(options.windows) < 1 or options.repeat < 1:
+        parser.error('windows, and repeat must be greater than 0')
+    return options
+
+
+def main_run(args=None):
+    options = parse_args(args or sys.argv[1:])
+    # NOTE: don't use, and don't change user's cache
+    cache_home = tempfile.mkdtemp(prefix='pywo-benchmarks-')
+    os.environ['XDG_CACHE_HOME'] = cache_home
+    try:
+        results = run(options.cases, options.windows, options.wm,
+                      options.latency, options.repeat)
+    finally:
+        shutil.rmtree(cache_home, ignore_errors=True)
+    data = {'version': RESULTS_VERSION,
+            'python': platform.python_version(),
+            'repeat': options.repeat,
+            'results': results, }
+    if options.output:
+        output = open(options.output, 'w')
+        try:
+            json.dump(data, output, indent=1, sort_keys=True)
+        finally:
+            output.close()
+    if options.baseline:
+        baseline = json.load(open(options.baseline))
+        if baseline.get('version') != RESULTS_VERSION:
+            print 'Incompatible baseline version'
+            return 2
+        print
+        print 'Compared to %s:' % options.baseline
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print '%s regressions found' % len(regressions)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_run())
+
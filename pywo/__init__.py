@@ -21,6 +21,9 @@
 """Python Window Organizer main package."""
 
 import logging
+import logging.handlers
+import Queue
+import threading
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok, Antti Kaihola, Aron Griffis"
@@ -42,6 +45,114 @@ class NullHandler(logging.Handler):
         pass
 
 
+if hasattr(logging.handlers, 'QueueHandler'):
+    QueueHandler = logging.handlers.QueueHandler
+    QueueListener = logging.handlers.QueueListener
+else:
+    class QueueHandler(logging.Handler):
+
+        """`logging.Handler` putting records into the queue.
+        
+        Backport of `logging.handlers.QueueHandler` (Python 3.2).
+        
+        """
+
+        def __init__(self, queue):
+            logging.Handler.__init__(self)
+            self.queue = queue
+
+        def prepare(self, record):
+            """Merge message and arguments, so record can be pickled."""
+            # NOTE: arguments must be formatted now, in caller's thread 
+            #       they might change (or need X Server) later
+            if record.exc_info:
+                formatter = self.formatter or logging.Formatter()
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.msg = record.getMessage()
+            record.args = None
+            record.exc_info = None
+            return record
+
+        def emit(self, record):
+            try:
+                self.queue.put_nowait(self.prepare(record))
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                self.handleError(record)
+
+
+    class QueueListener(object):
+
+        """Pass records from the queue to handlers in background thread.
+        
+        Backport of `logging.handlers.QueueListener` (Python 3.2).
+        
+        """
+
+        __SENTINEL = None
+
+        def __init__(self, queue, *handlers, **kwargs):
+            self.queue = queue
+            self.handlers = handlers
+            self.respect_handler_level = \
+                    kwargs.get('respect_handler_level', False)
+            self.__thread = None
+
+        def start(self):
+            """Start background thread."""
+            self.__thread = threading.Thread(name='QueueListener',
+                                             target=self.__monitor)
+            self.__thread.setDaemon(True)
+            self.__thread.start()
+
+        def stop(self):
+            """Handle all queued records, and stop background thread."""
+            if not self.__thread:
+                return
+            self.queue.put_nowait(self.__SENTINEL)
+            self.__thread.join()
+            self.__thread = None
+
+        def handle(self, record):
+            """Pass record to handlers."""
+            for handler in self.handlers:
+                if not self.respect_handler_level or \
+                   record.levelno >= handler.level:
+                    handler.handle(record)
+
+        def __monitor(self):
+            """Main loop of background thread."""
+            while True:
+                record = self.queue.get()
+                if record is self.__SENTINEL:
+                    break
+                self.handle(record)
+
+
+__FORCED_LEVEL = False
+
+
+def set_log_level(level, force=False):
+    """Set level of pywo.* loggers hierarchy.
+    
+    `level` is level name (case insensitive), or number. Records below
+    this level are dropped before message is formatted. 
+    If `force` is true level can't be changed later (eg. --debug).
+    
+    """
+    global __FORCED_LEVEL
+    if __FORCED_LEVEL and not force:
+        return
+    if not isinstance(level, int):
+        name = str(level).upper()
+        level = logging.getLevelName(name)
+        if not isinstance(level, int):
+            raise ValueError('Invalid log level: %s' % name)
+    __FORCED_LEVEL = force
+    logging.getLogger('pywo').setLevel(level)
+
+
 # set NullHandler for whole pywo.* loggers hierarchy
 logging.getLogger('pywo').addHandler(NullHandler())
 
@@ -22,7 +22,7 @@
 
 Actions change windows or window manager state.
 
-PyWO uses pkg_resources for actions plugins discovery. 
+PyWO uses entry points (see pywo.plugins) for actions plugins discovery.
 When writing your own actions please use 'pywo.actions' entry point group, 
 and use module name as an value for entry point. 
 Check /examples/plugins/actions for an example of third-party actions plugin.
@@ -34,6 +34,9 @@ import logging
 from pywo.actions.core import TYPE_FILTER, STATE_FILTER, TYPE_STATE_FILTER
 from pywo.actions.core import ActionException, Action
 from pywo.actions.core import register, perform, get_current_workarea
+from pywo.actions.core import perform_action
+from pywo.actions.core import start_batch, finish_batch
+from pywo.actions.core import start_output, finish_output, output
 from pywo.actions import manager
 
 
@@ -21,10 +21,13 @@
 """Core PyWO actions classes and functions."""
 
 import logging
+import threading
+import time
 
 from pywo.core import Window, WindowManager, State, Mode
-from pywo.core import filters
+from pywo.core import accounting, filters, timing
 from pywo.actions import manager
+from pywo.actions import parser
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -38,6 +41,8 @@ TYPE_FILTER = filters.STANDARD_TYPE
 STATE_FILTER = filters.ExcludeState(State.MAXIMIZED, State.FULLSCREEN)
 TYPE_STATE_FILTER = filters.AND(TYPE_FILTER, STATE_FILTER)
 
+THREAD_DATA = threading.local()
+
 
 class ActionException(Exception):
 
@@ -97,6 +102,11 @@ class Action(object):
                              if arg not in self.obligatory_args]
         return optional_args
 
+    @property
+    def need_session(self):
+        """Return ``True`` if `Action` needs name of the session."""
+        return 'session' in self.args
+
     @property
     def need_section(self):
         """Return ``True`` if `Action` needs section related data."""
@@ -104,6 +114,24 @@ class Action(object):
                'position' in self.args or \
                'gravity' in self.args
 
+    def prepare(self, config):
+        """Prepare `Action` for use with given config.
+
+        Called when configuration is (re)loaded, so all data depending only 
+        on the config can be computed in advance. By default does nothing.
+
+        """
+        pass
+
+    def reset(self):
+        """Forget all data depending on the window manager.
+
+        Called when window manager is changed (replaced or restarted).
+        By default does nothing.
+
+        """
+        pass
+
     def get_kwargs(self, config, section=None, options=None):
         """Get from given objects values needed for `Action` to be performed."""
         kwargs = {}
@@ -117,17 +145,46 @@ class Action(object):
 
     def __call__(self, win, **kwargs):
         """Perform action on window and with given arguments."""
-        log.info('%s: win=%s, kwargs={%s}' % 
-                 (self.name, win,
-                 ', '.join(["'%s':%s" % (key, value) 
-                            for key, value in kwargs.items()])))
-        self.check_filter(win)
-        self.pre_perform(win, **kwargs)
+        if log.isEnabledFor(logging.INFO):
+            log.info('%s: win=%s, kwargs={%s}', 
+                     self.name, win,
+                     ', '.join(["'%s':%s" % (key, value) 
+                                for key, value in kwargs.items()]))
+        scope = 'action:%s' % self.name
+        accounting.begin(scope)
+        start = time.time()
+        try:
+            try:
+                self.__timed(scope, 'check_filter', self.check_filter, win)
+                self.__timed(scope, 'pre_perform', self.pre_perform, 
+                             win, **kwargs)
+                try:
+                    self.__timed(scope, 'perform', self.perform, 
+                                 win, **kwargs)
+                except Exception, e:
+                    timing.failure(scope, isinstance(e, ActionException))
+                    log.exception('Exception %s while performing %s' % 
+                                  (e, self))
+                self.__timed(scope, 'post_perform', self.post_perform, 
+                             win, **kwargs)
+            except ActionException:
+                timing.failure(scope, exception=True)
+                raise
+            except Exception:
+                timing.failure(scope)
+                raise
+        finally:
+            timing.record(scope, 'total', time.time() - start)
+            log.debug('%s', accounting.end())
+
+    @staticmethod
+    def __timed(scope, phase, function, *args, **kwargs):
+        """Call function, and record its duration as phase of the scope."""
+        start = time.time()
         try:
-            self.perform(win, **kwargs)
-        except Exception, e:
-            log.exception('Exception %s while performing %s' % (e, self))
-        self.post_perform(win, **kwargs)
+            return function(*args, **kwargs)
+        finally:
+            timing.record(scope, phase, time.time() - start)
 
     def check_filter(self, win):
         """Check if window matches filter."""
@@ -144,7 +201,12 @@ class Action(object):
 
     def post_perform(self, win, *args, **kwargs):
         """Called after performing an action."""
-        win.sync()
+        batch = getattr(THREAD_DATA, 'batch', None)
+        if batch is None:
+            win.sync()
+        else:
+            # NOTE: sync once when batch is finished
+            batch.append(win)
         # TODO: call post_action_hooks
 
     def register(self):
@@ -164,6 +226,8 @@ class SimpleActionWrapper(Action):
         self.args = action.func_code.co_varnames[1:action.func_code.co_argcount]
         self.obligatory_args = self.args[:-len(action.func_defaults or [])]
         self.__doc__ = action.__doc__
+        # NOTE: module of the function, not of the wrapper (see manager)
+        self.__module__ = action.__module__
         self.__action = action
 
     def perform(self, win, **kwargs):
@@ -195,6 +259,50 @@ def register(name, filter=filters.ALL_FILTER, unshade=False):
     return register_action
 
 
+def start_batch():
+    """Start batch of actions performed in current thread.
+    
+    Actions performed in batch don't wait for X server to process requests,
+    :func:`finish_batch` must be called after the last action.
+    
+    """
+    THREAD_DATA.batch = []
+
+
+def finish_batch():
+    """Finish batch of actions, and sync with X server once."""
+    windows = getattr(THREAD_DATA, 'batch', None)
+    THREAD_DATA.batch = None
+    if windows:
+        windows[-1].sync()
+
+
+def start_output():
+    """Collect output of actions performed in current thread.
+
+    Output is returned by :func:`finish_output` instead of being logged
+    (for example to send it to the client).
+
+    """
+    THREAD_DATA.output = []
+
+
+def finish_output():
+    """Stop collecting output of actions, and return it."""
+    lines = getattr(THREAD_DATA, 'output', None) or []
+    THREAD_DATA.output = None
+    return '\n'.join(lines)
+
+
+def output(text):
+    """Print text (log it if output is not collected)."""
+    lines = getattr(THREAD_DATA, 'output', None)
+    if lines is None:
+        log.info(text)
+    else:
+        lines.append(text)
+
+
 def get_current_workarea(window, xinerama):
     """Return :class:`~pywo.core.basic.Geometry` 
     of the :ref:`workarea` or nearest :ref:`screen`."""
@@ -215,9 +323,26 @@ def _debug_info(win):
     win.sync()
     log.info('Old geometry=%s' % old_geometry)
     log.info('New geometry=%s' % win.geometry)
+    log.info('-= X requests =-')
+    accounting.log_stats(log)
     log.info('-= End of debug output =-')
 
 
+@register(name='stats')
+def _stats(win):
+    """Print latency statistics of actions, and event handlers.
+    
+    Statistics of the daemon are also written in Prometheus text format to
+    ``$XDG_RUNTIME_DIR/pywo.prom``.
+    
+    """
+    output('-= Latency =-')
+    for histogram in timing.stats():
+        output('%s' % histogram)
+    if timing.DUMP:
+        output('Written to %s' % timing.dump())
+
+
 def perform(options, args, config, win_id=0):
     """Perform action based on options and args returned by parser."""
     if not options.action and not args:
@@ -236,6 +361,9 @@ def perform(options, args, config, win_id=0):
         section = config.section(args.pop(0))
     else:
         section = None
+    if action.need_session and args and not options.session:
+        # NOTE: session name can be also given as positional argument
+        options.session = args.pop(0)
 
     missing_args = []
     for arg in action.obligatory_args:
@@ -262,3 +390,18 @@ def perform(options, args, config, win_id=0):
     kwargs = action.get_kwargs(config, section, options)
     action(window, **kwargs)
 
+
+def perform_action(config, name, section=None, win_id=0, **kwargs):
+    """Perform action with given name, and already typed arguments.
+
+    Faster than :func:`perform` as commandline doesn't need to be parsed.
+    Check :func:`~pywo.actions.parser.parse_dict` for accepted arguments.
+    Raises :class:`~pywo.actions.parser.ParserException` if arguments are
+    invalid, and :class:`ActionException` if action can't be performed.
+
+    """
+    options = parser.parse_dict(kwargs)
+    options.action = name
+    options.section = section
+    perform(options, [], config, win_id)
+
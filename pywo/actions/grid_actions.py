@@ -20,12 +20,15 @@
 
 """grid_actions.py - PyWO actions - placing windows on grid."""
 
+import collections
 import itertools
 import logging
+import threading
 
 from pywo.core import Gravity, Geometry, Size, Position, WindowManager
+from pywo.core.events import DestroyNotifyHandler
 from pywo.actions import Action, get_current_workarea, TYPE_FILTER
-from pywo.actions.manipulate import Expander
+from pywo.actions.manipulate import Expander, indexed_others
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -91,6 +94,123 @@ def get_iterator(sizes, new_size):
     return itertools.cycle(sizes)
 
 
+def hashable(value):
+    """Return value that can be used as a part of the dict key."""
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+class GridTable(object):
+
+    """Precomputed sizes and positions for given grid arguments and workarea.
+
+    For every candidate width (and height) the edges of the window placed 
+    on the grid position are computed in advance, so finding sizes fitting
+    into the free space is just a couple of comparisons.
+
+    """
+
+    def __init__(self, win, workarea, position, size, width, height):
+        self.workarea = workarea
+        self.position = absolute_position(workarea, position)
+        self.sizes = absolute_size(win, workarea, size, width, height)
+        self.widths = [(width, 
+                        self.position.x - width * position.x,
+                        self.position.x + width * (1 - position.x))
+                       for width in self.sizes.width]
+        self.heights = [(height, 
+                         self.position.y - height * position.y,
+                         self.position.y + height * (1 - position.y))
+                        for height in self.sizes.height]
+
+    @staticmethod
+    def __fitting(candidates, start, end):
+        """Return sizes of candidates placed between start and end."""
+        return [size for size, size_start, size_end in candidates
+                     if size_start >= start and size_end <= end]
+
+    def fitting_widths(self, geometry):
+        """Return widths fitting inside given geometry."""
+        return self.__fitting(self.widths, geometry.x, geometry.x2)
+
+    def fitting_heights(self, geometry):
+        """Return heights fitting inside given geometry."""
+        return self.__fitting(self.heights, geometry.y, geometry.y2)
+
+
+class GridTables(object):
+
+    """Cache of :class:`GridTable` per grid arguments and workarea.
+
+    Tables depend only on the section (or commandline) values and workarea,
+    so they can be computed when configuration is loaded, and reused for
+    every window. When workarea (or monitor) changes new tables are created.
+
+    """
+
+    # Maximal number of cached tables, there are usually only several
+    # sections multiplied by the number of monitors.
+    MAX_TABLES = 256
+
+    def __init__(self):
+        self.__tables = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(workarea, position, size, width, height):
+        """Return key for given grid arguments, or None if not cacheable."""
+        if not ((width.width or size.width) and \
+                (height.height or size.height)):
+            # Size depends on current window size, can't be cached
+            return None
+        return (workarea.x, workarea.y, workarea.width, workarea.height,
+                position.x, position.y,
+                hashable(size.width), hashable(size.height),
+                hashable(width.width), hashable(height.height))
+
+    def get(self, win, workarea, position, size, width, height):
+        """Return :class:`GridTable` for given arguments."""
+        key = self.key(workarea, position, size, width, height)
+        if key is None:
+            return GridTable(win, workarea, position, size, width, height)
+        self.__lock.acquire()
+        try:
+            table = self.__tables.get(key)
+            if not table:
+                if len(self.__tables) >= self.MAX_TABLES:
+                    self.__tables.clear()
+                table = GridTable(win, workarea, position, 
+                                  size, width, height)
+                self.__tables[key] = table
+            return table
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """Remove all cached tables."""
+        self.__lock.acquire()
+        try:
+            self.__tables.clear()
+        finally:
+            self.__lock.release()
+
+    def __len__(self):
+        return len(self.__tables)
+
+
+TABLES = GridTables()
+
+
+def workareas(xinerama):
+    """Return list of workareas used by grid actions."""
+    workarea = WM.workarea_geometry
+    if not xinerama:
+        return [workarea]
+    areas = [screen & workarea for screen in WM.screen_geometries()]
+    return [area for area in areas if area]
+
+
 class GeometryCycler(object):
 
     """Cycle window geometry."""
@@ -101,27 +221,22 @@ class GeometryCycler(object):
         self.args = (position, gravity, size, width, height) # TODO: remove me!?
         self.gravity = gravity
         workarea = get_current_workarea(win, xinerama)
-        self.position = absolute_position(workarea, position)
-        self.sizes = absolute_size(win, workarea, size, width, height)
+        table = TABLES.get(win, workarea, position, size, width, height)
+        self.position = table.position
+        self.sizes = Size(list(table.sizes.width), list(table.sizes.height))
         dummy = DummyWindow(win, self.position, self.sizes, self.gravity)
         expand = Expander(workarea=workarea, 
                           adjacent=False, 
                           vertical_first=cycle)
-        max_geo = expand(dummy, dummy.gravity)
-        widths = []
-        for width in self.sizes.width:
-            if max_geo.width - width >= 0 and \
-               self.position.x - width * position.x >= max_geo.x and \
-               self.position.x + width * (1 - position.x) <= max_geo.x2:
-                widths.append(width)
-        heights = []
-        for height in self.sizes.height:
-            if max_geo.height - height >= 0 and \
-               self.position.y - height * position.y >= max_geo.y and \
-               self.position.y + height * (1 - position.y) <= max_geo.y2:
-                heights.append(height)
-        width = max(widths)
-        height = max(heights)
+        # NOTE: with spatial_service running (default), others are read from
+        #       index updated by X events, instead of asking X server for all
+        #       windows (e.g. when not running as daemon)
+        max_geo = expand(dummy, dummy.gravity, indexed_others(win))
+        # NOTE: if no size fits (crowded desktop) use the smallest one
+        width = max(table.fitting_widths(max_geo) or
+                    [min(self.sizes.width)])
+        height = max(table.fitting_heights(max_geo) or
+                     [min(self.sizes.height)])
         self.sizes_iterator = Size(get_iterator(self.sizes.width, width),
                                    get_iterator(self.sizes.height, height))
         [self.sizes_iterator.height, self.sizes_iterator.width][cycle].next()
@@ -141,17 +256,107 @@ class GeometryCycler(object):
                         width, height, self.gravity)
 
 
+class CyclerStore(object):
+
+    """Bounded, thread-safe store of :class:`GeometryCycler` per window.
+
+    Least recently used cyclers are evicted when the store is full.
+    Cycler is removed as soon as its window is destroyed, window ids are
+    reused by X Server, so new window must never resume stale cycle.
+
+    """
+
+    MAX_CYCLERS = 32
+
+    def __init__(self, size=MAX_CYCLERS):
+        self.size = size
+        self.__cyclers = collections.OrderedDict() # {win.id: cycler, }
+        self.__lock = threading.RLock()
+        self.__handler = DestroyNotifyHandler(destroy=self.__destroyed)
+
+    def get(self, win_id):
+        """Return cycler for window with given id, or ``None``."""
+        self.__lock.acquire()
+        try:
+            cycler = self.__cyclers.pop(win_id, None)
+            if cycler:
+                # Move to the end, it's most recently used now
+                self.__cyclers[win_id] = cycler
+            return cycler
+        finally:
+            self.__lock.release()
+
+    def set(self, win, cycler):
+        """Store cycler for given window."""
+        self.__lock.acquire()
+        try:
+            if win.id in self.__cyclers:
+                self.__cyclers.pop(win.id)
+            else:
+                win.register(self.__handler)
+            self.__cyclers[win.id] = cycler
+            while len(self.__cyclers) > self.size:
+                win_id, cycler = self.__cyclers.popitem(last=False)
+                WM.get_window(win_id).unregister(self.__handler)
+        finally:
+            self.__lock.release()
+
+    def remove(self, win_id):
+        """Remove cycler for window with given id."""
+        self.__lock.acquire()
+        try:
+            if self.__cyclers.pop(win_id, None):
+                WM.get_window(win_id).unregister(self.__handler)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """Remove all cyclers."""
+        self.__lock.acquire()
+        try:
+            for win_id in self.__cyclers.keys():
+                self.remove(win_id)
+        finally:
+            self.__lock.release()
+
+    def __destroyed(self, event):
+        """Remove cycler of destroyed window."""
+        log.debug('Removing cycler for destroyed %s', event.window)
+        self.remove(event.window_id)
+
+    def __len__(self):
+        return len(self.__cyclers)
+
+
+CYCLERS = CyclerStore()
+
+
 class GridAction(Action):
 
     """Put window on given position and resize it according to grid layout."""
 
-    __cycler = None
-
     def __init__(self, name, doc, cycle):
         Action.__init__(self, name=name, doc=doc, 
                         filter=TYPE_FILTER, unshade=False)
         self.cycle = cycle
 
+    def prepare(self, config):
+        """Precompute grid tables for all sections on all workareas."""
+        xinerama = getattr(config, 'xinerama', False)
+        for workarea in workareas(xinerama):
+            for section in config.sections.values():
+                if self.name in section.ignored_actions or \
+                   not section.position or not section.size:
+                    continue
+                TABLES.get(None, workarea, section.position, section.size,
+                           NO_SIZE, NO_SIZE)
+        log.debug('Prepared %s grid tables', len(TABLES))
+
+    def reset(self):
+        """Forget grid tables, and cyclers (geometries depend on WM)."""
+        TABLES.clear()
+        CYCLERS.clear()
+
     def perform(self, win, position, gravity=None,
                 size=NO_SIZE, width=NO_SIZE, height=NO_SIZE,
                 invert_on_resize=True, xinerama=False):
@@ -161,25 +366,24 @@ class GridAction(Action):
         gravity = gravity or position
         geometry = self.get_geometry(win, position, gravity,
                                      size, width, height, self.cycle, xinerama)
-        log.debug('Setting %s' % (geometry,))
+        log.debug('Setting %s', geometry)
         if invert_on_resize: 
             gravity = gravity.invert()
         win.set_geometry(geometry, gravity)
 
-    @classmethod
-    def get_geometry(cls, win, position, gravity, 
+    @staticmethod
+    def get_geometry(win, position, gravity, 
                      size, width, height, cycle, xinerama):
         """Return new window geometry from GeometryCycler."""
         # TODO: this should be done in action_hook,
         #       here only existence of cycle should be checked
-        # NOTE: it seems window.id are reused, when you create new window 
-        #       just after closing previous it might get the same id!
-        if not cls.__cycler or \
-           not win.id == cls.__cycler.win_id or \
-           not (position, gravity, size, width, height) == cls.__cycler.args:
-            cls.__cycler = GeometryCycler(win, position, gravity, 
-                                          size, width, height, cycle, xinerama)
-        return cls.__cycler.next(cycle)
+        cycler = CYCLERS.get(win.id)
+        if not cycler or \
+           not (position, gravity, size, width, height) == cycler.args:
+            cycler = GeometryCycler(win, position, gravity, 
+                                    size, width, height, cycle, xinerama)
+            CYCLERS.set(win, cycler)
+        return cycler.next(cycle)
 
 
 GridAction('grid_width', 
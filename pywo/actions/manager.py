@@ -18,11 +18,28 @@
 # along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-"""Load, register, and manage PyWO actions."""
+"""Load, register, and manage PyWO actions.
+
+Loading all actions means importing all local actions modules and scanning
+``pywo.actions`` entry points, which is slow. So after the first full load
+a manifest (action name -> module, and actions metadata) is stored in cache,
+and later only the module with requested action is imported.
+
+Manifest is invalidated when any of the actions modules, or any of the
+``sys.path`` entries (new or removed distributions) changes.
+
+Only actions available in every process are stored in manifest, actions
+registered at runtime (like ``exit`` and ``reload`` registered by the
+daemon) are known only to the process that registered them.
+
+"""
 
 import logging
 import os.path
 import sys
+import threading
+
+from pywo import cache, plugins
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -32,62 +49,203 @@ log = logging.getLogger(__name__)
 
 __ACTIONS = {}
 __LOADED = False
+__MODULES = {} # {action name: name of the module that registered it, }
+__LOADING = None # name of the module being imported
+__MANIFEST = None
+# NOTE: actions modules might be imported by D-Bus and socket workers at
+#       the same time, __LOADING must be set by one thread only
+__LOCK = threading.RLock()
+
+MANIFEST_CACHE = 'actions-manifest'
+CORE_MODULE = 'pywo.actions.core'
+
+
+class ActionInfo(object):
+
+    """Metadata of an action, available without importing it."""
+
+    def __init__(self, name, doc, args, obligatory_args, module=None):
+        self.name = name
+        self.__doc__ = doc
+        self.args = tuple(args)
+        self.obligatory_args = tuple(obligatory_args)
+        self.module = module
+        """Name of the module that needs to be imported to get action
+        (:data:`CORE_MODULE` for actions registered when ``pywo.actions``
+        is imported)."""
+
+    @property
+    def optional_args(self):
+        """Return list of optional arguments."""
+        optional_args = [arg for arg in self.args 
+                             if arg not in self.obligatory_args]
+        return optional_args
+
+    @property
+    def need_section(self):
+        """Return ``True`` if action needs section related data."""
+        return 'direction' in self.args or \
+               'position' in self.args or \
+               'gravity' in self.args
+
+    def __str__(self):
+        return "<ActionInfo '%s' from %s>" % (self.name, self.module)
 
 
 def register(action):
     """Register new Action object."""
-    if action.name in __ACTIONS:
-        log.warning('Action with name %s already registered!' % action.name)
-    __ACTIONS[action.name] = action
+    __LOCK.acquire()
+    try:
+        if action.name in __ACTIONS:
+            log.warning('Action with name %s already registered!' %
+                        action.name)
+        __ACTIONS[action.name] = action
+        if __LOADING:
+            __MODULES[action.name] = __LOADING
+        elif getattr(action, '__module__', None) == CORE_MODULE:
+            # registered when pywo.actions is imported, available everywhere
+            __MODULES[action.name] = CORE_MODULE
+    finally:
+        __LOCK.release()
     log.debug('Registered %s' % action)
 
 
+def import_module(module_name):
+    """Import module, and remember which actions it registered."""
+    global __LOADING
+    __LOCK.acquire()
+    try:
+        if module_name in sys.modules:
+            return
+        log.debug("Importing <module '%s'>", module_name)
+        __LOADING = module_name
+        try:
+            __import__(module_name)
+        except Exception, exc:
+            log.exception('Exception %s while importing <module %s>' % \
+                          (exc, module_name))
+    finally:
+        __LOADING = None
+        __LOCK.release()
+
+
+def local_modules():
+    """Return list of (module name, path) of local actions modules."""
+    path = os.path.dirname(os.path.abspath(__file__))
+    return [('pywo.actions.%s' % filename[0:-3], 
+             os.path.join(path, filename)) 
+            for filename in sorted(os.listdir(path))
+            if filename.endswith('_actions.py')]
+
+
 def load_local():
     """Load Actions from local modules."""
     log.debug('Loading local actions modules...')
-    path = os.path.dirname(os.path.abspath(__file__))
-    modules = [filename[0:-3] for filename in os.listdir(path) 
-                              if filename.endswith('_actions.py')]
-    for module in modules:
-        module_name = 'pywo.actions.%s' % module
-        if not module_name in sys.modules:
-            log.debug("Importing <module '%s'>" % module_name)
-            try:
-                __import__(module_name)
-            except Exception, exc:
-                log.exception('Exception %s while importing <module %s>' % \
-                              (exc, module_name))
+    for module_name, path in local_modules():
+        import_module(module_name)
 
 
 def load_plugins():
     """Load third party ``pywo.actions`` plugins."""
+    global __LOADING
     log.debug('Loading third-party actions modules...')
-    try:
-        from pkg_resources import iter_entry_points
-    except ImportError:
-        return
-    for entry_point in iter_entry_points('pywo.actions'):
+    for entry_point in plugins.entry_points('pywo.actions'):
         log.debug('Loading plugin %s' % entry_point.name)
+        __LOCK.acquire()
+        __LOADING = entry_point.module_name
         try:
-            entry_point.load()
-        except Exception, exc:
-            log.exception('Exception %e while loading %s' % \
-                          (exc, entry_point.name))
+            try:
+                entry_point.load()
+            except Exception, exc:
+                log.exception('Exception %s while loading %s' % \
+                              (exc, entry_point.name))
+        finally:
+            __LOADING = None
+            __LOCK.release()
+
+
+def manifest_files():
+    """Return list of files and directories that invalidate manifest."""
+    files = [path for module_name, path in local_modules()]
+    # NOTE: modification time of directory changes when distribution is
+    #       installed or removed
+    files.extend([os.path.abspath(path or os.curdir) for path in sys.path])
+    for module_name in set(__MODULES.values()):
+        module = sys.modules.get(module_name)
+        path = getattr(module, '__file__', None)
+        if path and path.endswith(('.pyc', '.pyo')):
+            path = path[:-1]
+        if path:
+            files.append(path)
+    return files
+
+
+def store_manifest():
+    """Store manifest of registered actions in cache.
+
+    Actions registered at runtime (not by actions modules, or plugins) are
+    not stored, so manifest is the same in every process.
+
+    """
+    global __MANIFEST
+    __MANIFEST = {}
+    for name, module in __MODULES.items():
+        action = __ACTIONS[name]
+        __MANIFEST[name] = ActionInfo(name, action.__doc__ or '', 
+                                      action.args, action.obligatory_args,
+                                      module)
+    data = {'path': list(sys.path),
+            'actions': [(info.name, info.__doc__, info.args, 
+                         info.obligatory_args, info.module)
+                        for info in __MANIFEST.values()]}
+    cache.store(MANIFEST_CACHE, manifest_files(), data)
+
+
+def get_manifest():
+    """Return {action name: :class:`ActionInfo`} or ``None``."""
+    global __MANIFEST
+    if __MANIFEST is None:
+        data = cache.get(MANIFEST_CACHE)
+        if not data or not data['path'] == sys.path:
+            return None
+        __MANIFEST = dict([(values[0], ActionInfo(*values))
+                           for values in data['actions']])
+        log.debug('Loaded manifest of %s actions', len(__MANIFEST))
+    return __MANIFEST
 
 
 def load():
     """Load actions from modules and plugins."""
-    load_local()
-    load_plugins()
     global __LOADED
-    log.debug('Registered %s actions' % (len(__ACTIONS),))
-    __LOADED = True
+    __LOCK.acquire()
+    try:
+        load_local()
+        load_plugins()
+        log.debug('Registered %s actions', len(__ACTIONS))
+        __LOADED = True
+        store_manifest()
+    finally:
+        __LOCK.release()
 
 
 def get(name):
-    """Return action with given name or ``None``."""
-    if not __LOADED:
-        load()
+    """Return action with given name or ``None``.
+    
+    Only module containing given action is imported if possible.
+    
+    """
+    if not __LOADED and not name in __ACTIONS:
+        __LOCK.acquire()
+        try:
+            manifest = get_manifest()
+            info = manifest and manifest.get(name)
+            if info and info.module:
+                import_module(info.module)
+            if not name in __ACTIONS and not (manifest and not info):
+                # action not found, manifest is missing or out of date
+                load()
+        finally:
+            __LOCK.release()
     return __ACTIONS.get(name, None)
 
 
@@ -97,3 +255,20 @@ def get_all():
         load()
     return __ACTIONS.values()
 
+
+def get_all_info():
+    """Return list of :class:`ActionInfo` of all actions.
+
+    Uses manifest if possible, so no actions module is imported.
+
+    """
+    if not __LOADED:
+        manifest = get_manifest()
+        if manifest is not None:
+            return manifest.values()
+        load()
+    return [ActionInfo(action.name, action.__doc__ or '', 
+                       action.args, action.obligatory_args,
+                       __MODULES.get(action.name))
+            for action in __ACTIONS.values()]
+
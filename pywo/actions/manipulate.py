@@ -34,6 +34,10 @@ log = logging.getLogger(__name__)
 
 WM = WindowManager()
 
+INDEX = None
+"""Index of windows on the current desktop kept up to date by
+:mod:`~pywo.services.spatial_service` (``None`` if service is not running)."""
+
 ATTRGETTERS = {'x': (operator.attrgetter('x'),
                      operator.attrgetter('x2'),
                      operator.attrgetter('width')),
@@ -63,6 +67,39 @@ class GeometryWindow(Window, Geometry):
         return self
 
 
+class IndexedGeometry(Geometry):
+
+    """Geometry of other window read from :data:`INDEX`.
+
+    Can be used instead of :class:`GeometryWindow` when only geometry of
+    other windows is needed, without asking X server.
+
+    """
+
+    @property
+    def geometry(self):
+        return self
+
+
+def indexed_others(win):
+    """Return list of :class:`IndexedGeometry` of windows on the current
+    desktop (except given window), or ``None`` if :data:`INDEX` is not
+    available."""
+    if not INDEX:
+        return None
+    return [IndexedGeometry(geometry.x, geometry.y,
+                            geometry.width, geometry.height)
+            for geometry in INDEX.geometries(exclude=win.id)]
+
+
+def indexed_geometries():
+    """Return {win_id: geometry} of windows known to :data:`INDEX` (empty
+    if :data:`INDEX` is not available)."""
+    if not INDEX:
+        return {}
+    return INDEX.all_geometries()
+
+
 def in_axis_geometry(geometry, axis, workarea=None):
     """Return geometry stretched in given axis."""
     workarea = workarea or WM.workarea_geometry
@@ -155,17 +192,24 @@ class Resizer(object):
         self.adjacent = adjacent
         self.vertical_first = vertical_first
 
-    def __call__(self, win, direction):
+    def __call__(self, win, direction, others=None):
         """Return new geometry for the window."""
-        return self.resize(win, direction)
+        return self.resize(win, direction, others)
 
-    def resize(self, win, direction):
-        """Return new geometry for the window."""
+    def resize(self, win, direction, others=None):
+        """Return new geometry for the window.
+
+        `others` are :class:`GeometryWindow` (or :class:`IndexedGeometry`)
+        of other windows on the current desktop, if not given they are
+        read from X server.
+
+        """
         current = win.geometry & self.workarea
-        windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
-                                         filters.STANDARD, 
-                                         filters.Desktop()))
-        others = [GeometryWindow(window) for window in windows]
+        if others is None:
+            windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
+                                             filters.STANDARD,
+                                             filters.Desktop()))
+            others = [GeometryWindow(window) for window in windows]
         axis_order = [['x', 'y'], ['y', 'x']]
         for axis in axis_order[self.vertical_first]:
             current = self.__resize_in_axis(axis, current, others, direction)
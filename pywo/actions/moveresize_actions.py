@@ -23,7 +23,10 @@
 import logging
 
 from pywo.actions import register, get_current_workarea, TYPE_STATE_FILTER
+from pywo.actions import ActionException
 from pywo.actions.manipulate import Expander, Shrinker, Floater
+from pywo.core import WindowManager
+from pywo.core import filters, freespace
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -31,6 +34,8 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 
 log = logging.getLogger(__name__)
 
+WM = WindowManager()
+
 
 @register(name='expand', filter=TYPE_STATE_FILTER, unshade=True)
 def _expand(win, direction, vertical_first=True, xinerama=False):
@@ -41,7 +46,7 @@ def _expand(win, direction, vertical_first=True, xinerama=False):
                       both_sides=not direction.is_middle,
                       vertical_first=vertical_first)
     geometry = expand(win, direction)
-    log.debug('Setting %s' % (geometry,))
+    log.debug('Setting %s', geometry)
     win.set_geometry(geometry, direction)
 
 
@@ -55,7 +60,7 @@ def _shrink(win, direction, vertical_first=True, xinerama=False):
     shrink = Shrinker(workarea=workarea, 
                       vertical_first=vertical_first)
     geometry = shrink(win, direction.invert())
-    log.debug('Setting %s' % (geometry,))
+    log.debug('Setting %s', geometry)
     win.set_geometry(geometry, direction)
 
 
@@ -74,7 +79,7 @@ def _move(win, direction, vertical_first=True, xinerama=False):
     x = border.x + border.width * direction.x
     y = border.y + border.height * direction.y
     geometry.set_position(x, y, direction)
-    log.debug('Setting %s' % (geometry,))
+    log.debug('Setting %s', geometry)
     win.set_geometry(geometry)
 
 
@@ -87,7 +92,23 @@ def _put(win, position, gravity=None, xinerama=False):
     x = workarea.x + workarea.width * position.x
     y = workarea.y + workarea.height * position.y
     geometry.set_position(x, y, gravity)
-    log.debug('Setting %s' % (geometry,))
+    log.debug('Setting %s', geometry)
+    win.set_geometry(geometry)
+
+
+@register(name='fill', filter=TYPE_STATE_FILTER, unshade=True)
+def _fill(win, xinerama=False):
+    """Move and resize window to the largest free area overlapping it."""
+    workarea = get_current_workarea(win, xinerama)
+    windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
+                                     filters.STANDARD,
+                                     filters.Desktop()))
+    occupied = [window.geometry for window in windows]
+    free = freespace.free_rectangles(workarea, occupied)
+    geometry = freespace.largest(free, win.geometry)
+    if not geometry:
+        raise ActionException('No free space overlapping the window')
+    log.debug('Setting %s', geometry)
     win.set_geometry(geometry)
 
 
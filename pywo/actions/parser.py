@@ -31,7 +31,7 @@ import shlex
 import threading
 import types
 
-from pywo.core import Size, Gravity, Position
+from pywo.core import Size, Gravity, Position, Mode
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -99,6 +99,104 @@ def parse_args(args, values=None):
     return THREAD_DATA.parser.parse_args(args, values)
 
 
+def get_defaults():
+    """Return copy of default option values."""
+    if not hasattr(THREAD_DATA, 'parser'):
+        THREAD_DATA.parser = OptionParser(conflict_handler='resolve')
+    return THREAD_DATA.parser.get_default_values()
+
+
+# Values accepted as mode in parse_dict
+MODES = {'on': Mode.SET, 'set': Mode.SET, 'add': Mode.SET,
+         'off': Mode.UNSET, 'unset': Mode.UNSET, 'remove': Mode.UNSET,
+         'toggle': Mode.TOGGLE, }
+
+
+def to_gravity(value):
+    """Convert name, string or (x, y) to :class:`~pywo.core.basic.Gravity`."""
+    if value is None or isinstance(value, Gravity):
+        return value
+    if isinstance(value, basestring):
+        return Gravity.parse(str(value))
+    x, y = value
+    return Gravity(float(x), float(y))
+
+
+def to_size_value(value):
+    """Convert string or number(s) to width or height."""
+    if isinstance(value, basestring):
+        return Size.parse_value(str(value))
+    if isinstance(value, (list, tuple)):
+        return [float(item) for item in value]
+    return float(value)
+
+
+def to_size(value):
+    """Convert string or (width, height) to :class:`~pywo.core.basic.Size`."""
+    if value is None or isinstance(value, Size):
+        return value
+    if isinstance(value, basestring):
+        value = value.split(None, 1)
+    width, height = value
+    size = Size(to_size_value(width), to_size_value(height))
+    if size.width is None or size.height is None:
+        raise ValueError('Empty size: %s' % (value,))
+    return size
+
+
+def to_mode(value):
+    """Convert mode name or number to :class:`~pywo.core.enums.Mode`."""
+    if isinstance(value, basestring):
+        return MODES[value.lower()]
+    if value in [Mode.SET, Mode.UNSET, Mode.TOGGLE]:
+        return int(value)
+    raise ValueError('Invalid mode: %s' % (value,))
+
+
+def parse_dict(kwargs, values=None):
+    """Return option values built from dict of already typed arguments.
+
+    This is faster alternative to :func:`parse_args` for scripts and D-Bus
+    clients. Gravity, direction and position can be names, strings or 
+    (x, y) tuples, size can be (width, height) tuple, width and height 
+    strings or numbers, and mode one of :data:`MODES` or 
+    :class:`~pywo.core.enums.Mode` values. Values are set like in 
+    :func:`parse_args` (position defaults to gravity, etc).
+
+    """
+    values = values or get_defaults()
+    for name, value in kwargs.items():
+        name = str(name)
+        if not hasattr(values, name):
+            raise ParserException('no such option: %s' % name)
+        try:
+            if name in ['gravity', 'direction', 'position']:
+                value = to_gravity(value)
+            elif name == 'size':
+                value = to_size(value)
+            elif name == 'width':
+                value = Size(to_size_value(value), 0)
+            elif name == 'height':
+                value = Size(0, to_size_value(value))
+            elif name == 'mode':
+                value = to_mode(value)
+            elif name in ['action', 'section', 'win_id', 'session'] and \
+                 value:
+                value = unicode(value).encode('utf-8')
+        except (ValueError, TypeError, KeyError):
+            raise ParserException('option %s: invalid value: %s' % 
+                                  (name, value))
+        setattr(values, name, value)
+    # NOTE: the same defaults as in gravity_callback
+    if values.gravity and not values.position:
+        values.position = values.gravity
+    if values.gravity and not values.direction:
+        values.direction = values.gravity
+    if values.position and not values.gravity:
+        values.gravity = values.position
+    return values
+
+
 #
 # Callbacks used by Options
 #
@@ -243,6 +341,25 @@ add_option('-V', '--vertical-first',
 add_option('-H', '--horizontal-first',
            action='store_false', dest='vertical_first')
 
+#
+# Sessions
+#
+add_option('--session',
+           action='store', dest='session', default=None,
+           help='name of the session (save_session, restore_session), '
+                'can be also given as the first argument '
+                '[default: default]',
+           metavar='NAME')
+
+#
+# Most recently used windows
+#
+add_option('-n', '--number',
+           action='store', type='int', dest='number', default=None,
+           help='position on the most recently used windows list, '
+                '0 is active window (focus_mru) [default: 1]',
+           metavar='N')
+
 add_option('--xinerama',
            action='store_true', dest='xinerama', default=False,
            help='Use Xinerama to determine current screen area [default: %default]')
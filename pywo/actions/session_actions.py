@@ -0,0 +1,263 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""session_actions.py - PyWO actions - saving and restoring sessions.
+
+Session is a snapshot of geometry, desktop and state of all windows,
+stored as JSON in ``$XDG_DATA_HOME/pywo/sessions/NAME.json``. Windows are
+matched back using class name, name, and process id.
+
+"""
+
+import logging
+import os
+import tempfile
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from pywo.actions import register, Action, ActionException
+from pywo.core import WindowManager, Geometry, State, Mode
+from pywo.core import filters
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+SESSION_VERSION = 1
+
+# Names of saved states, order used when restoring
+STATES = [('maximized_vert', State.MAXIMIZED_VERT),
+          ('maximized_horz', State.MAXIMIZED_HORZ),
+          ('fullscreen', State.FULLSCREEN),
+          ('shaded', State.SHADED),
+          ('sticky', State.STICKY),
+          ('above', State.ABOVE),
+          ('below', State.BELOW),
+          ('hidden', State.HIDDEN), ]
+
+# States that must be unset before changing geometry
+RESET_STATES = ['maximized_vert', 'maximized_horz', 'fullscreen',
+                'shaded', 'hidden']
+
+
+def sessions_dir():
+    """Return path of the directory with saved sessions."""
+    path = os.environ.get('XDG_DATA_HOME') or \
+           os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(path, 'pywo', 'sessions')
+
+
+def session_path(name):
+    """Return path of the session file."""
+    if not name or os.sep in name or name.startswith('.'):
+        raise ActionException('Invalid SESSION name: %s' % name)
+    return os.path.join(sessions_dir(), '%s.json' % name)
+
+
+def window_record(win):
+    """Return dict describing window."""
+    geometry = win.geometry
+    state = win.state
+    return {'class': win.class_name.decode('utf-8', 'replace'),
+            'name': win.name.decode('utf-8', 'replace'),
+            'pid': win.pid,
+            'desktop': win.desktop,
+            'geometry': [geometry.x, geometry.y,
+                         geometry.width, geometry.height],
+            'state': [name for name, atom in STATES if atom in state], }
+
+
+def snapshot():
+    """Return list of records of all standard windows (bottom first)."""
+    windows = WM.windows(filters.STANDARD_TYPE)
+    windows.reverse()
+    return [window_record(win) for win in windows]
+
+
+def save(name, records):
+    """Write session records to file."""
+    path = session_path(name)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    data = {'version': SESSION_VERSION, 'windows': records}
+    # NOTE: write to temporary file first, so saved session is never lost
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    session_file = os.fdopen(fd, 'w')
+    try:
+        json.dump(data, session_file, separators=(',', ':'))
+    finally:
+        session_file.close()
+    os.rename(tmp_path, path)
+    return path
+
+
+def load(name):
+    """Return list of session records."""
+    path = session_path(name)
+    try:
+        session_file = open(path)
+    except IOError:
+        raise ActionException('No such SESSION: %s' % name)
+    try:
+        try:
+            data = json.load(session_file)
+        except ValueError, exc:
+            raise ActionException('Invalid SESSION file %s: %s' %
+                                  (path, exc))
+    finally:
+        session_file.close()
+    if data.get('version') != SESSION_VERSION:
+        raise ActionException('Unsupported SESSION version: %s' %
+                              data.get('version'))
+    return data['windows']
+
+
+def match_windows(records, candidates):
+    """Return list of (record, key) pairs.
+
+    `candidates` is list of (key, class name, name, pid) of current
+    windows. Windows are matched by class name, best match is the one with
+    the same name and pid, then the same name, then the same pid, then
+    any other window of the same class. Every window is matched only once.
+
+    """
+    index = {} # {class name: [(key, name, pid), ], }
+    for key, class_name, name, pid in candidates:
+        index.setdefault(class_name, []).append((key, name, pid))
+    matched = []
+    for rank in range(4):
+        for record in records:
+            if record.get('matched'):
+                continue
+            for candidate in index.get(record['class'], []):
+                key, name, pid = candidate
+                same_name = name == record['name']
+                same_pid = pid is not None and pid == record['pid']
+                if rank == 0 and not (same_name and same_pid) or \
+                   rank == 1 and not same_name or \
+                   rank == 2 and not same_pid:
+                    continue
+                index[record['class']].remove(candidate)
+                record['matched'] = True
+                matched.append((record, key))
+                break
+    for record in records:
+        record.pop('matched', None)
+    return matched
+
+
+def restore(records):
+    """Restore geometry, desktop and state of matched windows.
+
+    Changes are sent without waiting for X Server, but setting geometry
+    still needs several round trips per window (to read its current
+    geometry and extents). Window manager is synchronized once after
+    unsetting states (only if needed), and once after all changes.
+
+    """
+    windows = WM.windows(filters.STANDARD_TYPE)
+    candidates = [(win, win.class_name.decode('utf-8', 'replace'),
+                   win.name.decode('utf-8', 'replace'), win.pid)
+                  for win in windows]
+    matched = match_windows(records, candidates)
+    # Unset states preventing geometry change
+    states = dict([(win.id, win.state) for record, win in matched])
+    reset_atoms = [atom for name, atom in STATES if name in RESET_STATES]
+    reset = [win for record, win in matched
+                 if [atom for atom in reset_atoms if atom in states[win.id]]]
+    for win in reset:
+        win.reset()
+    if reset:
+        WM.sync()
+    # Move windows, and restore states
+    for record, win in matched:
+        if not 'sticky' in record['state']:
+            win.set_desktop(record['desktop'])
+        win.set_geometry(Geometry(*record['geometry']))
+        state = states[win.id]
+        for name, atom in STATES:
+            if name == 'hidden':
+                if name in record['state'] and \
+                   not 'shaded' in record['state']:
+                    win.iconify(Mode.SET)
+            elif name in record['state']:
+                set_state(win, name, Mode.SET)
+            elif atom in state and not name in RESET_STATES:
+                set_state(win, name, Mode.UNSET)
+    WM.sync()
+    return len(matched)
+
+
+def set_state(win, name, mode):
+    """Set or unset window's state with given name."""
+    if name == 'maximized_vert':
+        win.maximize(mode, horz=False)
+    elif name == 'maximized_horz':
+        win.maximize(mode, vert=False)
+    elif name == 'fullscreen':
+        win.fullscreen(mode)
+    elif name == 'shaded':
+        win.shade(mode)
+    elif name == 'sticky':
+        win.sticky(mode)
+    elif name == 'above':
+        win.always_above(mode)
+    elif name == 'below':
+        win.always_below(mode)
+
+
+@register(name='save_session')
+class SaveSessionAction(Action):
+
+    """Save geometry, desktop, and state of all windows as session."""
+
+    def pre_perform(self, win, session='default'):
+        # NOTE: exceptions raised by perform are only logged
+        session_path(session)
+        Action.pre_perform(self, win)
+
+    def perform(self, win, session='default'):
+        records = snapshot()
+        path = save(session, records)
+        log.info('Saved %s windows to %s', len(records), path)
+
+
+@register(name='restore_session')
+class RestoreSessionAction(Action):
+
+    """Restore geometry, desktop, and state of windows saved in session."""
+
+    def pre_perform(self, win, session='default'):
+        # NOTE: exceptions raised by perform are only logged
+        load(session)
+        Action.pre_perform(self, win)
+
+    def perform(self, win, session='default'):
+        records = load(session)
+        restored = restore(records)
+        log.info('Restored %s of %s windows from session %s',
+                 restored, len(records), session)
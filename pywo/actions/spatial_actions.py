@@ -0,0 +1,74 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""spatial_actions.py - PyWO actions - focus and swap windows in direction."""
+
+import logging
+
+from pywo.actions import register, ActionException, TYPE_FILTER
+from pywo.actions import manipulate
+from pywo.core import WindowManager
+from pywo.core import filters
+from pywo.core.spatial import SpatialIndex
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+def nearest(win, direction):
+    """Return id of the nearest window in given direction (or ``None``)."""
+    if manipulate.INDEX:
+        return manipulate.INDEX.nearest(win, direction)
+    windows = WM.windows(filters.AND(filters.STANDARD, filters.Desktop()))
+    index = SpatialIndex(dict([(window.id, window.geometry)
+                               for window in windows]))
+    geometry = index.get(win.id) or win.geometry
+    return index.nearest(geometry, direction, exclude=win.id)
+
+
+def neighbour(win, direction):
+    """Return the nearest window in given direction."""
+    try:
+        win_id = nearest(win, direction)
+    except ValueError, exc:
+        raise ActionException('Invalid DIRECTION: %s' % exc)
+    if not win_id:
+        raise ActionException('No window in given DIRECTION')
+    return WM.get_window(win_id)
+
+
+@register(name='focus', filter=TYPE_FILTER)
+def _focus(win, direction):
+    """Activate the nearest window in given direction."""
+    neighbour(win, direction).activate()
+
+
+@register(name='swap', filter=TYPE_FILTER)
+def _swap(win, direction):
+    """Switch placement with the nearest window in given direction."""
+    other = neighbour(win, direction)
+    win_geometry, other_geometry = win.geometry, other.geometry
+    win.set_geometry(other_geometry)
+    other.set_geometry(win_geometry)
+
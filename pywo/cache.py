@@ -0,0 +1,136 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""On-disk cache of data computed from files.
+
+Cached data is stored in ``$XDG_CACHE_HOME/pywo`` (``~/.cache/pywo`` by
+default) together with stamps - (path, mtime, size) - of all files used to
+compute it. Cached data is valid only if none of these files has changed.
+
+"""
+
+import logging
+import os
+import tempfile
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import pywo
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+# Change it every time format of the cached data changes
+CACHE_VERSION = 2
+
+
+def cache_dir():
+    """Return path of the PyWO cache directory."""
+    path = os.environ.get('XDG_CACHE_HOME') or \
+           os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(path, 'pywo')
+
+
+def cache_path(name):
+    """Return path of the cache file with given name."""
+    return os.path.join(cache_dir(), name)
+
+
+def file_stamps(paths):
+    """Return list of (path, mtime, size) of given files.
+
+    For files that don't exist (path, ``None``, ``None``) is returned, so
+    creating new file also invalidates the cache.
+
+    """
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((path, stat.st_mtime, stat.st_size))
+        except OSError:
+            stamps.append((path, None, None))
+    return stamps
+
+
+def load(name):
+    """Return (stamps, data) stored in cache, or ``None``.
+
+    Stamps are not checked, use :func:`get` to get only valid data.
+
+    """
+    path = cache_path(name)
+    try:
+        cache_file = open(path, 'rb')
+    except IOError:
+        return None
+    try:
+        try:
+            version, pywo_version, stamps, data = pickle.load(cache_file)
+        except Exception, exc:
+            log.warning('Invalid cache file %s: %s' % (path, exc))
+            return None
+    finally:
+        cache_file.close()
+    if not (version, pywo_version) == (CACHE_VERSION, pywo.__version__):
+        return None
+    return stamps, data
+
+
+def get(name):
+    """Return cached data if none of the stamped files changed, or ``None``."""
+    cached = load(name)
+    if not cached:
+        return None
+    stamps, data = cached
+    paths = [path for path, mtime, size in stamps]
+    if not file_stamps(paths) == stamps:
+        log.debug('Cache %s is out of date', name)
+        return None
+    return data
+
+
+def store(name, paths, data):
+    """Store data in cache, stamped with given files."""
+    directory = cache_dir()
+    stamps = file_stamps(paths)
+    tmp_path = None
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # NOTE: write to temporary file first, and rename it so other
+        #       processes never read half-written cache
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        cache_file = os.fdopen(fd, 'wb')
+        try:
+            pickle.dump((CACHE_VERSION, pywo.__version__, stamps, data),
+                        cache_file, pickle.HIGHEST_PROTOCOL)
+        finally:
+            cache_file.close()
+        os.rename(tmp_path, cache_path(name))
+    except (IOError, OSError, pickle.PicklingError), exc:
+        log.warning('Can\'t store cache %s: %s' % (name, exc))
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,159 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""client.py - forward commandline actions to running PyWO daemon.
+
+If PyWO daemon with socket_service is running, actions are performed by
+the daemon (no need to connect to X, load config, actions, etc.),
+otherwise :func:`pywo.main.run` is used.
+
+Protocol: client sends JSON encoded list of arguments followed by newline,
+daemon responds with JSON encoded ``[status, message, output]`` where
+status is 0 when action was performed, message is the error message, and
+output is the text printed by the action (for example ``stats``).
+
+This module should import as little as possible.
+
+"""
+
+import os
+import socket
+import sys
+import tempfile
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+CONNECT_TIMEOUT = 0.5
+"""Seconds to wait for connection to the daemon."""
+RESPONSE_TIMEOUT = 10
+"""Seconds to wait for the daemon to perform action."""
+
+# Options that are handled by commandline, not by actions parser
+# NOTE: -h is --height of actions parser, not --help
+LOCAL_OPTIONS = ['--help', '--version', '--help-more', '--actions',
+                 '--sections', '--debug', '--verbose', '--log_path',
+                 '--config', '--daemon', '--windows', '--format',
+                 '--columns', '--filter', ]
+
+# Actions that must be performed by local process
+# NOTE: debug inspects X connection of the process performing it
+LOCAL_ACTIONS = ['debug', ]
+
+
+def socket_path():
+    """Return path of the PyWO daemon socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'pywo.sock')
+    return os.path.join(tempfile.gettempdir(), 'pywo-%s.sock' % os.getuid())
+
+
+def is_local_option(arg):
+    """Return ``True`` if argument is one of :data:`LOCAL_OPTIONS`.
+
+    Like optparse, prefixes of long options are accepted (ambiguous ones
+    are also treated as local, so commandline parser can report them).
+
+    """
+    if not arg.startswith('--') or arg == '--':
+        return False
+    name = arg.split('=')[0]
+    for option in LOCAL_OPTIONS:
+        if option.startswith(name):
+            return True
+    return False
+
+
+def can_forward(args):
+    """Return ``True`` if given arguments can be handled by the daemon."""
+    if not args:
+        return False
+    for arg in args:
+        if arg == '--':
+            # only positional arguments left
+            break
+        if is_local_option(arg) or arg in LOCAL_ACTIONS:
+            return False
+    return True
+
+
+def forward(args, path=None):
+    """Send arguments to the daemon, return (status, message, output) or
+    ``None``.
+
+    ``None`` is returned if daemon is not running.
+
+    """
+    path = path or socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except socket.error:
+            return None
+        sock.settimeout(RESPONSE_TIMEOUT)
+        sock.sendall(json.dumps(list(args)) + '\n')
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        response = json.loads(''.join(chunks))
+        # NOTE: output is not sent by older daemons
+        status, message = response[:2]
+        output = len(response) > 2 and response[2] or ''
+        return status, message, output
+    finally:
+        sock.close()
+
+
+def run():
+    """PyWO run function, forward to daemon if possible."""
+    args = sys.argv[1:]
+    if can_forward(args):
+        try:
+            response = forward(args)
+        except (socket.error, ValueError), exc:
+            sys.stderr.write('pywo: error: no response from daemon: %s\n' %
+                             (exc,))
+            sys.exit(1)
+        if response:
+            status, message, output = response
+            if output:
+                sys.stdout.write('%s\n' % output.encode('utf-8'))
+            if message:
+                sys.stderr.write('pywo: error: %s\n' %
+                                 message.encode('utf-8'))
+            sys.exit(status)
+    from pywo import main
+    main.run()
+
+
+if __name__ == '__main__':
+    run()
+
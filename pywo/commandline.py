@@ -99,6 +99,22 @@ parser.add_option('--daemon',
 parser.add_option('--windows',
                   action='store_true', dest='list_windows', default=False,
                   help='list all windows: <id> <desktop> <state> <name>')
+parser.add_option('--format',
+                  type='choice', choices=['plain', 'tsv', 'json'],
+                  dest='list_format', default='plain', metavar='FORMAT',
+                  help='output FORMAT of --windows: plain, tsv, or json '
+                       '(one object per line) [default: %default]')
+parser.add_option('--columns',
+                  dest='list_columns', default='id,desktop,state,name',
+                  metavar='COLUMNS',
+                  help='comma separated COLUMNS shown by --windows: '
+                       'id, desktop, state, name, class, pid, type, '
+                       'geometry [default: %default]')
+parser.add_option('--filter',
+                  action='append', dest='list_filters', default=[],
+                  metavar='EXPR',
+                  help='show only windows matching EXPR: COLUMN=VALUE, '
+                       'or COLUMN~SUBSTRING (can be used many times)')
 #parser.add_option('--desktops',
 #                  action='store_true', dest='list_desktops', default=False,
 #                  help='list desktops') # TODO output format
@@ -170,7 +186,7 @@ def print_help():
 
 def get_action_descriptions():
     action_descriptions = []
-    for action in sorted(actions.manager.get_all(), 
+    for action in sorted(actions.manager.get_all_info(), 
                          key=lambda action: action.name):
         line = '%s\n  %s\n  %s' %  (action.name, 
                          (action.__doc__ or '').split('\n')[0],
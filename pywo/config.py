@@ -20,10 +20,12 @@
 
 """Loading and storing configuration data."""
 
+import hashlib
 import logging
 import os
 from ConfigParser import ConfigParser
 
+from pywo import cache
 from pywo.core import Gravity, Size
 
 
@@ -66,6 +68,59 @@ class Section(object):
                                data.get('heights', ''))
         """Window size(s)."""
 
+    def __values(self):
+        """Return tuple of section's values that can be compared."""
+        gravities = [gravity and (gravity.x, gravity.y) 
+                     for gravity in [self.gravity, self.direction, 
+                                     self.position]]
+        size = self.size and (self.size.width, self.size.height)
+        return (self.key, self.ignored_actions, gravities, size)
+
+    def __eq__(self, other):
+        return self.__values() == other.__values()
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class ConfigDiff(object):
+
+    """Differences between two :class:`Config` instances."""
+
+    # Config attributes that are not treated as settings
+    __NOT_SETTINGS = ['_config', 'keys', 'sections', 'filename', 'files']
+
+    def __init__(self, old, new):
+        self.keys = self.__changed(old.keys, new.keys)
+        """Set of action and section names with changed keys."""
+        self.sections = self.__changed(old.sections, new.sections)
+        """Set of changed, added or removed section names."""
+        settings = dict([(name, value) for name, value in vars(old).items()
+                                       if name not in self.__NOT_SETTINGS])
+        new_settings = dict([(name, value) 
+                             for name, value in vars(new).items()
+                             if name not in self.__NOT_SETTINGS])
+        self.settings = self.__changed(settings, new_settings)
+        """Set of changed settings names."""
+
+    @staticmethod
+    def __changed(old, new):
+        """Return set of keys with different values in given dicts."""
+        changed = set()
+        for name in set(old.keys()) | set(new.keys()):
+            if not name in old or not name in new or \
+               old[name] != new[name]:
+                changed.add(name)
+        return changed
+
+    def __nonzero__(self):
+        return bool(self.keys or self.sections or self.settings)
+
+    def __repr__(self):
+        return '<ConfigDiff keys=%s, sections=%s, settings=%s>' % \
+               (sorted(self.keys), sorted(self.sections), 
+                sorted(self.settings))
+
 
 class Config(object):
 
@@ -83,13 +138,18 @@ class Config(object):
         """List of ignored actions."""
         self.sections = {} # {section.name: section, }
         """Dict of :class:`Section` per name."""
+        self.rules = {} # {rule name: {option: value, }, }
+        """Dict of window rules options per rule name."""
         self.aliases = {} # {alias: section|action, }
         """Dict of section/action aliases."""
         self.filename = filename
         """Configuration file."""
+        self.files = []
+        """List of all files checked while loading configuration."""
         self.bell_color = 'white'
         self.bell_duration = 0
         self.bell_width = 0
+        self.log_level = 'INFO'
         self.load(filename)
 
     def __parse_settings(self):
@@ -103,22 +163,64 @@ class Config(object):
             elif value:
                 setattr(self, key, self.OFF)
 
-    def load(self, filename):
-        """Load configuration file"""
-        log.debug('Loading configuration file %s' % filename)
-        self.filename = filename
-        # Load config file (load default first)
-        self._config.read(
-            [os.path.join('/', 'etc', 'pywo', 'pyworc'),
-             os.path.join(os.path.dirname(__file__), '..', 'etc', 'pyworc'),])
+    def __config_files(self):
+        """Return list of config files, default ones first."""
+        files = [os.path.join('/', 'etc', 'pywo', 'pyworc'),
+                 os.path.join(os.path.dirname(__file__), '..', 'etc', 'pyworc'),]
         if self.filename:
             # If filename provided use it instead of default location in ~/
-            self._config.read(self.filename)
+            files.append(self.filename)
         else:
-            self._config.read(
+            files.extend(
                 [os.path.join(os.path.expanduser('~'), '.config', 
                               'pywo', 'pyworc'),
                  os.path.join(os.path.expanduser('~'), '.pyworc'),])
+        return files
+
+    @staticmethod
+    def __layout_files(layout):
+        """Return list of possible locations of the layout definition."""
+        return [os.path.join('/', 'etc', 'pywo', 'layouts', layout),
+                os.path.join('/', 'etc', 'pywo', layout),
+                os.path.join(os.path.dirname(__file__), '..', 'etc', layout),
+                os.path.join(os.path.dirname(__file__), '..', 'etc', 
+                             'layouts', layout),
+                os.path.join(os.path.expanduser('~'), '.config', 
+                             'pywo', 'layouts', layout),
+                os.path.join(os.path.expanduser('~'), '.config', 
+                             'pywo', layout),
+                os.path.join(os.path.expanduser('~'), layout)]
+
+    def __cache_name(self):
+        """Return name of the cache file for current config filename."""
+        filename = self.filename and os.path.abspath(self.filename) or ''
+        return 'config-%s' % hashlib.md5(filename).hexdigest()[:8]
+
+    def load(self, filename):
+        """Load configuration file.
+        
+        Parsed configuration is cached, and reused as long as none of the 
+        config and layout files is changed.
+        
+        """
+        log.debug('Loading configuration file %s', filename)
+        self.filename = filename
+        cache_name = self.__cache_name()
+        state = cache.get(cache_name)
+        if state:
+            self.__dict__.update(state)
+            log.debug('Loaded cached configuration')
+            return
+        self.__parse()
+        state = dict([(name, value) for name, value in self.__dict__.items()
+                                    if not name == '_config'])
+        cache.store(cache_name, self.files, state)
+
+    def __parse(self):
+        """Parse configuration files."""
+        # Load config file (load default first)
+        self.files = self.__config_files()
+        self._config.read(self.files)
         # Get keys settings
         self.keys = dict(self._config.items('KEYS'))
         self._config.remove_section('KEYS')
@@ -131,17 +233,9 @@ class Config(object):
         if self._config.has_option('SETTINGS', 'layout'):
             # Load layout definition
             layout = self._config.get('SETTINGS', 'layout')
-            self._config.read(
-                [os.path.join('/', 'etc', 'pywo', 'layouts', layout),
-                 os.path.join('/', 'etc', 'pywo', layout),
-                 os.path.join(os.path.dirname(__file__), '..', 'etc', layout),
-                 os.path.join(os.path.dirname(__file__), '..', 'etc', 
-                              'layouts', layout),
-                 os.path.join(os.path.expanduser('~'), '.config', 
-                              'pywo', 'layouts', layout),
-                 os.path.join(os.path.expanduser('~'), '.config', 
-                              'pywo', layout),
-                 os.path.join(os.path.expanduser('~'), layout)])
+            layout_files = self.__layout_files(layout)
+            self.files.extend(layout_files)
+            self._config.read(layout_files)
             self._config.remove_option('SETTINGS', 'layout')
         self.ignored_actions = set()
         if self._config.has_option('SETTINGS', 'ignore_actions'):
@@ -157,9 +251,28 @@ class Config(object):
         self.bell_width = self._config.getint('SETTINGS', 'bell_width')
         for option in ['bell_color', 'bell_duration', 'bell_width']:
             self._config.remove_option('SETTINGS', option)
+        # Parse D-Bus service options
+        self.dbus_timeout = self._config.getfloat('SETTINGS', 'dbus_timeout')
+        self._config.remove_option('SETTINGS', 'dbus_timeout')
+        # Parse logging options
+        if self._config.has_option('SETTINGS', 'log_level'):
+            log_level = self._config.get('SETTINGS', 'log_level').upper()
+            if isinstance(logging.getLevelName(log_level), int):
+                self.log_level = log_level
+            else:
+                log.warning('Invalid log_level: %s' % log_level)
+            self._config.remove_option('SETTINGS', 'log_level')
         # Parse the rest of settings
         self.__parse_settings()
         self._config.remove_section('SETTINGS')
+        # Get window rules ([RULE name] sections)
+        self.rules = {}
+        for section in self._config.sections():
+            if not section.upper().startswith('RULE '):
+                continue
+            name = section[5:].strip().lower()
+            self.rules[name] = dict(self._config.items(section))
+            self._config.remove_section(section)
         # Parse every section
         self.sections = {}
         for section in self._config.sections():
@@ -172,6 +285,10 @@ class Config(object):
 
         log.debug('Loaded configuration file')
 
+    def diff(self, other):
+        """Return :class:`ConfigDiff` with changes made in `other` config."""
+        return ConfigDiff(self, other)
+
     def section(self, name):
         """Return :class:`Section` with given name."""
         name = self.alias(name)
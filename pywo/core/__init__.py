@@ -31,6 +31,7 @@ extents, gravity, etc).
 import logging
 
 from pywo.core.basic import Gravity, Size, Position, Geometry, Extents, Layout
+from pywo.core.basic import Region
 from pywo.core.enums import WindowType, ManagerType, State, Mode
 from pywo.core.windows import Window
 from pywo.core.manager import WindowManager
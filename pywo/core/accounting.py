@@ -0,0 +1,231 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Accounting of requests sent to X Server.
+
+:func:`install` wraps connection used by
+:class:`~pywo.core.xlib.XObject`, so every request is counted (by
+request name), together with number of blocking round trips, bytes sent,
+and time spent waiting for replies.
+
+Requests are counted in scopes started with :func:`begin`, and finished
+with :func:`end` (every action call, and every event handler call has its
+own scope). Scopes can be nested, request is counted in all active scopes
+of the current thread. Requests sent outside of any scope are counted
+in :data:`OTHER` scope. All requests are counted in :data:`TOTAL` scope.
+
+"""
+
+import logging
+import threading
+import time
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+TOTAL = 'total'
+OTHER = 'other'
+
+__LOCK = threading.Lock()
+__THREAD_DATA = threading.local()
+__STATS = {} # {scope name: Counters, }
+
+
+class Counters(object):
+
+    """Requests counters."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.requests = {} # {request name: count, }
+        self.round_trips = 0
+        self.bytes = 0
+        self.time = 0.0 # seconds spent waiting for replies
+
+    @property
+    def total_requests(self):
+        """Return number of all requests."""
+        return sum(self.requests.values())
+
+    def add_request(self, name, size):
+        """Count request."""
+        self.requests[name] = self.requests.get(name, 0) + 1
+        self.bytes += size
+
+    def add_round_trip(self, seconds):
+        """Count round trip, and time spent waiting for reply."""
+        self.round_trips += 1
+        self.time += seconds
+
+    def update(self, other):
+        """Add values of other counters."""
+        self.calls += other.calls
+        for name, count in other.requests.items():
+            self.requests[name] = self.requests.get(name, 0) + count
+        self.round_trips += other.round_trips
+        self.bytes += other.bytes
+        self.time += other.time
+
+    def copy(self):
+        """Return copy of counters."""
+        counters = Counters(self.name)
+        counters.update(self)
+        return counters
+
+    def __str__(self):
+        requests = sorted(self.requests.items(),
+                          key=lambda item: (-item[1], item[0]))
+        return '<Counters %s calls=%s, requests=%s, round_trips=%s, ' \
+               'bytes=%s, time=%.1fms [%s]>' % \
+               (self.name, self.calls, self.total_requests,
+                self.round_trips, self.bytes, self.time * 1000,
+                ', '.join(['%s=%s' % item for item in requests]))
+
+
+def __active():
+    """Return list of active counters of the current thread."""
+    active = getattr(__THREAD_DATA, 'active', None)
+    if active is None:
+        active = __THREAD_DATA.active = []
+    return active
+
+
+def __get(name):
+    """Return global counters with given name."""
+    counters = __STATS.get(name)
+    if not counters:
+        counters = __STATS[name] = Counters(name)
+    return counters
+
+
+def begin(name):
+    """Start new scope in the current thread."""
+    counters = Counters(name)
+    counters.calls = 1
+    __active().append(counters)
+
+
+def end():
+    """Finish the last scope started in the current thread.
+
+    Counters of the finished scope are added to the global statistics, and
+    returned.
+
+    """
+    counters = __active().pop()
+    __LOCK.acquire()
+    try:
+        __get(counters.name).update(counters)
+    finally:
+        __LOCK.release()
+    return counters
+
+
+def request_sent(request):
+    """Count request sent to X Server."""
+    name = request.__class__.__name__
+    size = len(request._binary)
+    __LOCK.acquire()
+    try:
+        __get(TOTAL).add_request(name, size)
+        if not __active():
+            __get(OTHER).add_request(name, size)
+    finally:
+        __LOCK.release()
+    # NOTE: active counters are used only by the current thread
+    for counters in __active():
+        counters.add_request(name, size)
+
+
+def waited(seconds):
+    """Count round trip, and time spent waiting for reply."""
+    __LOCK.acquire()
+    try:
+        __get(TOTAL).add_round_trip(seconds)
+        if not __active():
+            __get(OTHER).add_round_trip(seconds)
+    finally:
+        __LOCK.release()
+    for counters in __active():
+        counters.add_round_trip(seconds)
+
+
+def install(display):
+    """Start counting requests sent using given Xlib.display.Display."""
+    protocol = display.display
+    if getattr(protocol, '_pywo_accounting', False):
+        return
+    send_request = protocol.send_request
+    send_and_recv = protocol.send_and_recv
+
+    def counting_send_request(request, wait_for_response):
+        # NOTE: wait_for_response is also set for requests with onerror
+        #       handler, round trips are counted in send_and_recv
+        request_sent(request)
+        return send_request(request, wait_for_response)
+
+    def timing_send_and_recv(flush=False, event=False, request=None,
+                             recv=False):
+        if request is None:
+            # not waiting for reply, no round trip
+            return send_and_recv(flush, event, request, recv)
+        start = time.time()
+        try:
+            return send_and_recv(flush, event, request, recv)
+        finally:
+            waited(time.time() - start)
+
+    protocol.send_request = counting_send_request
+    protocol.send_and_recv = timing_send_and_recv
+    protocol._pywo_accounting = True
+    log.debug('Accounting of X requests installed')
+
+
+def stats():
+    """Return {scope name: :class:`Counters`} with copy of statistics."""
+    __LOCK.acquire()
+    try:
+        return dict([(name, counters.copy())
+                     for name, counters in __STATS.items()])
+    finally:
+        __LOCK.release()
+
+
+def reset():
+    """Clear all statistics."""
+    __LOCK.acquire()
+    try:
+        __STATS.clear()
+    finally:
+        __LOCK.release()
+
+
+def log_stats(logger=log, level=logging.INFO):
+    """Log all statistics, scopes with most round trips first."""
+    all_stats = stats().values()
+    all_stats.sort(key=lambda counters: (-counters.round_trips,
+                                         counters.name))
+    for counters in all_stats:
+        logger.log(level, '%s' % counters)
+
@@ -20,6 +20,7 @@
 
 """Objects representing most basic PyWO concepts."""
 
+from fractions import Fraction
 import logging
 import re
 
@@ -60,6 +61,10 @@ class Gravity(object):
         for name in names:
             __GRAVITIES[name] = xy
 
+    # Cache of already parsed gravities {gravity_string: (x, y), }
+    __PARSED = {}
+    __MAX_PARSED = 1024
+
     def __init__(self, x, y):
         """
         `x`
@@ -102,22 +107,28 @@ class Gravity(object):
             x = 1.0 - self.x
         return Gravity(x, y)
 
-    @staticmethod
-    def parse(gravity):
+    @classmethod
+    def parse(cls, gravity):
         """Parse gravity string and return :class:`Gravity` object.
 
         It can be one of predefined __GRAVITIES, or x and y values (floating
-        numbers or those described in __SIZES).
+        numbers or expressions described in :class:`SizeExpression`).
+        Results are cached.
 
         """
         if not gravity:
             return None
-        if gravity in Gravity.__GRAVITIES:
-            x, y = Gravity.__GRAVITIES[gravity]
-            return Gravity(x, y)
-        else:
-            x, y = [Size.parse_value(xy) for xy in gravity.split(',')]
-        return Gravity(x, y)
+        xy = cls.__PARSED.get(gravity)
+        if xy is None:
+            if gravity in cls.__GRAVITIES:
+                xy = cls.__GRAVITIES[gravity]
+            else:
+                x, y = [Size.parse_value(xy) for xy in gravity.split(',')]
+                xy = (x, y)
+            if len(cls.__PARSED) >= cls.__MAX_PARSED:
+                cls.__PARSED.clear()
+            cls.__PARSED[gravity] = xy
+        return cls(*xy)
 
     def __eq__(self, other):
         return ((self.x, self.y) ==
@@ -130,22 +141,123 @@ class Gravity(object):
         return '<Gravity x=%.2f, y=%.2f>' % (self.x, self.y)
 
 
-class Size(object):
+class SizeExpression(object):
 
-    """Encapsulates width and height of the object."""
+    """Safe parser of simple arithmetic expressions used for sizes.
 
-    # Pattern matching simple calculations with floating numbers
-    __PATTERN = re.compile('^[ 0-9\.\+-/\*]+$')
+    Supports numbers, predefined size names, ``+``, ``-``, ``*``, ``/``
+    operators and parentheses. Calculations are done using 
+    ``fractions.Fraction`` so results are exact (``THIRD*3 == FULL``).
+
+    """
 
     # Predefined sizes that can be used in config files
-    __SIZES = {'FULL': '1.0',
-               'HALF': '0.5',
-               'THIRD': '1.0/3',
-               'QUARTER': '0.25', }
-    __SIZES_SHORT = {'F': '1.0',
-                     'H': '0.5',
-                     'T': '1.0/3',
-                     'Q': '0.25', }
+    NAMES = {'FULL': Fraction(1),
+             'HALF': Fraction(1, 2),
+             'THIRD': Fraction(1, 3),
+             'QUARTER': Fraction(1, 4),
+             'F': Fraction(1),
+             'H': Fraction(1, 2),
+             'T': Fraction(1, 3),
+             'Q': Fraction(1, 4), }
+
+    __TOKEN = re.compile('\s*(?:(\d+\.?\d*|\.\d+)|([A-Z_]+)|(\S))')
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.__tokens = self.__tokenize(expression)
+        self.__position = 0
+
+    def __tokenize(self, expression):
+        """Return list of (type, value) tokens."""
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = self.__TOKEN.match(expression, position)
+            number, name, operator = match.groups()
+            if number:
+                tokens.append(('number', Fraction(number)))
+            elif name:
+                if name not in self.NAMES:
+                    raise ValueError('Unknown name: %s' % name)
+                tokens.append(('number', self.NAMES[name]))
+            elif operator in '+-*/()':
+                tokens.append(('operator', operator))
+            else:
+                raise ValueError('Invalid character: %s' % operator)
+            position = match.end()
+        return tokens
+
+    def __peek(self):
+        """Return next token, without consuming it."""
+        if self.__position < len(self.__tokens):
+            return self.__tokens[self.__position]
+        return (None, None)
+
+    def __next(self):
+        """Return next token."""
+        token = self.__peek()
+        self.__position += 1
+        return token
+
+    def __expression(self):
+        """expression := term (('+' | '-') term)*"""
+        value = self.__term()
+        while self.__peek() in [('operator', '+'), ('operator', '-')]:
+            type, operator = self.__next()
+            if operator == '+':
+                value += self.__term()
+            else:
+                value -= self.__term()
+        return value
+
+    def __term(self):
+        """term := factor (('*' | '/') factor)*"""
+        value = self.__factor()
+        while self.__peek() in [('operator', '*'), ('operator', '/')]:
+            type, operator = self.__next()
+            if operator == '*':
+                value *= self.__factor()
+            else:
+                divisor = self.__factor()
+                if not divisor:
+                    raise ValueError('Division by zero: %s' % self.expression)
+                value /= divisor
+        return value
+
+    def __factor(self):
+        """factor := ('+' | '-') factor | number | '(' expression ')'"""
+        type, value = self.__next()
+        if type == 'number':
+            return value
+        if value == '-':
+            return -self.__factor()
+        if value == '+':
+            return self.__factor()
+        if value == '(':
+            value = self.__expression()
+            if self.__next() != ('operator', ')'):
+                raise ValueError('Missing ")": %s' % self.expression)
+            return value
+        raise ValueError('Can\'t parse: %s' % self.expression)
+
+    def evaluate(self):
+        """Return value of the expression as ``fractions.Fraction``."""
+        self.__position = 0
+        value = self.__expression()
+        if self.__position != len(self.__tokens):
+            raise ValueError('Can\'t parse: %s' % self.expression)
+        return value
+
+
+class Size(object):
+
+    """Encapsulates width and height of the object."""
+
+    # Cache of already parsed values {size_string: value, }
+    __PARSED = {}
+    __MAX_PARSED = 1024
 
     def __init__(self, width, height):
         self.width = width
@@ -166,22 +278,31 @@ class Size(object):
         It can be one of the predefined values, float, or expression.
         If you want to parse list of values separte them with comma.
 
+        Expressions are evaluated exactly (see :class:`SizeExpression`),
+        and returned as floats. Results are cached.
+
         """
         if not size_string.strip():
             return None
-        size = size_string
-        for name, value in cls.__SIZES.items():
-            size = size.replace(name, value)
-        for name, value in cls.__SIZES_SHORT.items():
-            size = size.replace(name, value)
-        size = [eval(value) for value in size.split(',')
-                            if value.strip() and \
-                            cls.__PATTERN.match(value)]
-        if size == []:
-            raise ValueError('Can\'t parse: %s' % (size_string))
+        size = cls.__PARSED.get(size_string)
+        if size is None:
+            size = []
+            for value in size_string.split(','):
+                if not value.strip():
+                    continue
+                try:
+                    size.append(float(SizeExpression(value).evaluate()))
+                except ValueError:
+                    # NOTE: invalid values are just skipped
+                    continue
+            if size == []:
+                raise ValueError('Can\'t parse: %s' % (size_string))
+            if len(cls.__PARSED) >= cls.__MAX_PARSED:
+                cls.__PARSED.clear()
+            cls.__PARSED[size_string] = size
         if len(size) == 1:
             return size[0]
-        return size
+        return list(size)
     
     @staticmethod
     def parse(width, height):
@@ -303,6 +424,212 @@ class Geometry(Position, Size):
                (self.x, self.y, self.width, self.height, self.x2, self.y2)
 
 
+class Region(object):
+
+    """Area made of any number of rectangles.
+
+    Like the X server's regions, area is kept in y-x banded form: a list
+    of ``(y, y2, spans)`` bands sorted from top to bottom, where `spans` is
+    a tuple of sorted ``x, x2`` pairs. Bands don't overlap, and vertically
+    adjacent bands with equal spans are always merged, so equal areas have
+    equal representation.
+
+    :meth:`union`, :meth:`subtract`, and :meth:`intersect` (also available
+    as ``|``, ``-``, ``&`` operators) sweep bands of both regions once,
+    so they are linear in the number of bands and spans. Operands can be
+    regions or :class:`Geometry` objects.
+
+    """
+
+    def __init__(self, geometries=None):
+        """
+        `geometries`
+            :class:`Geometry`, or list of :class:`Geometry` objects
+        """
+        if geometries is None:
+            geometries = []
+        elif isinstance(geometries, Geometry):
+            geometries = [geometries]
+        regions = [self.__from_rectangle(geometry.x, geometry.y,
+                                         geometry.x2, geometry.y2)
+                   for geometry in geometries]
+        # NOTE: merge pairs of regions, instead of adding geometries
+        #       one by one, to keep union of n geometries O(n log n)
+        while len(regions) > 1:
+            merged = [regions[index].union(regions[index+1])
+                      for index in xrange(0, len(regions) - 1, 2)]
+            if len(regions) % 2:
+                merged.append(regions[-1])
+            regions = merged
+        if regions:
+            self.__bands = regions[0].__bands
+        else:
+            self.__bands = []
+
+    @classmethod
+    def __from_rectangle(cls, x, y, x2, y2):
+        region = cls()
+        if x < x2 and y < y2:
+            region.__bands = [(y, y2, (x, x2))]
+        return region
+
+    @classmethod
+    def __from_bands(cls, bands):
+        region = cls()
+        region.__bands = bands
+        return region
+
+    @property
+    def bands(self):
+        """List of ``(y, y2, (x, x2, x, x2, ...))`` bands."""
+        return list(self.__bands)
+
+    @staticmethod
+    def __combine_spans(spans, other, operation):
+        """Return spans of points for which operation(in spans, in other)
+        is true."""
+        combined = []
+        inside = in_spans = in_other = False
+        index = other_index = 0
+        length, other_length = len(spans), len(other)
+        while index < length or other_index < other_length:
+            if other_index >= other_length or \
+               (index < length and spans[index] <= other[other_index]):
+                x = spans[index]
+            else:
+                x = other[other_index]
+            while index < length and spans[index] == x:
+                in_spans = not in_spans
+                index += 1
+            while other_index < other_length and other[other_index] == x:
+                in_other = not in_other
+                other_index += 1
+            if operation(in_spans, in_other) != inside:
+                inside = not inside
+                combined.append(x)
+        return tuple(combined)
+
+    def __combine(self, other, operation):
+        """Return new region, operation decides if point should be in it
+        (arguments tell if point is in self, and in other region)."""
+        if isinstance(other, Geometry):
+            other = self.__from_rectangle(other.x, other.y,
+                                          other.x2, other.y2)
+        bands, other_bands = self.__bands, other.__bands
+        edges = set()
+        for y, y2, spans in bands:
+            edges.add(y)
+            edges.add(y2)
+        for y, y2, spans in other_bands:
+            edges.add(y)
+            edges.add(y2)
+        edges = sorted(edges)
+        combined = []
+        index = other_index = 0
+        for y, y2 in zip(edges, edges[1:]):
+            while index < len(bands) and bands[index][1] <= y:
+                index += 1
+            while other_index < len(other_bands) and \
+                  other_bands[other_index][1] <= y:
+                other_index += 1
+            spans = other_spans = ()
+            if index < len(bands) and bands[index][0] <= y:
+                spans = bands[index][2]
+            if other_index < len(other_bands) and \
+               other_bands[other_index][0] <= y:
+                other_spans = other_bands[other_index][2]
+            if not spans and not other_spans:
+                continue
+            spans = self.__combine_spans(spans, other_spans, operation)
+            if not spans:
+                continue
+            if combined and combined[-1][1] == y and combined[-1][2] == spans:
+                combined[-1] = (combined[-1][0], y2, spans)
+            else:
+                combined.append((y, y2, spans))
+        return self.__from_bands(combined)
+
+    def union(self, other):
+        """Return region covering this, and other region (or geometry)."""
+        return self.__combine(other, lambda a, b: a or b)
+
+    def subtract(self, other):
+        """Return region covering this, but not other region (or geometry)."""
+        return self.__combine(other, lambda a, b: a and not b)
+
+    def intersect(self, other):
+        """Return region covering both this, and other region (or geometry)."""
+        return self.__combine(other, lambda a, b: a and b)
+
+    __or__ = union
+    __sub__ = subtract
+    __and__ = intersect
+
+    @property
+    def area(self):
+        """Number of pixels covered by the region."""
+        area = 0
+        for y, y2, spans in self.__bands:
+            width = sum([spans[index+1] - spans[index]
+                         for index in xrange(0, len(spans), 2)])
+            area += width * (y2 - y)
+        return area
+
+    @property
+    def extents(self):
+        """Smallest :class:`Geometry` containing the region (or ``None``)."""
+        if not self.__bands:
+            return None
+        x = min([spans[0] for y, y2, spans in self.__bands])
+        x2 = max([spans[-1] for y, y2, spans in self.__bands])
+        y, y2 = self.__bands[0][0], self.__bands[-1][1]
+        return Geometry(x, y, x2 - x, y2 - y)
+
+    def contains(self, other):
+        """Return ``True`` if :class:`Position`, :class:`Geometry`, or
+        other region is inside the region."""
+        if isinstance(other, Geometry):
+            other = Region(other)
+        if isinstance(other, Region):
+            return not (other - self)
+        for y, y2, spans in self.__bands:
+            if y > other.y:
+                break
+            if other.y < y2:
+                for index in xrange(0, len(spans), 2):
+                    if spans[index] <= other.x < spans[index+1]:
+                        return True
+                break
+        return False
+
+    def rectangles(self):
+        """Return list of :class:`Geometry` objects (one for each span
+        of each band) covering the region."""
+        return [Geometry(spans[index], y,
+                         spans[index+1] - spans[index], y2 - y)
+                for y, y2, spans in self.__bands
+                for index in xrange(0, len(spans), 2)]
+
+    def __iter__(self):
+        return iter(self.rectangles())
+
+    def __nonzero__(self):
+        return bool(self.__bands)
+
+    def __eq__(self, other):
+        if isinstance(other, Geometry):
+            other = Region(other)
+        if not isinstance(other, Region):
+            return NotImplemented
+        return self.__bands == other.__bands
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<Region bands=%s>' % (self.__bands, )
+
+
 class Extents(object):
 
     """Encapsulates :class:`~pywo.core.windows.Window` extents (decorations)."""
@@ -24,6 +24,8 @@ import logging
 import threading
 import time
 
+from pywo.core import accounting, timing
+
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
 
@@ -69,7 +71,7 @@ class EventDispatcher(threading.Thread):
 
     def register(self, window, handler):
         """Register event handler and return new window's event mask."""
-        log.debug('Registering %s for %s' % (handler, window))
+        log.debug('Registering %s for %s', handler, window)
         for event_type in handler.types:
             type_handlers = self.__handlers.setdefault(event_type, {})
             win_handlers = type_handlers.setdefault(window.id, set())
@@ -90,15 +92,15 @@ class EventDispatcher(threading.Thread):
             self.__handlers.clear()
             return []
         if not handler:
-            log.debug('Unregistering all handlers for %s' % (window))
+            log.debug('Unregistering all handlers for %s', window)
         else:
-            log.debug('Unregistering %s for %s' % (handler, window))
+            log.debug('Unregistering %s for %s', handler, window)
         for event_type, type_handlers in self.__handlers.items():
             if not window.id in type_handlers:
                 continue
             if handler:
                 type_handlers[window.id].discard(handler)
-            else:
+            if not handler or not type_handlers[window.id]:
                 type_handlers.pop(window.id, None)
             if not type_handlers:
                 self.__handlers.pop(event_type)
@@ -114,35 +116,52 @@ class EventDispatcher(threading.Thread):
         return masks
 
     def __dispatch(self, event):
-        """Dispatch raw X event to correct handler.
+        """Dispatch raw X event to handlers registered for the window 
+        the event is reported on.
 
-        X.KeyPress
+        X.KeyPress, X.FocusIn, X.PropertyNotify, X.ClientMessage
             event.window - window the event is reported on
-        X.DestroyNotify
-            event.window - window that was destroyed
+        X.DestroyNotify, X.MapNotify, X.UnmapNotify
+            event.event - window the event is reported on
+            event.window - window that was destroyed, (un)mapped
         X.CreateNotify
             event.parent - parent of the new window
             event.window - new window
-        X.PropertyNotify
-            event.window - window which the property was changed
+        X.ReparentNotify
+            event.event - window the event is reported on
+            event.window - reparented window
+            event.parent - new parent
         X.ConfigureNotify
             event.event - the window the event is generated for
             event.window - the window that has been changed
+        X.MappingNotify
+            not related to any window, reported on the root window
 
         """
         if not event.type in self.__handlers:
             # Just skip unwanted events types
             return
         type_handlers = self.__handlers[event.type]
-        handlers = []
-        if hasattr(event, 'parent') and event.parent.id in type_handlers:
-            handlers.extend(type_handlers[event.parent.id])
-        elif hasattr(event, 'event') and event.event.id in type_handlers:
-            handlers.extend(type_handlers[event.event.id])
-        elif hasattr(event, 'window') and event.window.id in type_handlers:
-            handlers.extend(type_handlers[event.window.id])
-        if self.__root in type_handlers:
-            handlers.extend(type_handlers[self.__root])
+        if hasattr(event, 'event'):
+            window_id = event.event.id
+        elif hasattr(event, 'parent'):
+            window_id = event.parent.id
+        elif hasattr(event, 'window'):
+            window_id = event.window.id
+        else:
+            window_id = self.__root.id
+        handlers = list(type_handlers.get(window_id, ()))
         for handler in handlers:
-            handler.handle_event(event)
+            scope = 'event:%s' % handler.name(event.type)
+            accounting.begin(scope)
+            start = time.time()
+            try:
+                try:
+                    handler.handle_event(event)
+                except Exception:
+                    timing.failure(scope)
+                    raise
+            finally:
+                timing.record(scope, 'total', time.time() - start)
+                accounting.end()
 
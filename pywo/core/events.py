@@ -70,21 +70,36 @@ class EventHandler(object):
 
     """Abstract base class for event handlers."""
 
-    def __init__(self, masks, mapping):
+    def __init__(self, masks, mapping, callbacks=None):
         """
         `mask`
             `X.EventMask`
         `mapping`
             dict of `X.EventType` and associated functions or methods
+        `callbacks`
+            dict of `X.EventType` and functions provided by the user of
+            the handler (used to name the handler in timing statistics)
         """
         self.masks = masks
         self.__mapping = mapping
+        self.__callbacks = callbacks or {}
 
     @property
     def types(self):
         """Return set of `EventHandler`'s event types."""
         return self.__mapping.keys()
 
+    def name(self, event_type):
+        """Return name of the function handling given event type."""
+        callback = self.__callbacks.get(event_type)
+        name = getattr(callback, '__name__', None)
+        if not name:
+            return self.__class__.__name__
+        owner = getattr(callback, 'im_self', None)
+        if owner is not None:
+            name = '%s.%s' % (owner.__class__.__name__, name)
+        return '%s.%s' % (getattr(callback, '__module__', None), name)
+
     def handle_event(self, event):
         """Wrap raw X event into :class:`Event` and call handler method."""
         event_type, handler_method = self.__mapping[event.type]
@@ -147,7 +162,9 @@ class KeyHandler(EventHandler):
         """
         EventHandler.__init__(self, [X.KeyPressMask, X.KeyReleaseMask], 
                               {X.KeyPress: (KeyEvent, self.key_press),
-                               X.KeyRelease: (KeyEvent, self.key_release)})
+                               X.KeyRelease: (KeyEvent, self.key_release)},
+                              {X.KeyPress: key_press,
+                               X.KeyRelease: key_release})
         self.__key_press = key_press
         self.__key_release = key_release
         self.keys = keys or []
@@ -207,7 +224,9 @@ class FocusHandler(EventHandler):
     def __init__(self, focus_in=None, focus_out=None):
         EventHandler.__init__(self, [X.FocusChangeMask],
                               {X.FocusIn: (FocusEvent, self.focus_in),
-                               X.FocusOut: (FocusEvent, self.focus_out)})
+                               X.FocusOut: (FocusEvent, self.focus_out)},
+                              {X.FocusIn: focus_in,
+                               X.FocusOut: focus_out})
         self.__focus_in = focus_in
         self.__focus_out = focus_out
 
@@ -243,12 +262,13 @@ class DestroyNotifyHandler(EventHandler):
         `destroy`
             function that will handle events
         `children`
-            ``False`` - listen for children windows' events
-            ``True`` - listen for window's events
+            ``False`` - listen for window's events
+            ``True`` - listen for children windows' events
         """
         EventHandler.__init__(self, [_SUBSTRUCTURE[bool(children)]],
                               {X.DestroyNotify: (DestroyNotifyEvent, 
-                                                 self.destroy)})
+                                                 self.destroy)},
+                              {X.DestroyNotify: destroy})
         self.__destroy = destroy
 
     def destroy(self, event):
@@ -257,6 +277,122 @@ class DestroyNotifyHandler(EventHandler):
             self.__destroy(event)
 
 
+class MapNotifyEvent(Event):
+
+    """Class representing `X.MapNotify` events.
+    
+    This event is generated when a window is mapped.
+    
+    """
+
+    def __init__(self, event):
+        Event.__init__(self, event)
+        self.override = event.override
+
+
+class MapNotifyHandler(EventHandler):
+
+    """Handler for `X.MapNotify` events."""
+
+    def __init__(self, map=None, children=False):
+        """
+        `map`
+            function that will handle events
+        `children`
+            ``False`` - listen for window's events
+            ``True`` - listen for children windows' events
+        """
+        EventHandler.__init__(self, [_SUBSTRUCTURE[bool(children)]],
+                              {X.MapNotify: (MapNotifyEvent, self.map)},
+                              {X.MapNotify: map})
+        self.__map = map
+
+    def map(self, event):
+        """Handle :class:`MapNotifyEvent` generated by `X.MapNotify`."""
+        if not event.override and self.__map:
+            self.__map(event)
+
+
+class UnmapNotifyEvent(Event):
+
+    """Class representing `X.UnmapNotify` events.
+    
+    This event is generated when a window is unmapped.
+    
+    """
+
+    def __init__(self, event):
+        Event.__init__(self, event)
+        self.from_configure = event.from_configure
+
+
+class UnmapNotifyHandler(EventHandler):
+
+    """Handler for `X.UnmapNotify` events."""
+
+    def __init__(self, unmap=None, children=False):
+        """
+        `unmap`
+            function that will handle events
+        `children`
+            ``False`` - listen for window's events
+            ``True`` - listen for children windows' events
+        """
+        EventHandler.__init__(self, [_SUBSTRUCTURE[bool(children)]],
+                              {X.UnmapNotify: (UnmapNotifyEvent, self.unmap)},
+                              {X.UnmapNotify: unmap})
+        self.__unmap = unmap
+
+    def unmap(self, event):
+        """Handle :class:`UnmapNotifyEvent` generated by `X.UnmapNotify`."""
+        if self.__unmap:
+            self.__unmap(event)
+
+
+class ReparentNotifyEvent(Event):
+
+    """Class representing `X.ReparentNotify` events.
+    
+    This event is generated when a window is reparented, for example
+    when window manager puts new window into its frame.
+    
+    """
+
+    def __init__(self, event):
+        Event.__init__(self, event)
+        self.parent_id = event.parent.id
+        self.override = event.override
+
+    @property
+    def parent(self):
+        """New parent of the window."""
+        return Window(self.parent_id)
+
+
+class ReparentNotifyHandler(EventHandler):
+
+    """Handler for `X.ReparentNotify` events."""
+
+    def __init__(self, reparent=None, children=False):
+        """
+        `reparent`
+            function that will handle events
+        `children`
+            ``False`` - listen for window's events
+            ``True`` - listen for children windows' events
+        """
+        EventHandler.__init__(self, [_SUBSTRUCTURE[bool(children)]],
+                              {X.ReparentNotify: (ReparentNotifyEvent, 
+                                                  self.reparent)},
+                              {X.ReparentNotify: reparent})
+        self.__reparent = reparent
+
+    def reparent(self, event):
+        """Handle :class:`ReparentNotifyEvent` generated by `X.ReparentNotify`."""
+        if not event.override and self.__reparent:
+            self.__reparent(event)
+
+
 class CreateNotifyEvent(Event):
 
     """Class representing `X.CreateNotify` events.
@@ -301,7 +437,8 @@ class CreateNotifyHandler(EventHandler):
         """
         EventHandler.__init__(self, [X.SubstructureNotifyMask],
                               {X.CreateNotify: (CreateNotifyEvent, 
-                                                self.create)})
+                                                self.create)},
+                              {X.CreateNotify: create})
         self.__create = create
 
     def create(self, event):
@@ -343,7 +480,8 @@ class PropertyNotifyHandler(EventHandler):
         """
         EventHandler.__init__(self, [X.PropertyChangeMask], 
                               {X.PropertyNotify: (PropertyNotifyEvent, 
-                                                  self.property)})
+                                                  self.property)},
+                              {X.PropertyNotify: property})
         self.__property = property
 
     def property(self, event):
@@ -352,6 +490,60 @@ class PropertyNotifyHandler(EventHandler):
             self.__property(event)
 
 
+class ClientMessageEvent(Event):
+
+    """Class representing `X.ClientMessage` events.
+    
+    This event is generated when a client sends message to the window
+    (for example EWMH requests sent to the root window).
+    
+    """
+
+    def __init__(self, event):
+        Event.__init__(self, event)
+        self.atom = event.client_type
+        self.format, self.data = event.data
+
+    @property
+    def atom_name(self):
+        """Return message type name."""
+        return Window.atom_name(self.atom)
+
+
+class ClientMessageHandler(EventHandler):
+
+    """Handler for `X.ClientMessage` events.
+    
+    Messages sent to the root window are delivered only to clients listening
+    for `X.SubstructureNotify` events, so this mask is used.
+    
+    """
+
+    def __init__(self, message=None, names=None):
+        """
+        `message`
+            function that will handle events
+        `names`
+            list of message types (atom names) to handle, all messages are
+            handled if not set
+        """
+        EventHandler.__init__(self, [X.SubstructureNotifyMask],
+                              {X.ClientMessage: (ClientMessageEvent, 
+                                                 self.message)},
+                              {X.ClientMessage: message})
+        self.__message = message
+        self.__atoms = None
+        if names:
+            self.__atoms = set([Window.atom(name) for name in names])
+
+    def message(self, event):
+        """Handle :class:`ClientMessageEvent` generated by `X.ClientMessage`."""
+        if self.__atoms and not event.atom in self.__atoms:
+            return
+        if self.__message:
+            self.__message(event)
+
+
 class ConfigureNotifyEvent(Event):
 
     """Class representing `X.ConfigureNotify` events.
@@ -364,6 +556,9 @@ class ConfigureNotifyEvent(Event):
         Event.__init__(self, event)
         self.border_width = event.border_width
         self.override = event.override
+        # NOTE: synthetic events (sent by window manager) have coordinates
+        #       relative to the root window, not to the parent (frame)
+        self.synthetic = bool(event.send_event)
 
     @ property
     def geometry(self):
@@ -381,12 +576,13 @@ class ConfigureNotifyHandler(EventHandler):
         `configure`
             function that will handle events
         `children`
-            ``False`` - listen for children windows' events,
-            ``True`` - listen for window's events
+            ``False`` - listen for window's events
+            ``True`` - listen for children windows' events
         """
         EventHandler.__init__(self, [_SUBSTRUCTURE[bool(children)]], 
                               {X.ConfigureNotify: (ConfigureNotifyEvent, 
-                                                   self.configure)})
+                                                   self.configure)},
+                              {X.ConfigureNotify: configure})
         self.__configure = configure
 
     def configure(self, event):
@@ -396,3 +592,49 @@ class ConfigureNotifyHandler(EventHandler):
             self.__configure(event)
 
 
+class MappingNotifyEvent(Event):
+
+    """Class representing `X.MappingNotify` events.
+
+    This event is generated when keyboard, or pointer mapping is changed.
+    It is not related to any window, so :attr:`window` is the root window.
+
+    """
+
+    MODIFIER = X.MappingModifier
+    KEYBOARD = X.MappingKeyboard
+    POINTER = X.MappingPointer
+
+    def __init__(self, event):
+        self._event = event
+        self.type = event.type
+        self.window_id = None
+        self.request = event.request
+        self.first_keycode = event.first_keycode
+        self.count = event.count
+
+
+class MappingNotifyHandler(EventHandler):
+
+    """Handler for `X.MappingNotify` events.
+
+    These events are always sent to all clients, handler should be 
+    registered for the root window.
+
+    """
+
+    def __init__(self, mapping=None):
+        """
+        `mapping`
+            function that will handle events
+        """
+        EventHandler.__init__(self, [],
+                              {X.MappingNotify: (MappingNotifyEvent, 
+                                                 self.mapping)},
+                              {X.MappingNotify: mapping})
+        self.__mapping = mapping
+
+    def mapping(self, event):
+        """Handle :class:`MappingNotifyEvent` generated by `X.MappingNotify`."""
+        if self.__mapping:
+            self.__mapping(event)
@@ -0,0 +1,163 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Free space on the workarea not occupied by windows.
+
+:func:`free_rectangles` returns all maximal empty rectangles (empty
+rectangles that can't be extended in any direction). Occupied rectangles
+are processed in order of their left edges, each one splits only free
+rectangles it overlaps into at most four pieces, and only new pieces are
+checked if they are contained in other free rectangles.
+
+"""
+
+import logging
+
+from pywo.core.basic import Geometry
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+def __split(free, occupied):
+    """Return parts of free rectangle not overlapped by occupied one.
+
+    Rectangles are (x, y, x2, y2) tuples.
+
+    """
+    x, y, x2, y2 = free
+    occupied_x, occupied_y, occupied_x2, occupied_y2 = occupied
+    parts = []
+    if occupied_x > x:
+        parts.append((x, y, occupied_x, y2))
+    if occupied_x2 < x2:
+        parts.append((occupied_x2, y, x2, y2))
+    if occupied_y > y:
+        parts.append((x, y, x2, occupied_y))
+    if occupied_y2 < y2:
+        parts.append((x, occupied_y2, x2, y2))
+    return parts
+
+
+def free_rectangles(workarea, occupied):
+    """Return list of maximal empty rectangles as
+    :class:`~pywo.core.basic.Geometry` objects.
+
+    `workarea`
+        :class:`~pywo.core.basic.Geometry` of the whole available area
+    `occupied`
+        list of :class:`~pywo.core.basic.Geometry` of occupied rectangles
+
+    """
+    area_x, area_y, area_x2, area_y2 = \
+            workarea.x, workarea.y, workarea.x2, workarea.y2
+    occupied_rects = []
+    for geometry in occupied:
+        rect = (max(geometry.x, area_x), max(geometry.y, area_y),
+                min(geometry.x2, area_x2), min(geometry.y2, area_y2))
+        if rect[0] < rect[2] and rect[1] < rect[3]:
+            occupied_rects.append(rect)
+    occupied_rects.sort()
+    free = [(area_x, area_y, area_x2, area_y2)]
+    if area_x >= area_x2 or area_y >= area_y2:
+        free = []
+    for rect in occupied_rects:
+        x, y, x2, y2 = rect
+        kept = []
+        touching = [] # kept rectangles touching occupied one
+        parts = []
+        for free_rect in free:
+            free_x, free_y, free_x2, free_y2 = free_rect
+            if free_x > x2 or x > free_x2 or free_y > y2 or y > free_y2:
+                kept.append(free_rect)
+            elif free_x == x2 or x == free_x2 or \
+                 free_y == y2 or y == free_y2:
+                kept.append(free_rect)
+                touching.append(free_rect)
+            else:
+                parts.extend(__split(free_rect, rect))
+        # NOTE: every part touches occupied rectangle, so it can be 
+        #       contained only in other part, or touching rectangle
+        others = touching + parts
+        for index, part in enumerate(parts):
+            part_x, part_y, part_x2, part_y2 = part
+            for other_index, other in enumerate(others):
+                if other[0] <= part_x and other[1] <= part_y and \
+                   other[2] >= part_x2 and other[3] >= part_y2 and \
+                   not other is part and \
+                   (other != part or other_index < len(touching) + index):
+                    break
+            else:
+                kept.append(part)
+        free = kept
+    return [Geometry(x, y, x2 - x, y2 - y) for x, y, x2, y2 in free]
+
+
+def __overlap_area(geometry, other):
+    """Return area of the intersection of two geometries."""
+    width = min(geometry.x2, other.x2) - max(geometry.x, other.x)
+    height = min(geometry.y2, other.y2) - max(geometry.y, other.y)
+    return max(width, 0) * max(height, 0)
+
+
+def largest(rectangles, overlapping=None):
+    """Return the rectangle with the largest area (or ``None``).
+
+    If `overlapping` geometry is given only rectangles overlapping it
+    are checked, the one with the largest overlap area is chosen from
+    rectangles of equal area.
+
+    """
+    if overlapping:
+        rectangles = [rect for rect in rectangles
+                           if __overlap_area(rect, overlapping)]
+        key = lambda rect: (rect.width * rect.height,
+                            __overlap_area(rect, overlapping))
+    else:
+        key = lambda rect: rect.width * rect.height
+    if not rectangles:
+        return None
+    return max(rectangles, key=key)
+
+
+def place(workarea, occupied, width, height, near=None):
+    """Return :class:`~pywo.core.basic.Geometry` with given size placed
+    in free space as close as possible to the `near` position (top left
+    corner of the workarea by default), or ``None`` if there's no place.
+
+    """
+    near = near or workarea
+    best = None
+    for rect in free_rectangles(workarea, occupied):
+        if rect.width < width or rect.height < height:
+            continue
+        x = min(max(near.x, rect.x), rect.x2 - width)
+        y = min(max(near.y, rect.y), rect.y2 - height)
+        distance = (x - near.x) ** 2 + (y - near.y) ** 2
+        if best is None or distance < best[0]:
+            best = (distance, x, y)
+    if best is None:
+        return None
+    distance, x, y = best
+    return Geometry(x, y, width, height)
+
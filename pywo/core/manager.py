@@ -37,7 +37,8 @@ from pywo.core.basic import Position, Size, Geometry
 from pywo.core.basic import Layout
 from pywo.core.enums import ManagerType
 from pywo.core.xlib import XObject
-from pywo.core.windows import Window
+from pywo.core.windows import Window, WindowSnapshot
+from pywo.core.world import WORLD
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok, Antti Kaihola"
@@ -72,6 +73,22 @@ class WindowManager(XObject):
 #        XObject.__init__(self)
 #        self.update_type()
 
+    @property
+    def world(self):
+        """Return :class:`~pywo.core.world.WorldModel` of the root window."""
+        return WORLD
+
+    def get_property(self, name):
+        """Return property (``None`` if there's no such property).
+        
+        If :attr:`world` model is running, and tracks the property, 
+        its current value is returned without asking X server.
+        
+        """
+        if WORLD.tracks(name):
+            return WORLD.get_property(name)
+        return XObject.get_property(self, name)
+
     @property
     def name(self):
         """Return window manager's name.
@@ -79,11 +96,10 @@ class WindowManager(XObject):
         ``''`` is returned if window manager doesn't support EWMH.
 
         """
-        # _NET_SUPPORTING_WM_CHECK, WINDOW/32
-        win_id = self.get_property('_NET_SUPPORTING_WM_CHECK')
+        win_id = self.supporting_wm_check_id()
         if not win_id:
             return ''
-        win = XObject(win_id.value[0])
+        win = XObject(win_id)
         name = win.get_property('_NET_WM_NAME')
         if name:
             return name.value
@@ -96,7 +112,11 @@ class WindowManager(XObject):
         return self.wm_type
     
     def update_type(self):
-        """Update window manager's type."""
+        """Update window manager's type.
+        
+        Return ``True`` if type has changed.
+        
+        """
         recognize = {'compiz': ManagerType.COMPIZ, 
                      'metacity': ManagerType.METACITY,
                      'kwin': ManagerType.KWIN, 
@@ -111,11 +131,21 @@ class WindowManager(XObject):
                      'pekwm': ManagerType.PEKWM,
                      'gnome shell': ManagerType.GNOME_SHELL,
                     }
+        old_type = self.wm_type
         name = self.name.lower()
         XObject.set_wm_type(ManagerType.UNKNOWN)
         for name_part, wm_type in recognize.items():
             if name_part in name:
                 XObject.set_wm_type(wm_type)
+        return not self.wm_type == old_type
+
+    def supporting_wm_check_id(self):
+        """Return id of the window manager's check window or ``None``."""
+        # _NET_SUPPORTING_WM_CHECK, WINDOW/32
+        win_id = self.get_property('_NET_SUPPORTING_WM_CHECK')
+        if win_id:
+            return win_id.value[0]
+        return None
 
     @property
     def desktops(self):
@@ -295,14 +325,26 @@ class WindowManager(XObject):
             windows_ids = self.get_property('_NET_CLIENT_LIST_STACKING').value
         else:
             windows_ids = self.get_property('_NET_CLIENT_LIST').value
+        # NOTE: property might be shared (world model), don't change it
+        windows_ids = list(windows_ids)
         windows_ids.reverse()
         return windows_ids
 
-    def windows(self, filter=None, match='', stacking=True):
-        """Return list of all windows (newest/on top first)."""
+    def windows(self, filter=None, match='', stacking=True,
+                snapshot=False, geometries=None):
+        """Return list of all windows (newest/on top first).
+
+        If `snapshot` is ``True`` basic properties of all windows are read
+        at once, see :class:`~pywo.core.windows.WindowSnapshot` (and
+        `geometries` of windows already known).
+
+        """
         # TODO: regexp matching?
         windows_ids = self.windows_ids(stacking)
-        windows = [Window(win_id) for win_id in windows_ids]
+        if snapshot:
+            windows = WindowSnapshot.read(windows_ids, geometries)
+        else:
+            windows = [Window(win_id) for win_id in windows_ids]
         if filter:
             windows = [window for window in windows if filter(window)]
         if match:
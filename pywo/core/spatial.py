@@ -0,0 +1,161 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Spatial index of geometries for neighbour in direction queries.
+
+:class:`SpatialIndex` keeps geometries sorted by centers of both axes.
+Query starts with binary search, and sweeps in given direction. Sweep
+stops early only after a geometry overlapping in perpendicular axis is
+found (usually after a few closest geometries are checked); if there is
+no such geometry all geometries in given direction are checked.
+
+"""
+
+import bisect
+import logging
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class SpatialIndex(object):
+
+    """Geometries sorted by centers, nearest neighbour in direction queries.
+
+    Geometries overlapping in perpendicular axis are always preferred, and
+    the nearest one (by distance between centers) is chosen. Otherwise
+    score is the distance between centers plus the gap in perpendicular
+    axis multiplied by :attr:`GAP_WEIGHT`.
+
+    """
+
+    GAP_WEIGHT = 2
+
+    def __init__(self, geometries=None):
+        """
+        `geometries`
+            dict of keys (for example windows' ids) and geometries
+        """
+        self.__geometries = {} # {key: geometry, }
+        self.__xs = [] # sorted [(doubled center x, key), ]
+        self.__ys = [] # sorted [(doubled center y, key), ]
+        for key, geometry in (geometries or {}).items():
+            self.insert(key, geometry)
+
+    @staticmethod
+    def __centers(geometry):
+        """Return doubled center coordinates (int if geometry is int)."""
+        return (geometry.x + geometry.x2, geometry.y + geometry.y2)
+
+    def insert(self, key, geometry):
+        """Insert (or update) geometry with given key."""
+        if key in self.__geometries:
+            self.remove(key)
+        self.__geometries[key] = geometry
+        x, y = self.__centers(geometry)
+        bisect.insort(self.__xs, (x, key))
+        bisect.insort(self.__ys, (y, key))
+
+    def remove(self, key):
+        """Remove geometry with given key (if present)."""
+        geometry = self.__geometries.pop(key, None)
+        if geometry is None:
+            return
+        x, y = self.__centers(geometry)
+        del self.__xs[bisect.bisect_left(self.__xs, (x, key))]
+        del self.__ys[bisect.bisect_left(self.__ys, (y, key))]
+
+    def get(self, key):
+        """Return geometry with given key (or ``None``)."""
+        return self.__geometries.get(key)
+
+    def keys(self):
+        """Return list of all keys."""
+        return self.__geometries.keys()
+
+    def __contains__(self, key):
+        return key in self.__geometries
+
+    def __len__(self):
+        return len(self.__geometries)
+
+    @staticmethod
+    def __gap(start, end, other_start, other_end):
+        """Return gap between two segments (``None`` if they overlap)."""
+        if other_start < end and start < other_end:
+            return None
+        return max(other_start - end, start - other_end)
+
+    def nearest(self, geometry, direction, exclude=None):
+        """Return key of the nearest geometry in given direction (or
+        ``None``).
+
+        `direction` must be :class:`~pywo.core.basic.Gravity` pointing
+        left, right, up, or down, otherwise `ValueError` is raised.
+        Only geometries with center beyond the center of given `geometry`
+        are checked. Key given as `exclude` is skipped. Query is linear if
+        there is no geometry overlapping in perpendicular axis (any such
+        geometry is preferred, no matter how far it is).
+
+        """
+        if direction.is_middle or direction.is_diagonal:
+            raise ValueError('direction must be left, right, up, or down')
+        center_x, center_y = self.__centers(geometry)
+        if direction.is_left or direction.is_right:
+            centers, center = self.__xs, center_x
+            start, end, perpendicular = 'y', 'y2', center_y
+            perpendicular_index = 1
+        else:
+            centers, center = self.__ys, center_y
+            start, end, perpendicular = 'x', 'x2', center_x
+            perpendicular_index = 0
+        # NOTE: (center, ) is less than any (center, key)
+        index = bisect.bisect_left(centers, (center, ))
+        if direction.is_right or direction.is_bottom:
+            while index < len(centers) and centers[index][0] == center:
+                index += 1
+            indexes = xrange(index, len(centers))
+        else:
+            indexes = xrange(index - 1, -1, -1)
+        best_key = None
+        best_score = None
+        for index in indexes:
+            other_center, key = centers[index]
+            distance = abs(other_center - center)
+            if best_score is not None and not best_score[0] and \
+               distance > best_score[1]:
+                # NOTE: score is never less than distance
+                break
+            if key == exclude:
+                continue
+            other = self.__geometries[key]
+            gap = self.__gap(getattr(geometry, start), getattr(geometry, end),
+                             getattr(other, start), getattr(other, end))
+            offset = abs(self.__centers(other)[perpendicular_index] -
+                         perpendicular)
+            score = (gap is not None, 
+                     distance + 2 * (gap or 0) * self.GAP_WEIGHT, offset)
+            if best_score is None or score < best_score:
+                best_key, best_score = key, score
+        return best_key
+
@@ -0,0 +1,229 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Latency histograms of actions and event handlers.
+
+Time of every phase of action call (``check_filter``, ``pre_perform``,
+``perform``, ``post_perform``, and ``total``), and of every event handler
+call is recorded in :class:`Histogram` with fixed buckets, so recording
+is cheap and memory usage doesn't grow.
+
+Statistics can be dumped in Prometheus text format using :func:`dump`.
+
+"""
+
+import logging
+import os
+import tempfile
+import threading
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+BUCKETS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+DUMP = False
+"""Statistics are written to file by ``stats`` action only if set (by the
+daemon), short living processes must not overwrite daemon's statistics."""
+"""Upper bounds of histogram buckets in milliseconds."""
+
+__LOCK = threading.Lock()
+__HISTOGRAMS = {} # {(scope name, phase): Histogram, }
+
+
+class Histogram(object):
+
+    """Histogram of durations with fixed buckets."""
+
+    def __init__(self, scope, phase):
+        self.scope = scope
+        self.phase = phase
+        self.counts = [0] * (len(BUCKETS) + 1) # last one is +Inf
+        self.count = 0
+        self.sum = 0.0 # milliseconds
+        self.max = 0.0 # milliseconds
+        self.failures = 0
+        self.exceptions = 0
+
+    def add(self, duration):
+        """Record duration in milliseconds."""
+        index = 0
+        for bound in BUCKETS:
+            if duration <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, percent):
+        """Return estimated percentile (0-100) in milliseconds.
+
+        Value is interpolated linearly inside the bucket.
+
+        """
+        if not self.count:
+            return 0.0
+        rank = self.count * percent / 100.0
+        cumulative = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = index < len(BUCKETS) and BUCKETS[index] or self.max
+            if count and cumulative + count >= rank:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * \
+                               (rank - cumulative) / float(count)
+            cumulative += count
+            lower = upper
+        return self.max
+
+    def copy(self):
+        """Return copy of the histogram."""
+        histogram = Histogram(self.scope, self.phase)
+        histogram.__dict__.update(self.__dict__)
+        histogram.counts = list(self.counts)
+        return histogram
+
+    def __str__(self):
+        return '<Histogram %s %s count=%s, p50=%.1fms, p95=%.1fms, ' \
+               'p99=%.1fms, max=%.1fms, failures=%s, exceptions=%s>' % \
+               (self.scope, self.phase, self.count,
+                self.percentile(50), self.percentile(95),
+                self.percentile(99), self.max,
+                self.failures, self.exceptions)
+
+
+def __get(scope, phase):
+    """Return histogram with given scope, and phase."""
+    histogram = __HISTOGRAMS.get((scope, phase))
+    if not histogram:
+        histogram = __HISTOGRAMS[(scope, phase)] = Histogram(scope, phase)
+    return histogram
+
+
+def record(scope, phase, seconds):
+    """Record duration of the phase."""
+    __LOCK.acquire()
+    try:
+        __get(scope, phase).add(seconds * 1000)
+    finally:
+        __LOCK.release()
+
+
+def failure(scope, exception=False):
+    """Count failed call (or expected exception if `exception` is true)."""
+    __LOCK.acquire()
+    try:
+        histogram = __get(scope, 'total')
+        if exception:
+            histogram.exceptions += 1
+        else:
+            histogram.failures += 1
+    finally:
+        __LOCK.release()
+
+
+def stats():
+    """Return sorted list with copies of all histograms."""
+    __LOCK.acquire()
+    try:
+        return [histogram.copy()
+                for key, histogram in sorted(__HISTOGRAMS.items())]
+    finally:
+        __LOCK.release()
+
+
+def reset():
+    """Clear all histograms."""
+    __LOCK.acquire()
+    try:
+        __HISTOGRAMS.clear()
+    finally:
+        __LOCK.release()
+
+
+def log_stats(logger=log, level=logging.INFO):
+    """Log all histograms."""
+    for histogram in stats():
+        logger.log(level, '%s' % histogram)
+
+
+def __escape(value):
+    """Escape label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def prometheus_text():
+    """Return all histograms in Prometheus text exposition format."""
+    lines = ['# HELP pywo_duration_milliseconds '
+             'Duration of actions and event handlers.',
+             '# TYPE pywo_duration_milliseconds histogram']
+    failures = ['# HELP pywo_failures_total Failed calls.',
+                '# TYPE pywo_failures_total counter']
+    exceptions = ['# HELP pywo_action_exceptions_total '
+                  'Calls ended with ActionException.',
+                  '# TYPE pywo_action_exceptions_total counter']
+    for histogram in stats():
+        labels = 'scope="%s",phase="%s"' % (__escape(histogram.scope),
+                                            __escape(histogram.phase))
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ['+Inf'], histogram.counts):
+            cumulative += count
+            lines.append('pywo_duration_milliseconds_bucket{%s,le="%s"} %s' %
+                         (labels, bound, cumulative))
+        lines.append('pywo_duration_milliseconds_sum{%s} %s' %
+                     (labels, histogram.sum))
+        lines.append('pywo_duration_milliseconds_count{%s} %s' %
+                     (labels, histogram.count))
+        if histogram.phase == 'total':
+            scope = 'scope="%s"' % __escape(histogram.scope)
+            failures.append('pywo_failures_total{%s} %s' %
+                            (scope, histogram.failures))
+            exceptions.append('pywo_action_exceptions_total{%s} %s' %
+                              (scope, histogram.exceptions))
+    return '\n'.join(lines + failures + exceptions) + '\n'
+
+
+def dump_path():
+    """Return default path of the Prometheus text dump file."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'pywo.prom')
+    return os.path.join(tempfile.gettempdir(), 'pywo-%s.prom' % os.getuid())
+
+
+def dump(path=None):
+    """Write histograms in Prometheus text format, return path of the file."""
+    path = path or dump_path()
+    # NOTE: write to temporary file first, so readers never see partial file
+    temp_path = '%s.%s' % (path, os.getpid())
+    dump_file = open(temp_path, 'w')
+    try:
+        dump_file.write(prometheus_text())
+    finally:
+        dump_file.close()
+    os.rename(temp_path, path)
+    log.debug('Statistics written to %s', path)
+    return path
+
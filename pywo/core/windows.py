@@ -31,7 +31,7 @@
 
 import logging
 
-from Xlib import X, Xutil, Xatom
+from Xlib import X, Xutil, Xatom, error
 
 from pywo.core.basic import CustomTuple
 from pywo.core.basic import Gravity, Geometry, Extents, Strut
@@ -83,6 +83,11 @@ class Window(XObject):
         else:
             return None
 
+    @property
+    def reparented(self):
+        """Return ``True`` if window was reparented by window manager."""
+        return self._win.query_tree().parent.id != self._root_id
+
     @property
     def parent(self):
         """Return window's parent."""
@@ -111,12 +116,39 @@ class Window(XObject):
             return '.'.join(class_name)
         return ''
 
+    @property
+    def role(self):
+        """Return window's role (``''`` if not set)."""
+        # WM_WINDOW_ROLE, STRING
+        role = self.get_property('WM_WINDOW_ROLE')
+        if not role:
+            return ''
+        return role.value
+
+    @property
+    def pid(self):
+        """Return id of window's process (``None`` if unknown)."""
+        # _NET_WM_PID, CARDINAL/32
+        pid = self.get_property('_NET_WM_PID')
+        if not pid:
+            return None
+        return pid.value[0]
+
     @property
     def client_machine(self):
         """Return name of window's client machine."""
         client = self._win.get_wm_client_machine()
         return client
 
+    @property
+    def mapped(self):
+        """Return ``True`` if window is mapped (``None`` if destroyed)."""
+        try:
+            attributes = self._win.get_attributes()
+        except error.BadWindow:
+            return None
+        return attributes.map_state != X.IsUnmapped
+
     @property
     def desktop(self):
         """Return :ref:`desktop` number the window is on.
@@ -514,3 +546,70 @@ class Window(XObject):
         logger.info('Attributes=%s' % getattr(win.get_attributes(), '_data'))
         logger.info('Query_tree=%s' % getattr(win.query_tree(), '_data'))
 
+
+class WindowSnapshot(Window):
+
+    """Window with basic properties read together with other windows.
+
+    Use :meth:`read` to get snapshots of many windows, properties listed
+    in :attr:`PROPERTIES` are read in one round trip. Other properties are
+    read from X server as usual. If geometry is given it is returned
+    instead of asking X server.
+
+    """
+
+    PROPERTIES = ['_NET_WM_NAME', 'WM_NAME', 'WM_CLASS', '_NET_WM_DESKTOP',
+                  '_NET_WM_WINDOW_TYPE', '_NET_WM_STATE', ]
+
+    def __init__(self, win_id, properties, geometry=None):
+        Window.__init__(self, win_id)
+        self.__properties = properties
+        self.__geometry = geometry
+
+    @classmethod
+    def read(cls, windows_ids, geometries=None):
+        """Return list of snapshots of windows with given ids.
+
+        `geometries` is {win_id: geometry} of windows with already known
+        geometry (for example from the spatial index).
+
+        """
+        geometries = geometries or {}
+        windows = [Window(win_id) for win_id in windows_ids]
+        properties = cls.read_properties(windows, cls.PROPERTIES)
+        return [cls(window.id, window_properties, geometries.get(window.id))
+                for window, window_properties in zip(windows, properties)]
+
+    def get_property(self, name):
+        if name in self.__properties:
+            return self.__properties[name]
+        return Window.get_property(self, name)
+
+    @property
+    def name(self):
+        name = self.get_property('_NET_WM_NAME') or \
+               self.get_property('WM_NAME')
+        if not name:
+            return ''
+        return name.value
+
+    @property
+    def class_name(self):
+        wm_class = self.get_property('WM_CLASS')
+        if not wm_class:
+            return ''
+        parts = wm_class.value.split('\0')
+        if len(parts) < 2:
+            return ''
+        return '.'.join(parts[:2])
+
+    @property
+    def geometry(self):
+        if self.__geometry is None:
+            return Window.geometry.fget(self)
+        geometry = self.__geometry
+        return Geometry(geometry.x, geometry.y,
+                        geometry.width, geometry.height)
+
+    def __repr__(self):
+        return '<WindowSnapshot id=%s>' % (self.id,)
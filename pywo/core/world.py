@@ -0,0 +1,197 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""In-memory model of the root window's EWMH properties.
+
+When started (in daemon mode) :class:`WorldModel` reads all tracked
+properties once, and then updates them on `X.PropertyNotify` events, so
+:class:`~pywo.core.manager.WindowManager` doesn't need to ask X server
+every time current desktop, workarea, list of windows, etc is needed.
+
+Properties that might be changed by a request sent to the window manager
+(current desktop, active window, etc) are read from X server again, until
+the window manager updates them (or :attr:`WorldModel.STALE_TIMEOUT` passes).
+
+"""
+
+import logging
+import threading
+import time
+
+from pywo.core.events import PropertyNotifyHandler
+from pywo.core.xlib import XObject
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class WorldModel(object):
+
+    """Current values of the root window's properties.
+
+    Properties are stored as returned by
+    :meth:`~pywo.core.xlib.XObject.get_property`,
+    and must not be changed by the caller.
+
+    """
+
+    # Properties of the root window that are tracked
+    TRACKED = ['_NET_SUPPORTING_WM_CHECK',
+               '_NET_NUMBER_OF_DESKTOPS',
+               '_NET_DESKTOP_NAMES',
+               '_NET_DESKTOP_LAYOUT',
+               '_NET_CURRENT_DESKTOP',
+               '_NET_DESKTOP_GEOMETRY',
+               '_NET_DESKTOP_VIEWPORT',
+               '_NET_WORKAREA',
+               '_NET_ACTIVE_WINDOW',
+               '_NET_CLIENT_LIST',
+               '_NET_CLIENT_LIST_STACKING', ]
+
+    # Properties changed by window manager after ClientMessage is sent
+    CHANGED_BY = {
+        '_NET_CURRENT_DESKTOP': ['_NET_CURRENT_DESKTOP',
+                                 '_NET_ACTIVE_WINDOW', ],
+        '_NET_DESKTOP_VIEWPORT': ['_NET_DESKTOP_VIEWPORT',
+                                  '_NET_ACTIVE_WINDOW', ],
+        '_NET_ACTIVE_WINDOW': ['_NET_ACTIVE_WINDOW',
+                               '_NET_CURRENT_DESKTOP',
+                               '_NET_DESKTOP_VIEWPORT',
+                               '_NET_CLIENT_LIST_STACKING', ],
+        '_NET_CLOSE_WINDOW': ['_NET_ACTIVE_WINDOW',
+                              '_NET_CLIENT_LIST',
+                              '_NET_CLIENT_LIST_STACKING', ],
+    }
+
+    # Seconds after which stale property is used again, even if
+    # window manager did not change it (request might have been ignored)
+    STALE_TIMEOUT = 1.0
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__root = None
+        self.__names = {} # {atom: property name, }
+        self.__messages = {} # {atom: [property name, ], }
+        self.__properties = {} # {property name: property, }
+        self.__stale = {} # {property name: time, }
+        self.__subscribers = {} # {property name: [callback, ], }
+        self.__handler = PropertyNotifyHandler(self.__property)
+
+    @property
+    def running(self):
+        """Return ``True`` if model is updated by X events."""
+        return self.__root is not None
+
+    def start(self, root):
+        """Read all tracked properties, and start listening to changes."""
+        if self.running:
+            return
+        for name in self.TRACKED:
+            self.__names[root.atom(name)] = name
+        for message, names in self.CHANGED_BY.items():
+            self.__messages[root.atom(message)] = names
+        # NOTE: register first, so no change is lost while reading
+        self.__root = root
+        root.register(self.__handler)
+        XObject.add_send_listener(self.__sent)
+        for name in self.TRACKED:
+            self.__properties[name] = XObject.get_property(root, name)
+        log.debug('World model started')
+
+    def stop(self):
+        """Stop listening to changes, properties will be read from X."""
+        if not self.running:
+            return
+        root = self.__root
+        self.__root = None
+        XObject.remove_send_listener(self.__sent)
+        root.unregister(self.__handler)
+        self.__properties.clear()
+        self.__stale.clear()
+        log.debug('World model stopped')
+
+    def tracks(self, name):
+        """Return ``True`` if current value of property is known."""
+        if not self.running or not name in self.__properties:
+            return False
+        stale = self.__stale.get(name)
+        if stale is None:
+            return True
+        if time.time() - stale < self.STALE_TIMEOUT:
+            return False
+        self.__stale.pop(name, None)
+        return True
+
+    def get_property(self, name):
+        """Return property with given name (``None`` if not set)."""
+        return self.__properties.get(name)
+
+    def subscribe(self, name, callback):
+        """Call callback(name) every time property is changed."""
+        self.__lock.acquire()
+        try:
+            self.__subscribers.setdefault(name, []).append(callback)
+        finally:
+            self.__lock.release()
+
+    def unsubscribe(self, name, callback):
+        """Stop calling callback when property is changed."""
+        self.__lock.acquire()
+        try:
+            callbacks = self.__subscribers.get(name, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+        finally:
+            self.__lock.release()
+
+    def __sent(self, client_type):
+        """Mark properties changed by sent ClientMessage as stale."""
+        now = time.time()
+        for name in self.__messages.get(client_type, []):
+            self.__stale[name] = now
+
+    def __property(self, event):
+        """Update changed property, and notify subscribers."""
+        name = self.__names.get(event.atom)
+        root = self.__root
+        if not name or not root:
+            return
+        self.__stale.pop(name, None)
+        # NOTE: read from X, not from the model
+        self.__properties[name] = XObject.get_property(root, name)
+        self.__lock.acquire()
+        try:
+            callbacks = list(self.__subscribers.get(name, []))
+        finally:
+            self.__lock.release()
+        for callback in callbacks:
+            try:
+                callback(name)
+            except Exception, exc:
+                log.exception('Exception %s while notifying %s' %
+                              (exc, callback))
+
+
+WORLD = WorldModel()
+"""The world model used by :class:`~pywo.core.manager.WindowManager`."""
+
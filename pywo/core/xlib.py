@@ -26,8 +26,10 @@ import logging
 from Xlib import threaded
 from Xlib import X, XK, error
 from Xlib.display import Display
+from Xlib.protocol import request
 from Xlib.protocol.event import ClientMessage
 
+from pywo.core import accounting
 from pywo.core.basic import CustomTuple, Geometry
 from pywo.core.dispatch import EventDispatcher
 from pywo.core.osd import OSDRectangle
@@ -49,8 +51,12 @@ class XObject(object):
 
     # TODO: setting Display, not only default one
     __DISPLAY = Display()
+    accounting.install(__DISPLAY)
     __EVENT_DISPATCHER = EventDispatcher(__DISPLAY)
     __BAD_ACCESS = error.CatchError(error.BadAccess)
+    __BAD_WINDOW = error.CatchError(error.BadWindow)
+    # Functions called with client_type of every sent ClientMessage
+    __SEND_LISTENERS = []
 
     # List of recognized key modifiers
     __KEY_MODIFIERS = {'Alt': X.Mod1Mask,
@@ -124,6 +130,47 @@ class XObject(object):
         property = self._win.get_full_property(atom, 0)
         return property
 
+    @classmethod
+    def read_properties(cls, objects, names):
+        """Return list of {name: property} for given objects.
+
+        Requests for all properties of all objects are sent before waiting
+        for the first reply, so there's only one round trip. ``None`` is
+        returned for properties that are not set (and for all properties
+        of destroyed windows).
+
+        """
+        atoms = [(name, cls.atom(name)) for name in names]
+        requests = [[(name, request.GetProperty(display=cls.__DISPLAY.display,
+                                                defer=True,
+                                                delete=False,
+                                                window=obj._win,
+                                                property=atom,
+                                                type=X.AnyPropertyType,
+                                                long_offset=0,
+                                                long_length=1024))
+                     for name, atom in atoms]
+                    for obj in objects]
+        results = []
+        for obj, obj_requests in zip(objects, requests):
+            properties = {}
+            for name, reply in obj_requests:
+                try:
+                    reply.reply()
+                except error.BadWindow:
+                    properties[name] = None
+                    continue
+                if not reply.property_type:
+                    properties[name] = None
+                elif reply.bytes_after:
+                    # NOTE: very long property, read it again
+                    properties[name] = obj.get_property(name)
+                else:
+                    reply.format, reply.value = reply.value
+                    properties[name] = reply
+            results.append(properties)
+        return results
+
     def send_event(self, data, event_type, mask):
         """Send event to the root window."""
         event = ClientMessage(
@@ -131,6 +178,19 @@ class XObject(object):
                     client_type=event_type,
                     data=(32, (data)))
         self.__root.send_event(event, event_mask=mask)
+        for listener in list(XObject.__SEND_LISTENERS):
+            listener(event_type)
+
+    @classmethod
+    def add_send_listener(cls, listener):
+        """Call listener(client_type) after every :meth:`send_event`."""
+        XObject.__SEND_LISTENERS.append(listener)
+
+    @classmethod
+    def remove_send_listener(cls, listener):
+        """Stop calling listener after :meth:`send_event`."""
+        if listener in XObject.__SEND_LISTENERS:
+            XObject.__SEND_LISTENERS.remove(listener)
 
     def register(self, event_handler):
         """Register new event handler and update event mask."""
@@ -155,11 +215,15 @@ class XObject(object):
     def __set_event_mask(self, masks):
         """Update event mask."""
         event_mask = 0
-        log.debug('Setting %s masks for %s' % 
-                  ([str(e) for e in masks], self))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug('Setting %s masks for %s', 
+                      [str(e) for e in masks], self)
         for mask in masks:
             event_mask = event_mask | mask
-        self._win.change_attributes(event_mask=event_mask)
+        # NOTE: window might be already destroyed (for example when 
+        #       unregistering DestroyNotifyHandler), just ignore it
+        self._win.change_attributes(event_mask=event_mask, 
+                                    onerror=self.__BAD_WINDOW)
 
     def __grab_key(self, keycode, modifiers):
         """Grab key."""
@@ -21,15 +21,23 @@
 
 """main.py - main module for PyWO."""
 
+import atexit
+import errno
 import logging
 from logging.handlers import RotatingFileHandler
 import os.path
+import Queue
+import sys
 import tempfile
+try:
+    import json
+except ImportError:
+    import simplejson as json
 
 from pywo import actions, commandline
+from pywo import QueueHandler, QueueListener, set_log_level
 from pywo.config import Config
 from pywo.core import Window, WindowManager, State, WindowType
-from pywo.core import filters
 from pywo.services import daemon
 
 
@@ -40,14 +48,22 @@ log = logging.getLogger('pywo')
 
 
 def setup_loggers(debug=False, logpath=None):
-    """Setup file, and console loggers."""
-    log.setLevel(logging.DEBUG)
+    """Setup file, and console loggers.
+
+    Records are written by background thread, so logging doesn't block
+    thread that handles events. Records below level set by
+    :func:`pywo.set_log_level` are dropped before formatting the message.
+
+    """
+    if debug:
+        set_log_level(logging.DEBUG, force=True)
+    else:
+        set_log_level(logging.INFO)
     format = '%(levelname)s: %(name)s.%(funcName)s(%(lineno)d): %(message)s'
     logfile = os.path.join(logpath or tempfile.gettempdir(), 'PyWO.log')
     rotating = RotatingFileHandler(logfile, 'a', 1024*100)
     rotating.setFormatter(logging.Formatter(format))
     rotating.setLevel(logging.DEBUG)
-    log.addHandler(rotating)
     console = logging.StreamHandler()
     console.setFormatter(logging.Formatter('%(message)s'))
     if debug:
@@ -55,19 +71,60 @@ def setup_loggers(debug=False, logpath=None):
         console.setFormatter(logging.Formatter(format))
     else:
         console.setLevel(logging.INFO)
-    log.addHandler(console)
+    queue = Queue.Queue()
+    listener = QueueListener(queue, rotating, console, 
+                             respect_handler_level=True)
+    log.addHandler(QueueHandler(queue))
+    listener.start()
+    # NOTE: write all queued records before exit
+    atexit.register(listener.stop)
 
 
-def list_windows():
-    WM = WindowManager()
-    windows = WM.windows(filters.AND(
-                filters.ExcludeType(WindowType.DESKTOP, WindowType.SPLASH),
-                filters.ExcludeState(State.SKIP_PAGER, State.SKIP_TASKBAR)))
-    for window in windows:
-        state = window.state
-        win_desktop = window.desktop
-        desktop = [win_desktop, -1][State.STICKY in state or \
-                                    win_desktop == Window.ALL_DESKTOPS]
+# Names of window types used by --windows
+TYPE_NAMES = dict([(getattr(WindowType, name), name.lower())
+                   for name in dir(WindowType) if name.isupper()])
+
+
+class WindowInfo(object):
+
+    """Values of the columns listed by --windows.
+
+    Every value is read from X server only once, and only when needed.
+
+    """
+
+    COLUMNS = ['id', 'desktop', 'state', 'name', 'class', 'pid', 'type',
+               'geometry']
+
+    def __init__(self, window):
+        self.window = window
+        self.__values = {}
+
+    def get(self, column):
+        """Return value of given column."""
+        if not column in self.__values:
+            getter = getattr(self, '_%s' % column)
+            self.__values[column] = getter()
+        return self.__values[column]
+
+    def _id(self):
+        return self.window.id
+
+    def _states(self):
+        return self.window.state
+
+    def _types(self):
+        return self.window.type
+
+    def _desktop(self):
+        desktop = self.window.desktop
+        if State.STICKY in self.get('states') or \
+           desktop == Window.ALL_DESKTOPS:
+            return -1
+        return desktop
+
+    def _state(self):
+        state = self.get('states')
         if State.HIDDEN in state and \
            not State.SHADED in state:
             state_flags = 'i'
@@ -85,7 +142,104 @@ def list_windows():
         # TODO: State.ABOVE, State.BELOW
         state_flags += [' ', 's'][State.SHADED in state]# and \
                                   #not State.HIDDEN in state]
-        print '%s %s %s %s' % (window.id, desktop, state_flags, window.name)
+        return state_flags
+
+    def _name(self):
+        return self.window.name.decode('utf-8', 'replace')
+
+    def _class(self):
+        return self.window.class_name.decode('utf-8', 'replace')
+
+    def _pid(self):
+        return self.window.pid
+
+    def _type(self):
+        return [TYPE_NAMES.get(win_type, str(win_type))
+                for win_type in self.get('types')]
+
+    def _geometry(self):
+        geometry = self.window.geometry
+        return (geometry.x, geometry.y, geometry.width, geometry.height)
+
+    def text(self, column):
+        """Return value of given column as unicode text."""
+        value = self.get(column)
+        if value is None:
+            return u''
+        if column == 'type':
+            return u','.join(value)
+        if column == 'geometry':
+            return u'%sx%s+%s+%s' % (value[2], value[3], value[0], value[1])
+        return unicode(value)
+
+    def matches(self, column, operator, value):
+        """Return ``True`` if column matches filter expression."""
+        text = self.text(column).lower()
+        if operator == '~':
+            return value in text
+        if column == 'type':
+            return value in text.split(',')
+        return text.strip() == value
+
+
+def parse_filter(expression):
+    """Return (column, operator, value) parsed from filter expression."""
+    for position, char in enumerate(expression):
+        if char in '=~':
+            column = expression[:position].strip().lower()
+            value = expression[position+1:].decode('utf-8').strip().lower()
+            if column in WindowInfo.COLUMNS:
+                return (column, char, value)
+            break
+    raise ValueError('invalid filter expression: %s' % expression)
+
+
+def format_line(info, columns, format):
+    """Return output line with given columns of the window."""
+    if format == 'json':
+        values = {}
+        for column in columns:
+            value = info.get(column)
+            if column == 'geometry':
+                value = dict(zip(['x', 'y', 'width', 'height'], value))
+            values[column] = value
+        return json.dumps(values, sort_keys=True)
+    texts = [info.text(column) for column in columns]
+    if format == 'tsv':
+        texts = [text.replace('\t', ' ') for text in texts]
+        return u'\t'.join(texts).encode('utf-8')
+    return u' '.join(texts).encode('utf-8')
+
+
+def list_windows(columns=None, format='plain', filters_expressions=()):
+    """Print windows, every line is printed as soon as it is ready."""
+    columns = columns or ['id', 'desktop', 'state', 'name']
+    window_filters = [parse_filter(expression)
+                      for expression in filters_expressions]
+    WM = WindowManager()
+    for win_id in WM.windows_ids():
+        info = WindowInfo(Window(win_id))
+        try:
+            if WindowType.DESKTOP in info.get('types') or \
+               WindowType.SPLASH in info.get('types') or \
+               State.SKIP_PAGER in info.get('states') or \
+               State.SKIP_TASKBAR in info.get('states'):
+                continue
+            if not all([info.matches(*window_filter)
+                        for window_filter in window_filters]):
+                continue
+            line = format_line(info, columns, format)
+        except Exception, exc:
+            # NOTE: window might be closed while listing
+            log.debug('Skipping window %s: %s', win_id, exc)
+            continue
+        try:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+        except IOError, exc:
+            if exc.errno == errno.EPIPE:
+                return # output closed, for example by head
+            raise
 
 
 def run():
@@ -98,13 +252,24 @@ def run():
 
     # load config settings
     config = Config(options.config)
+    set_log_level(config.log_level)
 
     if options.start_daemon:
         log.info('Starting PyWO daemon...')
         daemon.setup(config)
         daemon.start()
     elif options.list_windows:
-        list_windows()
+        columns = [column.strip().lower()
+                   for column in options.list_columns.split(',')]
+        invalid = [column for column in columns
+                          if not column in WindowInfo.COLUMNS]
+        if invalid:
+            commandline.print_error('invalid columns: %s' %
+                                    ', '.join(invalid))
+        try:
+            list_windows(columns, options.list_format, options.list_filters)
+        except ValueError, exc:
+            commandline.print_error(exc)
     elif options.help_more:
         commandline.print_help_more(config)
     elif options.help_actions:
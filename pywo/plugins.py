@@ -0,0 +1,182 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""plugins.py - discovery of third-party PyWO plugins.
+
+Plugins are registered using entry points (``pywo.actions``, and
+``pywo.services`` groups). Entry points are read using importlib.metadata
+(or importlib_metadata backport) if available, pkg_resources otherwise,
+and stored in cache so scanning all installed distributions is needed only
+when one of the ``sys.path`` entries changes.
+
+Plugins are not imported during discovery, use :func:`load`.
+
+"""
+
+import logging
+import os.path
+import sys
+import time
+
+from pywo import cache
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+GROUPS = ['pywo.actions', 'pywo.services']
+INDEX_CACHE = 'entry-points'
+
+__INDEX = None
+
+
+class EntryPoint(object):
+
+    """Entry point pointing to plugin module (or object in module)."""
+
+    def __init__(self, name, module_name, attrs=()):
+        self.name = name
+        self.module_name = module_name
+        self.attrs = tuple(attrs)
+
+    @classmethod
+    def parse(cls, name, value):
+        """Return :class:`EntryPoint` for given ``module:attrs`` value."""
+        value = value.split('[')[0].strip() # ignore extras
+        module_name, sep, attrs = value.partition(':')
+        attrs = attrs.strip() and attrs.strip().split('.') or []
+        return cls(name, module_name.strip(), attrs)
+
+    def load(self):
+        """Import plugin module, and return pointed object."""
+        start = time.time()
+        __import__(self.module_name)
+        obj = sys.modules[self.module_name]
+        for attr in self.attrs:
+            obj = getattr(obj, attr)
+        log.debug('Loaded plugin %s in %.1fms',
+                  self.name, (time.time() - start) * 1000)
+        return obj
+
+    def __eq__(self, other):
+        return (self.name, self.module_name, self.attrs) == \
+               (other.name, other.module_name, other.attrs)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return '<EntryPoint %s = %s%s>' % \
+               (self.name, self.module_name,
+                self.attrs and ':%s' % '.'.join(self.attrs) or '')
+
+
+def scan_metadata(groups):
+    """Return {group: [(name, value), ]} using importlib.metadata."""
+    try:
+        from importlib import metadata
+    except ImportError:
+        import importlib_metadata as metadata
+    found = dict([(group, []) for group in groups])
+    all_entry_points = metadata.entry_points()
+    for group in groups:
+        if hasattr(all_entry_points, 'select'):
+            selected = all_entry_points.select(group=group)
+        else:
+            selected = all_entry_points.get(group, [])
+        found[group] = [(entry_point.name, entry_point.value)
+                        for entry_point in selected]
+    return found
+
+
+def scan_pkg_resources(groups):
+    """Return {group: [(name, value), ]} using pkg_resources."""
+    from pkg_resources import iter_entry_points
+    found = dict([(group, []) for group in groups])
+    for group in groups:
+        for entry_point in iter_entry_points(group):
+            value = entry_point.module_name
+            if entry_point.attrs:
+                value += ':%s' % '.'.join(entry_point.attrs)
+            found[group].append((entry_point.name, value))
+    return found
+
+
+def scan(groups=GROUPS):
+    """Scan installed distributions, return {group: [EntryPoint, ]}."""
+    start = time.time()
+    found = dict([(group, []) for group in groups])
+    for scanner in [scan_metadata, scan_pkg_resources]:
+        try:
+            found = scanner(groups)
+            break
+        except ImportError:
+            continue
+    else:
+        log.warning('No importlib.metadata, or pkg_resources, '
+                    'plugins disabled')
+    log.debug('Scanned entry points in %.1fms',
+              (time.time() - start) * 1000)
+    return dict([(group, [EntryPoint.parse(name, value)
+                          for name, value in entry_points])
+                 for group, entry_points in found.items()])
+
+
+def index_files():
+    """Return list of ``sys.path`` entries that invalidate index."""
+    # NOTE: modification time of directory changes when distribution is
+    #       installed or removed
+    return [os.path.abspath(path or os.curdir) for path in sys.path]
+
+
+def get_index():
+    """Return {group: [EntryPoint, ]}, from cache if possible."""
+    global __INDEX
+    if __INDEX is not None:
+        return __INDEX
+    data = cache.get(INDEX_CACHE)
+    if data and data['path'] == sys.path:
+        __INDEX = dict([(group, [EntryPoint(*values)
+                                 for values in entry_points])
+                        for group, entry_points in data['groups'].items()])
+        return __INDEX
+    __INDEX = scan()
+    data = {'path': list(sys.path),
+            'groups': dict([(group, [(entry_point.name,
+                                      entry_point.module_name,
+                                      entry_point.attrs)
+                                     for entry_point in entry_points])
+                            for group, entry_points in __INDEX.items()])}
+    cache.store(INDEX_CACHE, index_files(), data)
+    return __INDEX
+
+
+def clear():
+    """Forget index, so it will be checked again on next use."""
+    global __INDEX
+    __INDEX = None
+
+
+def entry_points(group):
+    """Return list of :class:`EntryPoint` in given group."""
+    return list(get_index().get(group, []))
+
@@ -20,7 +20,7 @@
 
 """PyWO services related code.
 
-PyWO uses pkg_resources for services plugins discovery. 
+PyWO uses entry points (see pywo.plugins) for services plugins discovery.
 When writing your own actions please use 'pywo.services' entry point group. 
 As an entry point value you can use Service subclass, or module implementing
 setup(config), start(), stop() functions.
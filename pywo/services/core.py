@@ -34,7 +34,8 @@ class Service(object):
     """Service interface.
 
     Service can be a subclass of `Service` or a module.
-    These three methods/functions must be implemented.
+    These three methods/functions must be implemented 
+    (:meth:`reload` is optional).
 
     You can't rely on the order of services to be loaded, started, or stopped.
 
@@ -50,6 +51,21 @@ class Service(object):
         """
         raise NotImplementedError()
 
+    def reload(self, config):
+        """Apply new configuration to the running service.
+
+        Called when configuration is reloaded, instead of stopping, setting
+        up, and starting service again. By default service is restarted.
+        Override it if service can apply new config without restarting.
+
+        Modules don't have to implement `reload` function, they are 
+        restarted if it's missing.
+
+        """
+        self.stop()
+        self.setup(config)
+        self.start()
+
     def start(self):
         """Start service.
 
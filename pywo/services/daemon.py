@@ -24,14 +24,21 @@ It works almost like any other service, except it doesn't start new thread.
 
 """
 
+import errno
+import fcntl
 import logging
+import os
+import select
 import signal
-import time
 import threading
 
-from pywo.core import WindowManager
-from pywo import actions
+from pywo.core import Window, WindowManager
+from pywo.core import accounting, timing
+from pywo.core.events import DestroyNotifyHandler
+from pywo import actions, set_log_level
+from pywo.config import Config
 from pywo.services import manager
+from pywo.services.watcher import ConfigWatcher
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -41,9 +48,50 @@ log = logging.getLogger(__name__)
 
 
 __CONFIG = None
+__RELOAD_LOCK = threading.Lock()
+__WATCHER = None
+__STOPPED = threading.Event()
+__WAKEUP = os.pipe() # (read fd, write fd) used to wake up main thread
+# Settings used only by the daemon, actions, keyboard_service, and
+# rules_service, changing them doesn't require restarting other services
+__NOT_SERVICES_SETTINGS = ['log_level', 'auto_reload',
+                           'aliases', 'ignored_actions', 'rules']
 WM = WindowManager()
 
 
+def prepare_actions(config):
+    """Prepare all actions for use with given config."""
+    for action in actions.manager.get_all():
+        try:
+            action.prepare(config)
+        except Exception, exc:
+            log.exception('Exception %s while %s prepare' % (exc, action))
+
+
+def reset_actions():
+    """Reset all actions after window manager change, and prepare again."""
+    for action in actions.manager.get_all():
+        try:
+            action.reset()
+        except Exception, exc:
+            log.exception('Exception %s while %s reset' % (exc, action))
+    if __CONFIG:
+        prepare_actions(__CONFIG)
+
+
+def call_services(services, method, *args):
+    """Call method of all given services, remove services that failed."""
+    failed = []
+    for service in services:
+        try:
+            getattr(service, method)(*args)
+        except Exception, exc:
+            log.exception('Exception %s while %s %s' % (exc, service, method))
+            failed.append(service)
+    for service in failed:
+        manager.remove(service)
+
+
 def setup(config):
     """Import and setup all services."""
     global __CONFIG
@@ -54,63 +102,231 @@ def setup(config):
         # and required actions
         actions.register(name='exit')(exit_pywo)
         actions.register(name='reload')(reload_pywo)
+        timing.DUMP = True
+        WM.world.start(WM)
+        WM.update_type()
+        WM_WATCHER.start()
     __CONFIG = config
-    WM.update_type()
+    prepare_actions(config)
     manager.load(__CONFIG)
-    failed = []
-    for service in manager.get_all():
-        try:
-            service.setup(config)
-        except Exception, exc:
-            log.exception('Exception %s while %s setup' % (exc, service))
-            failed.append(service)
-    for service in failed:
-        manager.remove(service)
+    call_services(list(manager.get_all()), 'setup', config)
+
+
+def start_watcher(config):
+    """Start watching config files if auto_reload is on."""
+    global __WATCHER
+    if not getattr(config, 'auto_reload', False):
+        stop_watcher()
+        return
+    if __WATCHER:
+        __WATCHER.set_files(config.files)
+        return
+    __WATCHER = ConfigWatcher(config.files, reload_pywo)
+    __WATCHER.start()
+
+
+def stop_watcher():
+    """Stop watching config files."""
+    global __WATCHER
+    if __WATCHER:
+        __WATCHER.stop()
+        __WATCHER = None
 
 
 def start():
     """Start all services."""
-    failed = []
-    for service in manager.get_all():
-        try:
-            service.start()
-        except Exception, exc:
-            log.exception('Exception %s while %s start' % (exc, service))
-            failed.append(service)
-    for service in failed:
-        manager.remove(service)
+    call_services(list(manager.get_all()), 'start')
+    start_watcher(__CONFIG)
     log.info('PyWO ready and running!')
-    # Simple loop for keeping main-thread running and make signal handlers work
-    counter = 0
-    while threading.currentThread().getName() == 'MainThread'  and \
-          threading.activeCount() > 1: 
-        time.sleep(1)
-        counter += 1
-        if counter % 10 == 0:
-            counter = 0
-            WM.update_type() # update WM type every 10 seconds
+    # Keep main-thread running and make signal handlers work
+    if threading.currentThread().getName() == 'MainThread'  and \
+       threading.activeCount() > 1: 
+        wait()
     log.debug('Exited daemon loop, in %s' % threading.currentThread())
 
 
+def wait():
+    """Block until PyWO is stopped.
+
+    Main thread waits for data on pipe, which is written when PyWO is
+    stopped, or when signal is received (``signal.set_wakeup_fd``), 
+    so signal handlers are called immediately without periodic wake ups.
+
+    """
+    read_fd, write_fd = __WAKEUP
+    for fd in __WAKEUP:
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+    signal.set_wakeup_fd(write_fd)
+    try:
+        while not __STOPPED.isSet():
+            try:
+                select.select([read_fd], [], [])
+                os.read(read_fd, 512)
+            except (select.error, OSError), exc:
+                if not exc.args[0] in [errno.EINTR, errno.EAGAIN]:
+                    raise
+    finally:
+        signal.set_wakeup_fd(-1)
+
+
+def wake_up():
+    """Wake up main thread waiting in :func:`wait`."""
+    try:
+        os.write(__WAKEUP[1], '\0')
+    except OSError:
+        pass # pipe is full, main thread will wake up anyway
+
+
+class WindowManagerWatcher(object):
+
+    """Detect window manager changes (restart, or new window manager).
+
+    Window manager sets ``_NET_SUPPORTING_WM_CHECK`` property of the root
+    window, and destroys the check window when exits.
+
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__check_window = None
+        self.__destroy_handler = DestroyNotifyHandler(self.__destroyed)
+
+    def start(self):
+        """Start listening to root window, and the check window events."""
+        WM.world.subscribe('_NET_SUPPORTING_WM_CHECK', self.__property)
+        self.__watch_check_window()
+
+    def __watch_check_window(self):
+        """Listen to DestroyNotify of current check window."""
+        self.__lock.acquire()
+        try:
+            if self.__check_window:
+                self.__check_window.unregister(self.__destroy_handler)
+                self.__check_window = None
+            win_id = WM.supporting_wm_check_id()
+            if win_id:
+                self.__check_window = Window(win_id)
+                self.__check_window.register(self.__destroy_handler)
+        finally:
+            self.__lock.release()
+
+    def __property(self, name):
+        """Property _NET_SUPPORTING_WM_CHECK has changed."""
+        self.__changed()
+
+    def __destroyed(self, event):
+        """Check window destroyed, window manager exited."""
+        self.__changed()
+
+    def __changed(self):
+        """Update window manager type, and reset actions if needed."""
+        try:
+            self.__watch_check_window()
+            if not WM.update_type():
+                return
+        except Exception, exc:
+            # NOTE: check window might be already destroyed
+            log.debug('Can\'t check window manager: %s', exc)
+            return
+        log.info('Window manager changed: %s, %s', WM.name, WM.type)
+        reset_actions()
+
+
+WM_WATCHER = WindowManagerWatcher()
+
+
 def stop():
     """Stop all services."""
+    __STOPPED.set()
+    wake_up()
+    stop_watcher()
     for service in manager.get_all():
         try:
             service.stop()
         except Exception, exc:
             log.exception('Exception %s while %s stop' % (exc, service))
+    WM.world.stop()
     WM.unregister_all() # unregister all remaining EventHandlers
+    accounting.log_stats(log, logging.DEBUG)
+
+
+def services_settings(changes):
+    """Return set of changed settings that might be used by services.
+
+    Settings named after services (modules, or plugins) only enable,
+    or disable them.
 
+    """
+    return set([name for name in changes.settings
+                     if not name in __NOT_SERVICES_SETTINGS and
+                        not name.endswith('_service') and
+                        not '.' in name])
 
-def reload_pywo(win, config=None, *args):
-    """Stop services, (re)load configuration file, and start again."""
-    log.info('Reloading PyWO...')
-    stop()
-    filename = config or __CONFIG.filename
-    log.info('Reloading configuration file: %s' % filename)
-    config = __CONFIG.load(filename)
-    setup(__CONFIG)
-    start()
+
+def reload_service(service, config, changes):
+    """Apply new config to running service, restart if needed.
+
+    Services without ``reload`` are restarted only if settings they might
+    use changed (keys and sections are used only by actions).
+
+    """
+    if hasattr(service, 'reload'):
+        service.reload(config)
+    elif services_settings(changes):
+        service.stop()
+        service.setup(config)
+        service.start()
+    else:
+        log.debug('%s not affected by configuration changes', service)
+
+
+def reload_pywo(win=None, config=None, *args):
+    """(Re)load configuration file, and apply changes to running services.
+
+    Services that are still enabled are reloaded (without restarting
+    if possible, or at all if changes don't affect them), disabled services
+    are stopped, and enabled ones started.
+    Nothing is done if configuration didn't change.
+
+    """
+    global __CONFIG
+    __RELOAD_LOCK.acquire()
+    try:
+        log.info('Reloading PyWO...')
+        filename = config or __CONFIG.filename
+        log.info('Reloading configuration file: %s', filename)
+        new_config = Config(filename)
+        changes = __CONFIG.diff(new_config)
+        if not changes:
+            log.info('Configuration not changed')
+            return
+        log.info('Configuration changed: %s', changes)
+        if 'log_level' in changes.settings:
+            set_log_level(new_config.log_level)
+        old_services = set(manager.get_all())
+        __CONFIG = new_config
+        prepare_actions(new_config)
+        manager.load(new_config)
+        services = set(manager.get_all())
+        for service in old_services - services:
+            try:
+                service.stop()
+            except Exception, exc:
+                log.exception('Exception %s while %s stop' % (exc, service))
+        for service in services & old_services:
+            try:
+                reload_service(service, new_config, changes)
+            except Exception, exc:
+                log.exception('Exception %s while %s reload' % (exc, service))
+                manager.remove(service)
+        new_services = services - old_services
+        call_services(new_services, 'setup', new_config)
+        call_services(new_services & set(manager.get_all()), 'start')
+        start_watcher(new_config)
+        log.info('PyWO reloaded')
+    finally:
+        __RELOAD_LOCK.release()
 
 
 def exit_pywo(*args):
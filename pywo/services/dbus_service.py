@@ -30,10 +30,12 @@ from dbus.mainloop.glib import DBusGMainLoop
 import dbus.service
 
 from pywo import actions
-from pywo.core import WindowManager
-from pywo.core import filters
-from pywo.actions import manager
+from pywo.core import Window, WindowManager
+from pywo.core import accounting, filters, timing
+from pywo.core.events import ConfigureNotifyHandler
+from pywo.actions import manager, manipulate
 from pywo.actions import parser
+from pywo.services.workers import OrderedWorkers
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -42,6 +44,13 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 log = logging.getLogger(__name__)
 
 WM = WindowManager()
+WORKERS = OrderedWorkers('D-Bus Worker')
+
+DEFAULT_TIMEOUT = 5.0
+"""Default timeout (in seconds) of PerformAction(s)."""
+# Keys used to order tasks performed by WORKERS
+ACTIVE_WINDOW = 'active'
+BATCH = 'batch'
 
 
 class DBusService(dbus.service.Object):
@@ -50,21 +59,43 @@ class DBusService(dbus.service.Object):
 
     @dbus.service.method("net.kosciak.PyWO", 
                          in_signature='si', 
-                         out_signature='s')
-    def PerformAction(self, command, win_id):
-        log.debug('DBUS: command="%s", win_id=%s' % (command, win_id))
-        try:
-            (options, args) = parser.parse_args(command.encode('utf-8'))
-            log.info(options)
-        except parser.ParserException, exc:
-            log.exception('ParserException: %s' % exc)
-            return 'ERROR: %s' % exc
-        try:
-            actions.perform(options, args, self.CONFIG, win_id)
-            return ''
-        except actions.ActionException, exc:
-            log.exception('ActionException: %s' % exc)
-            return 'ERROR: %s' % exc
+                         out_signature='s',
+                         async_callbacks=('reply', 'error'))
+    def PerformAction(self, command, win_id, reply, error):
+        log.debug('DBUS: command="%s", win_id=%s', command, win_id)
+        deferred = DeferredReply(reply, error, 'ERROR: timeout', self.CONFIG)
+        win_id = target_id(win_id)
+        # NOTE: actions on the same window are performed in order
+        WORKERS.submit(win_id or ACTIVE_WINDOW, deferred, 
+                       perform_command, command, win_id, self.CONFIG)
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='ssa{sv}i', 
+                         out_signature='s',
+                         async_callbacks=('reply', 'error'))
+    def PerformActionArgs(self, action, section, kwargs, win_id, 
+                          reply, error):
+        """Perform action with typed arguments, no commandline parsing."""
+        log.debug('DBUS: action=%s, section=%s, kwargs=%s, win_id=%s',
+                  action, section, kwargs, win_id)
+        deferred = DeferredReply(reply, error, 'ERROR: timeout', self.CONFIG)
+        win_id = target_id(win_id)
+        WORKERS.submit(win_id or ACTIVE_WINDOW, deferred, 
+                       perform_args, action, section, kwargs, win_id, 
+                       self.CONFIG)
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='a(si)', 
+                         out_signature='as',
+                         async_callbacks=('reply', 'error'))
+    def PerformActions(self, commands, reply, error):
+        """Perform list of (command, win_id), return list of results."""
+        log.debug('DBUS: commands=%s', commands)
+        deferred = DeferredReply(reply, error,
+                                 ['ERROR: timeout'] * len(commands),
+                                 self.CONFIG)
+        WORKERS.submit(BATCH, deferred, 
+                       perform_commands, commands, self.CONFIG)
 
     @dbus.service.method("net.kosciak.PyWO", 
                          in_signature='', 
@@ -93,24 +124,371 @@ class DBusService(dbus.service.Object):
                          out_signature='a(issiaiai(ii)(ii))')
     def GetWindowInfo(self, win_id):
         win = WM.get_window(win_id)
-        geometry = win.geometry
-        return [(win.id, 
-                 win.class_name, win.name,
-                 win.desktop,
-                 win.type, win.state,
-                 (geometry.x, geometry.y),
-                 (geometry.width, geometry.height),
-                )]
+        return [window_info(win)]
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='s', 
+                         out_signature='a(issiaiai(ii)(ii))')
+    def GetWindowsInfo(self, match):
+        """Return info of all (matching) windows, in one call.
+
+        Properties of all windows are read at once, geometries are taken
+        from spatial_service index (if running).
+
+        """
+        windows_info = []
+        windows = WM.windows(filters.NORMAL_TYPE, match=match, snapshot=True,
+                             geometries=manipulate.indexed_geometries())
+        for win in windows:
+            try:
+                windows_info.append(window_info(win))
+            except Exception, exc:
+                # NOTE: window might be closed while getting its info
+                log.debug('Skipping %s: %s', win, exc)
+        return windows_info
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='', 
+                         out_signature='a(isb)')
+    def GetDesktops(self):
+        """Return list of (number, name, is_current) of all desktops."""
+        names = WM.desktop_names
+        current = WM.desktop
+        return [(desktop, 
+                 desktop < len(names) and names[desktop] or '', 
+                 desktop == current) 
+                for desktop in range(WM.desktops)]
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='', 
+                         out_signature='a(iiii)')
+    def GetMonitors(self):
+        """Return list of (x, y, width, height) of all screens."""
+        return [(geometry.x, geometry.y, geometry.width, geometry.height)
+                for geometry in WM.screen_geometries()]
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='b', 
+                         out_signature='a(siixda{si})')
+    def GetStats(self, reset):
+        """Return statistics of requests sent to X Server.
+        
+        List of (scope, calls, round trips, bytes, wait time in seconds,
+        {request name: count}). If reset is true statistics are cleared.
+        
+        """
+        stats = accounting.stats()
+        if reset:
+            accounting.reset()
+        return [(counters.name, counters.calls, counters.round_trips, 
+                 counters.bytes, counters.time, counters.requests)
+                for name, counters in sorted(stats.items())]
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='', 
+                         out_signature='a(ssidddddii)')
+    def GetTimings(self):
+        """Return latency statistics of actions, and event handlers.
+        
+        List of (scope, phase, count, sum, p50, p95, p99, max, failures,
+        exceptions), times are in milliseconds.
+        
+        """
+        return [(histogram.scope, histogram.phase, histogram.count,
+                 histogram.sum, histogram.percentile(50), 
+                 histogram.percentile(95), histogram.percentile(99),
+                 histogram.max, histogram.failures, histogram.exceptions)
+                for histogram in timing.stats()]
+
+    @dbus.service.method("net.kosciak.PyWO", 
+                         in_signature='s', 
+                         out_signature='s')
+    def DumpTimings(self, path):
+        """Write statistics in Prometheus text format, return file path.
+        
+        If path is empty default location is used.
+        
+        """
+        return timing.dump(path or None)
+
+    @dbus.service.signal("net.kosciak.PyWO", signature='i')
+    def WindowAdded(self, win_id):
+        pass
+
+    @dbus.service.signal("net.kosciak.PyWO", signature='i')
+    def WindowRemoved(self, win_id):
+        pass
+
+    @dbus.service.signal("net.kosciak.PyWO", signature='iiiii')
+    def GeometryChanged(self, win_id, x, y, width, height):
+        pass
+
+    @dbus.service.signal("net.kosciak.PyWO", signature='i')
+    def ActiveChanged(self, win_id):
+        pass
+
+    @dbus.service.signal("net.kosciak.PyWO", signature='i')
+    def DesktopChanged(self, desktop):
+        pass
+
+
+def target_id(win_id):
+    """Return id of the window action will be performed on.
+
+    Active window is used if `win_id` is 0, so tasks for the active window
+    are ordered with tasks given its explicit id.
 
-    # TODO: GetDesktops
-    # TODO: GetDesktopInfo
+    """
+    return win_id or WM.active_window_id() or 0
 
 
+def perform_command(command, win_id, config):
+    """Parse and perform command, return error message or ''."""
+    try:
+        (options, args) = parser.parse_args(command.encode('utf-8'))
+        log.info(options)
+    except parser.ParserException, exc:
+        log.exception('ParserException: %s' % exc)
+        return 'ERROR: %s' % exc
+    try:
+        actions.perform(options, args, config, win_id)
+        return ''
+    except actions.ActionException, exc:
+        log.exception('ActionException: %s' % exc)
+        return 'ERROR: %s' % exc
+
+
+def perform_args(action, section, kwargs, win_id, config):
+    """Perform action with typed arguments, return error message or ''."""
+    try:
+        actions.perform_action(config, action.encode('utf-8'), 
+                               section and section.encode('utf-8'), 
+                               win_id, **dict([(str(name), value) 
+                                               for name, value 
+                                               in kwargs.items()]))
+        return ''
+    except (parser.ParserException, actions.ActionException), exc:
+        log.exception('%s: %s' % (exc.__class__.__name__, exc))
+        return 'ERROR: %s' % exc
+    except Exception, exc:
+        # NOTE: typed arguments are not validated by parser, any error
+        #       (e.g. TypeError, Xlib error) must be reported right away
+        log.exception('Exception while performing %s: %s' % (action, exc))
+        return 'ERROR: %s' % exc
+
+
+def perform_commands(commands, config):
+    """Perform commands in one batch, return list of results."""
+    # NOTE: the same active window for all commands
+    active_id = WM.active_window_id() or 0
+    actions.start_batch()
+    try:
+        return [perform_command(command, win_id or active_id, config)
+                for command, win_id in commands]
+    finally:
+        actions.finish_batch()
+
+
+class DeferredReply(object):
+
+    """Send reply of asynchronous D-Bus method performed by the worker.
+
+    If result is not ready in ``dbus_timeout`` seconds `timeout_result` is
+    sent instead. If performed function raises exception D-Bus error is
+    sent right away. Reply is always sent from the D-Bus main loop thread.
+
+    """
+
+    def __init__(self, reply, error, timeout_result, config):
+        self.__reply = reply
+        self.__error = error
+        self.__lock = threading.Lock()
+        self.__sent = False
+        timeout = getattr(config, 'dbus_timeout', DEFAULT_TIMEOUT)
+        # NOTE: D-Bus methods are called from the main loop thread, so is
+        #       timeout callback, no need for extra thread
+        self.__timeout = gobject.timeout_add(int(timeout * 1000),
+                                             self.__timed_out,
+                                             timeout_result)
+
+    def __call__(self, function, *args):
+        """Perform function in current thread, and send its result."""
+        try:
+            result = function(*args)
+        except Exception, exc:
+            log.exception('Exception %s while performing %s' %
+                          (exc, function))
+            self.send_error(exc)
+            return
+        self.send(result)
+
+    def __set_sent(self, result):
+        """Return ``True`` if nothing was sent yet."""
+        self.__lock.acquire()
+        try:
+            if self.__sent:
+                log.warning('Result %s ready after timeout' % (result,))
+                return False
+            self.__sent = True
+            return True
+        finally:
+            self.__lock.release()
+
+    def __timed_out(self, result):
+        """Send `timeout_result` (called from the main loop)."""
+        self.__timeout = None
+        if self.__set_sent(result):
+            self.__reply(result)
+        return False # don't call again
+
+    def __finish(self, callback, value):
+        """Cancel timeout, and send reply (called from the main loop)."""
+        if self.__timeout is not None:
+            gobject.source_remove(self.__timeout)
+            self.__timeout = None
+        callback(value)
+        return False # don't call again
+
+    def send(self, result):
+        """Send reply (only once)."""
+        if self.__set_sent(result):
+            gobject.idle_add(self.__finish, self.__reply, result)
+
+    def send_error(self, exception):
+        """Send D-Bus error (only if nothing was sent yet)."""
+        if self.__set_sent(exception):
+            gobject.idle_add(self.__finish, self.__error, exception)
+
+
+def window_info(win):
+    """Return tuple with all info about the window."""
+    geometry = win.geometry
+    return (win.id, 
+            win.class_name, win.name,
+            win.desktop,
+            win.type, win.state,
+            (geometry.x, geometry.y),
+            (geometry.width, geometry.height),
+           )
+
+
+class ChangesNotifier(object):
+
+    """Listen to X events, and emit :class:`DBusService` signals."""
+
+    def __init__(self, service):
+        self.service = service
+        self.__lock = threading.Lock()
+        self.__clients = set()
+        self.__geometries = {} # {win_id: last emitted geometry, }
+        self.__frames = {} # {win_id: (extents, reparented), }
+        self.__properties = {
+            '_NET_CLIENT_LIST': self.__client_list,
+            '_NET_ACTIVE_WINDOW': self.__active_window,
+            '_NET_CURRENT_DESKTOP': self.__current_desktop,
+        }
+        self.__configure_handler = ConfigureNotifyHandler(self.__configure)
+
+    @staticmethod
+    def __emit(signal, *args):
+        """Emit signal from the main loop, not from the events thread."""
+        # NOTE: signal returns None, so it's called only once
+        gobject.idle_add(signal, *args)
+
+    def start(self):
+        """Start listening to root window and all client windows."""
+        self.__lock.acquire()
+        try:
+            self.__clients = set(WM.windows_ids(stacking=False))
+            for win_id in self.__clients:
+                Window(win_id).register(self.__configure_handler)
+        finally:
+            self.__lock.release()
+        for name, method in self.__properties.items():
+            WM.world.subscribe(name, method)
+
+    def stop(self):
+        """Stop listening to X events."""
+        for name, method in self.__properties.items():
+            WM.world.unsubscribe(name, method)
+        self.__lock.acquire()
+        try:
+            for win_id in self.__clients:
+                Window(win_id).unregister(self.__configure_handler)
+            self.__clients = set()
+            self.__geometries.clear()
+            self.__frames.clear()
+        finally:
+            self.__lock.release()
+
+    def __client_list(self, name):
+        """Emit WindowAdded, WindowRemoved signals."""
+        self.__lock.acquire()
+        try:
+            clients = set(WM.windows_ids(stacking=False))
+            added = clients - self.__clients
+            removed = self.__clients - clients
+            self.__clients = clients
+            for win_id in added:
+                Window(win_id).register(self.__configure_handler)
+            for win_id in removed:
+                Window(win_id).unregister(self.__configure_handler)
+                self.__geometries.pop(win_id, None)
+                self.__frames.pop(win_id, None)
+        finally:
+            self.__lock.release()
+        for win_id in added:
+            self.__emit(self.service.WindowAdded, win_id)
+        for win_id in removed:
+            self.__emit(self.service.WindowRemoved, win_id)
+
+    def __active_window(self, name):
+        """Emit ActiveChanged signal."""
+        self.__emit(self.service.ActiveChanged, WM.active_window_id() or 0)
+
+    def __current_desktop(self, name):
+        """Emit DesktopChanged signal."""
+        self.__emit(self.service.DesktopChanged, WM.desktop)
+
+    def __configure(self, event):
+        """Emit GeometryChanged signal."""
+        win_id = event.window_id
+        if not win_id in self.__clients:
+            return
+        frame = self.__frames.get(win_id)
+        if frame is None:
+            # NOTE: read once, later geometry is taken from the events
+            try:
+                window = Window(win_id)
+                frame = (window.extents, window.reparented)
+            except Exception, exc:
+                log.debug('Can\'t get extents of %s: %s', win_id, exc)
+                return
+            self.__frames[win_id] = frame
+        extents, reparented = frame
+        geometry = event.geometry
+        values = (geometry.x - extents.left,
+                  geometry.y - extents.top,
+                  geometry.width + extents.horizontal,
+                  geometry.height + extents.vertical)
+        previous = self.__geometries.get(win_id)
+        if reparented and not event.synthetic:
+            # NOTE: position is relative to the frame, only size is valid
+            if previous is None:
+                return
+            values = previous[:2] + values[2:]
+        # NOTE: one change might generate both real and synthetic event
+        if previous == values:
+            return
+        self.__geometries[win_id] = values
+        self.__emit(self.service.GeometryChanged, win_id, *values)
+
 dbus_loop = DBusGMainLoop(set_as_default=True)
 #dbus_loop = DBusQtMainLoop(set_as_default=True)
 session_bus = dbus.SessionBus(mainloop=dbus_loop)
 name = dbus.service.BusName("net.kosciak.PyWO", session_bus)
 service = DBusService(session_bus, "/net/kosciak/PyWO")
+notifier = ChangesNotifier(service)
 
 import gobject
 gobject.threads_init()
@@ -123,12 +501,20 @@ loop = gobject.MainLoop()
 def setup(config):
     service.CONFIG = config
 
+def reload(config):
+    # NOTE: just use new config, no need to restart the service
+    setup(config)
+
 def start():
     log.info('Starting PyWO D-Bus Service')
     thread = threading.Thread(name='D-Bus Service', target=loop.run)
     thread.start()
+    WORKERS.start()
+    notifier.start()
 
 def stop():
+    notifier.stop()
+    WORKERS.stop()
     loop.quit()
     log.info('PyWO D-Bus Service stopped')
 
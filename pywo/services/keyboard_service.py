@@ -50,7 +50,7 @@ class PywoModeKeyPressHandler(events.KeyHandler):
         """Event handler method for KeyPressEventHandler."""
         if not (event.modifiers, event.keycode) in self.mappings:
             return
-        log.debug('%s' % (event,))
+        log.debug('%s', event)
         action, section = self.mappings[event.modifiers, event.keycode]
         try:
             window = WM.active_window()
@@ -87,6 +87,26 @@ class PywoModeKeyPressHandler(events.KeyHandler):
         self.numlock = config.numlock
         self.capslock = config.capslock
 
+    def update_config(self, config, window):
+        """Set key mappings from new config, (un)grab only changed keys.
+
+        Return ``False`` if keys can't be updated without ungrabbing all.
+
+        """
+        if not (self.numlock, self.capslock) == \
+               (config.numlock, config.capslock):
+            return False
+        old_keys = set(self.mappings.keys())
+        self.set_config(config)
+        new_keys = set(self.mappings.keys())
+        for mask, code in old_keys - new_keys:
+            window.ungrab_key(mask, code, self.numlock, self.capslock)
+        for mask, code in new_keys - old_keys:
+            window.grab_key(mask, code, self.numlock, self.capslock)
+        log.debug('Ungrabbed %s keys, grabbed %s keys',
+                  len(old_keys - new_keys), len(new_keys - old_keys))
+        return True
+
 
 class ModalKeyHandler(events.KeyHandler):
 
@@ -131,7 +151,7 @@ class ModalKeyHandler(events.KeyHandler):
         Press ESC to go back to normal mode.
         
         """
-        log.debug('%s' % (event,))
+        log.debug('%s', event)
         if self.scroll_lock_led:
             WM.scroll_lock_led(True)
         if self.visual_bell:
@@ -142,7 +162,7 @@ class ModalKeyHandler(events.KeyHandler):
 
     def normal_mode(self, event):
         """Leave PyWO mode, enter normal mode."""
-        log.debug('%s' % (event,))
+        log.debug('%s', event)
         if self.scroll_lock_led:
             WM.scroll_lock_led(False)
         if self.visual_bell:
@@ -169,6 +189,18 @@ class ModalKeyHandler(events.KeyHandler):
         if not self.use_modal_mode:
             self.in_pywo_mode = True
 
+    def update_config(self, config, window):
+        """Set key mappings from new config, (un)grab only changed keys.
+
+        Works only if modal mode is not (and was not) used. Return ``False``
+        if keys can't be updated without ungrabbing all.
+
+        """
+        if self.use_modal_mode or \
+           (config.keys.get('pywo_mode') and config.modal_mode):
+            return False
+        return self.pywo_handler.update_config(config, window)
+
     def grab_keys(self, window):
         """Grab keys for self, or PywoKeyPressHandler."""
         if self.use_modal_mode:
@@ -193,6 +225,15 @@ def setup(config):
     HANDLER.set_config(config)
 
 
+def reload(config):
+    if HANDLER.update_config(config, WM):
+        log.info('Keyboard shortcuts updated')
+        return
+    stop()
+    setup(config)
+    start()
+
+
 def start():
     log.info('Registering keyboard shortcuts')
     HANDLER.grab_keys(WM)
@@ -24,6 +24,7 @@ import logging
 import os.path
 import sys
 
+from pywo import plugins
 from pywo.services import Service
 
 
@@ -33,6 +34,7 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 log = logging.getLogger(__name__)
 
 __SERVICES = set()
+__INSTANCES = {} # {Service subclass: instance, }
 
 
 def load_local(config):
@@ -56,21 +58,22 @@ def load_local(config):
 
 
 def load_plugins(config):
-    """Load third party ``pywo.services`` plugins."""
+    """Load third party ``pywo.services`` plugins.
+    
+    Plugins that are not enabled in config are not imported.
+    
+    """
     log.debug('Loading third-party services modules...')
-    try:
-        from pkg_resources import iter_entry_points
-    except ImportError:
-        return
-    for entry_point in iter_entry_points('pywo.services'):
-        if not (getattr(config, entry_point.module_name) or \
-                getattr(config, entry_point.name)):
+    for entry_point in plugins.entry_points('pywo.services'):
+        if not (getattr(config, entry_point.module_name, False) or \
+                getattr(config, entry_point.name, False)):
+            log.debug('Plugin %s not enabled', entry_point.name)
             continue
         log.debug('Loading plugin %s' % entry_point.name)
         try:
             plugin = entry_point.load()
         except Exception, exc:
-            log.exception('Exception %e while loading %s' % \
+            log.exception('Exception %s while loading %s' % \
                           (exc, entry_point.name))
             continue
         if isinstance(plugin, type) and \
@@ -79,7 +82,10 @@ def load_plugins(config):
              hasattr(plugin, 'start') and \
              hasattr(plugin, 'stop'))):
             # subclass of Service, or implementing all needed methods
-            __SERVICES.add(plugin())
+            # NOTE: reuse instance so running service can be reloaded
+            if not plugin in __INSTANCES:
+                __INSTANCES[plugin] = plugin()
+            __SERVICES.add(__INSTANCES[plugin])
         elif hasattr(plugin, 'setup') and \
              hasattr(plugin, 'start') and \
              hasattr(plugin, 'stop'):
@@ -90,6 +96,7 @@ def load_plugins(config):
 def load(config):
     """Load Services from local modules and plugins."""
     __SERVICES.clear()
+    plugins.clear() # check if installed plugins changed
     load_local(config)
     load_plugins(config)
     log.debug('Registered %s services' % (len(__SERVICES),))
@@ -0,0 +1,186 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""mru_service.py - most recently used windows list.
+
+Tracks changes of ``_NET_ACTIVE_WINDOW``, and ``_NET_CLIENT_LIST`` using
+the world model, so there's no need to ask X server which window was
+active before. Provides ``focus_previous``, ``focus_mru``, and
+``switch_with_previous`` actions.
+
+"""
+
+import collections
+import logging
+import threading
+
+from pywo import actions
+from pywo.core import WindowManager
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+
+class MRUList(object):
+
+    """Bounded list of windows' ids, most recently used first."""
+
+    MAX_SIZE = 64
+
+    def __init__(self, size=MAX_SIZE):
+        self.size = size
+        self.__ids = collections.OrderedDict() # {win_id: None, } newest last
+        self.__lock = threading.Lock()
+
+    def activated(self, win_id):
+        """Move window to the top of the list."""
+        self.__lock.acquire()
+        try:
+            self.__ids.pop(win_id, None)
+            self.__ids[win_id] = None
+            if len(self.__ids) > self.size:
+                self.__ids.popitem(last=False)
+        finally:
+            self.__lock.release()
+
+    def prune(self, windows_ids):
+        """Remove windows not present in given windows' ids."""
+        windows_ids = set(windows_ids)
+        self.__lock.acquire()
+        try:
+            for win_id in self.__ids.keys():
+                if not win_id in windows_ids:
+                    del self.__ids[win_id]
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """Remove all windows."""
+        self.__lock.acquire()
+        try:
+            self.__ids.clear()
+        finally:
+            self.__lock.release()
+
+    def ids(self):
+        """Return list of windows' ids, most recently used first."""
+        self.__lock.acquire()
+        try:
+            windows_ids = self.__ids.keys()
+        finally:
+            self.__lock.release()
+        windows_ids.reverse()
+        return windows_ids
+
+    def get(self, index):
+        """Return id of index-th most recently used window (0 is the last
+        activated one), or ``None``."""
+        windows_ids = self.ids()
+        if 0 <= index < len(windows_ids):
+            return windows_ids[index]
+        return None
+
+    def __len__(self):
+        return len(self.__ids)
+
+
+MRU = MRUList()
+RUNNING = False
+
+
+def __active_window(name):
+    """_NET_ACTIVE_WINDOW changed."""
+    win_id = WM.active_window_id()
+    if win_id:
+        MRU.activated(win_id)
+
+
+def __client_list(name):
+    """_NET_CLIENT_LIST changed, forget closed windows."""
+    MRU.prune(WM.windows_ids(stacking=False))
+
+
+def mru_window(index):
+    """Return index-th most recently used window."""
+    if not RUNNING:
+        raise actions.ActionException('MRU service is not running')
+    win_id = MRU.get(index)
+    if not win_id:
+        raise actions.ActionException('No window at MRU position %s' % index)
+    return WM.get_window(win_id)
+
+
+@actions.register(name='focus_previous')
+def _focus_previous(win):
+    """Activate previously active window."""
+    mru_window(1).activate()
+
+
+@actions.register(name='focus_mru')
+def _focus_mru(win, number=1):
+    """Activate N-th most recently used window (0 is active window)."""
+    mru_window(number).activate()
+
+
+@actions.register(name='switch_with_previous')
+def _switch_with_previous(win):
+    """Switch placement of active and previously active window."""
+    current = mru_window(0)
+    previous = mru_window(1)
+    current_geo, previous_geo = current.geometry, previous.geometry
+    current_desktop, previous_desktop = current.desktop, previous.desktop
+    current.set_geometry(previous_geo)
+    current.set_desktop(previous_desktop)
+    previous.set_geometry(current_geo)
+    previous.set_desktop(current_desktop)
+    WM.set_desktop(previous_desktop)
+    current.activate()
+
+
+def setup(config):
+    pass
+
+
+def start():
+    global RUNNING
+    # NOTE: stacking order is the best guess of the initial order
+    MRU.clear()
+    for win_id in reversed(WM.windows_ids(stacking=True)):
+        MRU.activated(win_id)
+    __active_window('_NET_ACTIVE_WINDOW')
+    WM.world.subscribe('_NET_ACTIVE_WINDOW', __active_window)
+    WM.world.subscribe('_NET_CLIENT_LIST', __client_list)
+    RUNNING = True
+    log.info('MRU windows list started')
+
+
+def stop():
+    global RUNNING
+    RUNNING = False
+    WM.world.unsubscribe('_NET_ACTIVE_WINDOW', __active_window)
+    WM.world.unsubscribe('_NET_CLIENT_LIST', __client_list)
+    MRU.clear()
+    log.info('MRU windows list stopped')
+
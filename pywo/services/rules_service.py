@@ -0,0 +1,417 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""rules_service.py - place new windows using rules from config file.
+
+Rules are defined in ``[RULE name]`` sections of the config file::
+
+    [RULE terminals]
+    class = xterm, urxvt
+    name = ^mutt
+    desktop = 1
+    section = left
+
+Windows are matched using (all given options must match):
+
+``class``
+    WM_CLASS instance or class names (case insensitive, separate with ', ')
+``name``, ``role``
+    regular expressions searched in window's name, and WM_WINDOW_ROLE
+``type``
+    window types (``normal``, ``dialog``, ``utility``, ...)
+
+Matching window is moved to ``desktop``, and ``monitor`` (screen number),
+placed in ``section`` (using ``put``) or ``grid`` section (using
+``grid_width``), and given ``state`` (``maximized``, ``fullscreen``,
+``shaded``, ``sticky``, ``above``, ``below``, ``iconified``).
+Rules are checked in order of their names, only the first matching rule
+is applied.
+
+Rules are hashed by class names, so only rules for window's class (and
+rules without ``class`` option) are checked. Properties of the new window
+are read when it is mapped, windows destroyed before that cost nothing
+but event mask change.
+
+When ``monitor`` is given, ``section`` and ``grid`` are relative to
+that monitor (as with ``--xinerama``).
+
+"""
+
+import logging
+import re
+
+from pywo import actions
+from pywo.core import WindowManager, Window, Geometry, Gravity, Mode
+from pywo.core import WindowType
+from pywo.core import events
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+MATCH_OPTIONS = ['class', 'name', 'role', 'type']
+APPLY_OPTIONS = ['desktop', 'monitor', 'section', 'grid', 'state']
+
+STATES = {'maximized': lambda win: win.maximize(Mode.SET),
+          'maximized_vert': lambda win: win.maximize(Mode.SET, horz=False),
+          'maximized_horz': lambda win: win.maximize(Mode.SET, vert=False),
+          'fullscreen': lambda win: win.fullscreen(Mode.SET),
+          'shaded': lambda win: win.shade(Mode.SET),
+          'sticky': lambda win: win.sticky(Mode.SET),
+          'above': lambda win: win.always_above(Mode.SET),
+          'below': lambda win: win.always_below(Mode.SET),
+          'iconified': lambda win: win.iconify(Mode.SET), }
+
+
+def split(value):
+    """Return list of lowercase values separated with ','."""
+    return [item.strip().lower() for item in value.split(',')
+                                 if item.strip()]
+
+
+class Rule(object):
+
+    """Window placement rule."""
+
+    def __init__(self, name, options):
+        """
+        `name`
+            name of the rule
+        `options`
+            dict of rule options (from ``[RULE name]`` section)
+
+        Raises `ValueError` if options are invalid.
+
+        """
+        self.name = name
+        unknown = set(options) - set(MATCH_OPTIONS) - set(APPLY_OPTIONS)
+        if unknown:
+            raise ValueError('unknown options: %s' % ', '.join(unknown))
+        self.classes = split(options.get('class', ''))
+        self.name_regex = self.__compile(options.get('name'))
+        self.role_regex = self.__compile(options.get('role'))
+        self.types = set()
+        for type_name in split(options.get('type', '')):
+            if not hasattr(WindowType, type_name.upper()):
+                raise ValueError('invalid type: %s' % type_name)
+            self.types.add(getattr(WindowType, type_name.upper()))
+        self.desktop = self.__int(options.get('desktop'))
+        self.monitor = self.__int(options.get('monitor'))
+        self.section = options.get('section') or None
+        self.grid = options.get('grid') or None
+        self.states = split(options.get('state', ''))
+        for state in self.states:
+            if not state in STATES:
+                raise ValueError('invalid state: %s' % state)
+
+    @staticmethod
+    def __compile(pattern):
+        """Return compiled regular expression (``None`` if not given)."""
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern.decode('utf-8'), re.UNICODE)
+        except re.error, exc:
+            raise ValueError('invalid regular expression %s: %s' %
+                             (pattern, exc))
+
+    @staticmethod
+    def __int(value):
+        """Return int value (``None`` if not given)."""
+        if not value:
+            return None
+        return int(value)
+
+    def matches(self, window):
+        """Return ``True`` if window matches the rule.
+
+        Class names are not checked, see :class:`Rules`.
+
+        """
+        if self.types and not self.types & set(window.type):
+            return False
+        if self.role_regex and not self.role_regex.search(window.role):
+            return False
+        if self.name_regex and not self.name_regex.search(window.name):
+            return False
+        return True
+
+    def __repr__(self):
+        return '<Rule %s>' % self.name
+
+
+class Rules(object):
+
+    """Set of rules hashed by class names."""
+
+    def __init__(self, rules):
+        """
+        `rules`
+            list of :class:`Rule` objects
+        """
+        self.__buckets = {} # {class name: [rule, ], }
+        self.__any_class = [] # [rule, ] - rules without class option
+        self.__order = {} # {rule: index, }
+        for index, rule in enumerate(sorted(rules, key=lambda r: r.name)):
+            self.__order[rule] = index
+            if not rule.classes:
+                self.__any_class.append(rule)
+            for class_name in rule.classes:
+                self.__buckets.setdefault(class_name, []).append(rule)
+
+    def find(self, window):
+        """Return the first rule matching the window (or ``None``)."""
+        candidates = set(self.__any_class)
+        for class_name in window.classes:
+            candidates.update(self.__buckets.get(class_name, []))
+        for rule in sorted(candidates, key=self.__order.get):
+            if rule.matches(window):
+                return rule
+        return None
+
+    def __len__(self):
+        return len(self.__order)
+
+
+class WindowProperties(object):
+
+    """Read window properties needed by rules, each one only once."""
+
+    def __init__(self, window):
+        self.window = window
+        self.__values = {}
+
+    def __get(self, name, function):
+        if not name in self.__values:
+            self.__values[name] = function()
+        return self.__values[name]
+
+    @property
+    def classes(self):
+        """Lowercase WM_CLASS instance and class names."""
+        def classes():
+            wm_class = self.window.get_property('WM_CLASS')
+            if not wm_class:
+                return []
+            return [name.lower() for name in wm_class.value.split('\0')
+                                 if name]
+        return self.__get('classes', classes)
+
+    @property
+    def name(self):
+        return self.__get('name', lambda: self.window.name.decode('utf-8',
+                                                                  'replace'))
+
+    @property
+    def role(self):
+        return self.__get('role', lambda: self.window.role.decode('utf-8',
+                                                                  'replace'))
+
+    @property
+    def type(self):
+        return self.__get('type', lambda: self.window.type)
+
+
+def load_rules(config):
+    """Return :class:`Rules` with valid rules from config."""
+    rules = []
+    for name, options in config.rules.items():
+        try:
+            rule = Rule(name, options)
+            for section in [rule.section, rule.grid]:
+                if section and not config.section(section):
+                    raise ValueError('invalid section: %s' % section)
+        except ValueError, exc:
+            log.error('Invalid rule %s: %s' % (name, exc))
+            continue
+        rules.append(rule)
+    return Rules(rules)
+
+
+class PlacedWindow(Window):
+
+    """Window with geometry set by the rule.
+
+    Window manager might not have applied new geometry yet, so geometry
+    set using this object is returned, instead of asking X Server.
+
+    """
+
+    def __init__(self, win_id, geometry):
+        Window.__init__(self, win_id)
+        self.__geometry = geometry
+
+    @property
+    def geometry(self):
+        geometry = self.__geometry
+        # NOTE: actions change returned geometry, always return a copy
+        return Geometry(geometry.x, geometry.y,
+                        geometry.width, geometry.height)
+
+    def set_geometry(self, geometry, on_resize=Gravity(0, 0)):
+        Window.set_geometry(self, geometry, on_resize)
+        self.__geometry = Geometry(geometry.x, geometry.y,
+                                   geometry.width, geometry.height)
+
+
+def move_to_monitor(window, monitor):
+    """Move window to screen with given number keeping relative position.
+
+    Return new geometry of the window (``None`` if monitor is invalid).
+
+    """
+    screens = WM.screen_geometries()
+    if not 0 <= monitor < len(screens):
+        log.warning('Invalid monitor: %s' % monitor)
+        return None
+    geometry = window.geometry
+    current = WM.nearest_screen_geometry(geometry)
+    target = screens[monitor] & WM.workarea_geometry or screens[monitor]
+    x = target.x + min(max(geometry.x - current.x, 0),
+                       max(target.width - geometry.width, 0))
+    y = target.y + min(max(geometry.y - current.y, 0),
+                       max(target.height - geometry.height, 0))
+    geometry = Geometry(x, y, geometry.width, geometry.height)
+    window.set_geometry(geometry)
+    return geometry
+
+
+def place(window, name, section, xinerama):
+    """Perform action with given name, and section on the window."""
+    action = actions.manager.get(name)
+    kwargs = action.get_kwargs(CONFIG, CONFIG.section(section))
+    if xinerama:
+        kwargs['xinerama'] = True
+    action(window, **kwargs)
+
+
+def apply_rule(rule, window):
+    """Apply rule to the window."""
+    log.debug('Applying %s to %s', rule, window)
+    if rule.desktop is not None:
+        window.set_desktop(rule.desktop)
+    placed = window
+    if rule.monitor is not None:
+        geometry = move_to_monitor(window, rule.monitor)
+        if geometry:
+            # NOTE: put and grid_width need new geometry, which might not
+            #       be applied by window manager yet (sync is not enough)
+            placed = PlacedWindow(window.id, geometry)
+    xinerama = rule.monitor is not None
+    try:
+        if rule.section:
+            place(placed, 'put', rule.section, xinerama)
+        if rule.grid:
+            place(placed, 'grid_width', rule.grid, xinerama)
+    except actions.ActionException, exc:
+        log.warning('Can\'t apply %s to %s: %s' % (rule, window, exc))
+    for state in rule.states:
+        STATES[state](window)
+    window.flush()
+
+
+class NewWindowsHandler(events.CreateNotifyHandler):
+
+    """Apply rules to new windows.
+
+    Only event mask of the new window is changed on `X.CreateNotify`,
+    properties are read when the window is mapped. Window mapped before
+    its event mask was changed is handled right away.
+
+    """
+
+    def __init__(self):
+        events.CreateNotifyHandler.__init__(self, self.__created)
+        self.__map_handler = events.MapNotifyHandler(self.__mapped)
+        self.__destroy_handler = events.DestroyNotifyHandler(self.__destroyed)
+        self.pending = set() # ids of created, but not yet mapped windows
+
+    def __created(self, event):
+        if not RULES or event.override:
+            # NOTE: menus, tooltips, etc are not managed by window manager
+            return
+        window = Window(event.window_id)
+        self.pending.add(window.id)
+        window.register(self.__map_handler)
+        window.register(self.__destroy_handler)
+        # NOTE: MapNotify sent before event mask was changed is lost
+        mapped = window.mapped
+        if mapped is None:
+            # NOTE: already destroyed, DestroyNotify might be lost too
+            self.__forget(window)
+        elif mapped:
+            self.__apply(window)
+
+    def __forget(self, window):
+        self.pending.discard(window.id)
+        window.unregister(self.__map_handler)
+        window.unregister(self.__destroy_handler)
+
+    def __mapped(self, event):
+        self.__apply(event.window)
+
+    def __apply(self, window):
+        if not window.id in self.pending:
+            # already handled (MapNotify after checking map state)
+            return
+        self.__forget(window)
+        rule = RULES.find(WindowProperties(window))
+        if rule:
+            apply_rule(rule, window)
+
+    def __destroyed(self, event):
+        self.__forget(event.window)
+
+    def forget_all(self):
+        """Stop listening for events of all pending windows."""
+        for window_id in list(self.pending):
+            self.__forget(Window(window_id))
+
+
+HANDLER = NewWindowsHandler()
+RULES = Rules([])
+CONFIG = None
+
+
+def setup(config):
+    global RULES, CONFIG
+    CONFIG = config
+    RULES = load_rules(config)
+
+
+def reload(config):
+    setup(config)
+    log.info('Loaded %s window rules', len(RULES))
+
+
+def start():
+    log.info('Starting window rules service (%s rules)', len(RULES))
+    WM.register(HANDLER)
+
+
+def stop():
+    WM.unregister(HANDLER)
+    HANDLER.forget_all()
+    log.info('Window rules service stopped')
+
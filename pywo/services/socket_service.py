@@ -0,0 +1,156 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""socket_service.py - perform commandline actions sent by pywo.client.
+
+Listens on UNIX socket (``$XDG_RUNTIME_DIR/pywo.sock``), see
+:mod:`pywo.client` for protocol description.
+
+"""
+
+import logging
+import os
+import socket
+import SocketServer
+import threading
+
+from pywo import actions
+from pywo.actions import parser
+from pywo.client import json, socket_path
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class RequestHandler(SocketServer.StreamRequestHandler):
+
+    """Handle one commandline request."""
+
+    def handle(self):
+        try:
+            args = json.loads(self.rfile.readline())
+            if not isinstance(args, list):
+                raise ValueError('list of arguments expected')
+            args = [arg.encode('utf-8') for arg in args]
+        except (ValueError, AttributeError), exc:
+            log.warning('Invalid request: %s' % exc)
+            self.respond(2, 'invalid request')
+            return
+        log.debug('SOCKET: args=%s', args)
+        # NOTE: output of actions (e.g. stats) is printed by the client
+        actions.start_output()
+        try:
+            try:
+                (options, args) = parser.parse_args(args)
+                actions.perform(options, args, self.server.config)
+            finally:
+                output = actions.finish_output()
+        except parser.ParserException, exc:
+            self.respond(2, str(exc), output)
+        except actions.ActionException, exc:
+            self.respond(2, str(exc), output)
+        except Exception, exc:
+            log.exception('Exception %s while performing %s' % (exc, args))
+            self.respond(1, str(exc), output)
+        else:
+            self.respond(0, '', output)
+
+    def respond(self, status, message, output=''):
+        """Send response to the client."""
+        try:
+            self.wfile.write(json.dumps([status, message, output]))
+        except socket.error, exc:
+            log.warning('Can\'t send response: %s' % exc)
+
+
+class UnixServer(SocketServer.ThreadingMixIn,
+                 SocketServer.UnixStreamServer):
+
+    """Threading UNIX socket server."""
+
+    daemon_threads = True
+
+    def __init__(self, path, config):
+        self.config = config
+        remove_stale(path)
+        # NOTE: only user can connect
+        umask = os.umask(0177)
+        try:
+            SocketServer.UnixStreamServer.__init__(self, path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+
+def remove_stale(path):
+    """Remove socket file if there's no daemon listening on it."""
+    if not os.path.exists(path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except socket.error:
+            log.debug('Removing stale socket %s', path)
+            os.remove(path)
+            return
+    finally:
+        sock.close()
+    raise socket.error('PyWO daemon already listening on %s' % path)
+
+
+__SERVER = None
+__CONFIG = None
+
+
+def setup(config):
+    global __CONFIG
+    __CONFIG = config
+    if __SERVER:
+        __SERVER.config = config
+
+def reload(config):
+    # NOTE: just use new config, no need to restart the service
+    setup(config)
+
+def start():
+    global __SERVER
+    path = socket_path()
+    __SERVER = UnixServer(path, __CONFIG)
+    log.info('Starting PyWO Socket Service on %s', path)
+    thread = threading.Thread(name='Socket Service',
+                              target=__SERVER.serve_forever)
+    thread.start()
+
+def stop():
+    global __SERVER
+    if not __SERVER:
+        return
+    __SERVER.shutdown()
+    __SERVER.server_close()
+    try:
+        os.remove(__SERVER.server_address)
+    except OSError:
+        pass
+    __SERVER = None
+    log.info('PyWO Socket Service stopped')
+
@@ -0,0 +1,245 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""spatial_service.py - spatial index of windows for focus, swap, and grid
+actions.
+
+Keeps :class:`~pywo.core.spatial.SpatialIndex` of windows on the current
+desktop. Windows are marked as changed on `X.ConfigureNotify`,
+`X.MapNotify`, and `X.UnmapNotify` events, and when their desktop or state
+is changed (`X.PropertyNotify`), and only changed windows are
+read from X server when index is used by ``focus``, and ``swap`` actions,
+or by grid actions looking for free space around the window (without the
+service all windows are checked every time). Service is enabled in the
+default configuration.
+
+"""
+
+import logging
+import threading
+
+from pywo.actions import manipulate
+from pywo.core import WindowManager, Window
+from pywo.core import filters
+from pywo.core.events import ConfigureNotifyHandler
+from pywo.core.events import MapNotifyHandler, UnmapNotifyHandler
+from pywo.core.events import PropertyNotifyHandler
+from pywo.core.spatial import SpatialIndex
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+
+class WindowsIndex(object):
+
+    """Spatial index of windows on the current desktop."""
+
+    # Properties of the client windows changing their place in the index
+    PROPERTIES = ['_NET_WM_DESKTOP', '_NET_WM_STATE', ]
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__clients = set()
+        self.__changed = set() # ids of windows that must be read again
+        self.__windows = {} # {win_id: (desktop, geometry) or None, }
+        self.__desktop = None # desktop of the current index
+        self.__index = None
+        self.__handlers = [ConfigureNotifyHandler(self.__window_changed),
+                           MapNotifyHandler(self.__window_changed),
+                           UnmapNotifyHandler(self.__window_changed),
+                           PropertyNotifyHandler(self.__property_changed), ]
+        self.__atoms = set() # atoms of PROPERTIES
+        self.__properties = {
+            '_NET_CLIENT_LIST': self.__client_list,
+            '_NET_CURRENT_DESKTOP': self.__current_desktop,
+        }
+
+    def start(self):
+        """Start listening to root window and all client windows."""
+        self.__atoms = set([WM.atom(name) for name in self.PROPERTIES])
+        self.__lock.acquire()
+        try:
+            self.__clients = set(WM.windows_ids(stacking=False))
+            for win_id in self.__clients:
+                self.__register(win_id)
+            self.__changed = set(self.__clients)
+            self.__index = SpatialIndex()
+            self.__desktop = None
+        finally:
+            self.__lock.release()
+        for name, method in self.__properties.items():
+            WM.world.subscribe(name, method)
+
+    def stop(self):
+        """Stop listening to X events."""
+        for name, method in self.__properties.items():
+            WM.world.unsubscribe(name, method)
+        self.__lock.acquire()
+        try:
+            for win_id in self.__clients:
+                self.__unregister(win_id)
+            self.__clients = set()
+            self.__changed = set()
+            self.__windows.clear()
+            self.__index = None
+        finally:
+            self.__lock.release()
+
+    def __register(self, win_id):
+        window = Window(win_id)
+        for handler in self.__handlers:
+            window.register(handler)
+
+    def __unregister(self, win_id):
+        window = Window(win_id)
+        for handler in self.__handlers:
+            window.unregister(handler)
+
+    def __client_list(self, name):
+        """Start listening to new windows, forget closed ones."""
+        self.__lock.acquire()
+        try:
+            clients = set(WM.windows_ids(stacking=False))
+            for win_id in clients - self.__clients:
+                self.__register(win_id)
+                self.__changed.add(win_id)
+            for win_id in self.__clients - clients:
+                self.__unregister(win_id)
+                self.__changed.discard(win_id)
+                self.__windows.pop(win_id, None)
+                if self.__index is not None:
+                    self.__index.remove(win_id)
+            self.__clients = clients
+        finally:
+            self.__lock.release()
+
+    def __current_desktop(self, name):
+        """Index must be rebuilt (without asking X server)."""
+        self.__lock.acquire()
+        try:
+            self.__desktop = None
+        finally:
+            self.__lock.release()
+
+    def __window_changed(self, event):
+        self.__lock.acquire()
+        try:
+            if event.window_id in self.__clients:
+                self.__changed.add(event.window_id)
+        finally:
+            self.__lock.release()
+
+    def __property_changed(self, event):
+        if event.atom in self.__atoms:
+            self.__window_changed(event)
+
+    @staticmethod
+    def __read(win_id):
+        """Return (desktop, geometry) of the window, or ``None`` if window
+        should not be indexed."""
+        window = Window(win_id)
+        try:
+            if not filters.STANDARD(window):
+                return None
+            return (window.desktop, window.geometry)
+        except Exception, exc:
+            log.debug('Can\'t read %s: %s', window, exc)
+            return None
+
+    def __update(self):
+        """Read changed windows, and update index."""
+        desktop = WM.desktop
+        for win_id in self.__changed:
+            self.__windows[win_id] = self.__read(win_id)
+        if desktop == self.__desktop:
+            changed = self.__changed
+        else:
+            changed = self.__windows.keys()
+            self.__index = SpatialIndex()
+            self.__desktop = desktop
+        for win_id in changed:
+            data = self.__windows[win_id]
+            if data and data[0] in [desktop, Window.ALL_DESKTOPS]:
+                self.__index.insert(win_id, data[1])
+            else:
+                self.__index.remove(win_id)
+        self.__changed = set()
+
+    def nearest(self, win, direction):
+        """Return id of the nearest window in given direction (or ``None``).
+
+        See :meth:`~pywo.core.spatial.SpatialIndex.nearest`.
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__update()
+            geometry = self.__index.get(win.id) or win.geometry
+            return self.__index.nearest(geometry, direction, exclude=win.id)
+        finally:
+            self.__lock.release()
+
+    def all_geometries(self):
+        """Return {win_id: geometry} of all indexed windows (on all
+        desktops)."""
+        self.__lock.acquire()
+        try:
+            self.__update()
+            return dict([(win_id, data[1])
+                         for win_id, data in self.__windows.items() if data])
+        finally:
+            self.__lock.release()
+
+    def geometries(self, exclude=None):
+        """Return list of geometries of indexed windows (except window
+        with `exclude` id)."""
+        self.__lock.acquire()
+        try:
+            self.__update()
+            return [self.__index.get(win_id)
+                    for win_id in self.__index.keys()
+                    if win_id != exclude]
+        finally:
+            self.__lock.release()
+
+
+INDEX = WindowsIndex()
+
+
+def setup(config):
+    pass
+
+
+def start():
+    INDEX.start()
+    manipulate.INDEX = INDEX
+    log.info('Spatial index of windows started')
+
+
+def stop():
+    manipulate.INDEX = None
+    INDEX.stop()
+    log.info('Spatial index of windows stopped')
+
@@ -0,0 +1,185 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""watcher.py - watch configuration files for changes.
+
+Uses inotify (through pyinotify) if available, polls files otherwise.
+
+"""
+
+import logging
+import os.path
+import threading
+import time
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+from pywo import cache
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class ConfigWatcher(threading.Thread):
+
+    """Watch files, and call `callback` when any of them is changed.
+
+    Files are compared using (path, mtime, size) stamps, so notifications
+    (or polling) only tell when to check the files. Files that don't exist
+    yet are also watched.
+
+    Notifier is used (replaced, and closed) only by the watcher thread,
+    which might be waiting for its events.
+
+    """
+
+    POLL_INTERVAL = 2
+    """Seconds between checks (or inotify timeouts)."""
+    SETTLE_TIME = 0.2
+    """Seconds to wait after notification, editors write files in steps."""
+
+    def __init__(self, files, callback):
+        threading.Thread.__init__(self, name='ConfigWatcher')
+        self.setDaemon(True)
+        self.callback = callback
+        self.__lock = threading.Lock()
+        self.__files = list(files)
+        self.__files_changed = False # notifier must be replaced
+        self.__stamps = cache.file_stamps(self.__files)
+        self.__stopped = threading.Event()
+        self.__notifier = None
+        if pyinotify:
+            self.__notifier = self.__inotify_notifier(self.__files)
+
+    @staticmethod
+    def __inotify_notifier(files):
+        """Return pyinotify Notifier watching directories of given files."""
+        mask = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO | \
+               pyinotify.IN_CREATE | pyinotify.IN_DELETE
+        watch_manager = pyinotify.WatchManager()
+        directories = set([os.path.dirname(os.path.abspath(path))
+                           for path in files])
+        for directory in directories:
+            if os.path.isdir(directory):
+                watch_manager.add_watch(directory, mask, quiet=True)
+        return pyinotify.Notifier(watch_manager, lambda event: None)
+
+    def set_files(self, files):
+        """Set new list of watched files.
+
+        Notifier is replaced by the watcher thread before the next check.
+
+        """
+        files = list(files)
+        self.__lock.acquire()
+        try:
+            if files == self.__files:
+                return
+            self.__files = files
+            self.__files_changed = True
+            self.__stamps = cache.file_stamps(files)
+        finally:
+            self.__lock.release()
+
+    def __update_notifier(self):
+        """Replace notifier if list of watched files changed."""
+        self.__lock.acquire()
+        try:
+            if not self.__files_changed:
+                return
+            self.__files_changed = False
+            files = self.__files
+        finally:
+            self.__lock.release()
+        if self.__notifier:
+            self.__notifier.stop()
+            self.__notifier = self.__inotify_notifier(files)
+
+    def __close_notifier(self):
+        """Stop notifier, and close its inotify file descriptor."""
+        self.__lock.acquire()
+        try:
+            notifier, self.__notifier = self.__notifier, None
+        finally:
+            self.__lock.release()
+        if notifier:
+            notifier.stop()
+
+    def __check(self):
+        """Return ``True`` if files changed since the last check."""
+        self.__lock.acquire()
+        try:
+            stamps = cache.file_stamps(self.__files)
+            if stamps == self.__stamps:
+                return False
+            self.__stamps = stamps
+            return True
+        finally:
+            self.__lock.release()
+
+    def __wait(self):
+        """Wait for possible change of the files."""
+        notifier = self.__notifier
+        if not notifier:
+            self.__stopped.wait(self.POLL_INTERVAL)
+            return
+        if notifier.check_events(timeout=self.POLL_INTERVAL * 1000):
+            notifier.read_events()
+            notifier.process_events()
+            time.sleep(self.SETTLE_TIME)
+
+    def run(self):
+        """Main loop - wait for changes and call callback."""
+        log.debug('%s started, using %s',
+                  self.getName(), pyinotify and 'inotify' or 'polling')
+        try:
+            while not self.__stopped.isSet():
+                self.__update_notifier()
+                self.__wait()
+                if self.__stopped.isSet():
+                    break
+                if not self.__check():
+                    continue
+                log.info('Configuration files changed')
+                try:
+                    self.callback()
+                except Exception, exc:
+                    log.exception('Exception %s while calling %s' %
+                                  (exc, self.callback))
+        finally:
+            self.__close_notifier()
+        log.debug('%s stopped', self.getName())
+
+    def stop(self):
+        """Stop watching files.
+
+        Notifier is closed by the watcher thread after the current check,
+        or right away if the thread is not running.
+
+        """
+        self.__stopped.set()
+        if not self.isAlive():
+            self.__close_notifier()
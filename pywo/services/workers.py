@@ -0,0 +1,158 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""workers.py - pool of worker threads used by services.
+
+Tasks submitted with the same key (for example window id) are performed
+one after another in order of submission, tasks with different keys are
+performed concurrently.
+
+Every :meth:`OrderedWorkers.stop` replaces queues of tasks, so stopped
+threads (still finishing their tasks) never take tasks submitted later.
+
+"""
+
+import collections
+import logging
+import Queue
+import threading
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class OrderedWorkers(object):
+
+    """Pool of worker threads keeping order of tasks with the same key."""
+
+    JOIN_TIMEOUT = 5
+    """Seconds to wait for each thread to finish its task on stop."""
+
+    def __init__(self, name, size=4):
+        self.name = name
+        self.size = size
+        self.__lock = threading.Lock()
+        self.__pending = {} # {key: deque of tasks, }
+        self.__ready = Queue.Queue() # keys with tasks waiting for worker
+        self.__threads = []
+
+    def start(self):
+        """Start worker threads."""
+        for number in range(self.size):
+            thread = threading.Thread(name='%s-%s' % (self.name, number),
+                                      target=self.__work,
+                                      args=(self.__pending, self.__ready))
+            thread.setDaemon(True)
+            thread.start()
+            self.__threads.append(thread)
+
+    def stop(self):
+        """Stop worker threads, pending tasks are not performed.
+
+        Waits until tasks being performed are finished (unless called by
+        one of the worker threads).
+
+        """
+        self.__lock.acquire()
+        try:
+            self.__pending.clear()
+            ready = self.__ready
+            threads = self.__threads
+            # NOTE: tasks submitted from now on wait for next start
+            self.__pending = {}
+            self.__ready = Queue.Queue()
+            self.__threads = []
+        finally:
+            self.__lock.release()
+        for thread in threads:
+            ready.put(None)
+        current = threading.currentThread()
+        for thread in threads:
+            if thread is current:
+                # NOTE: stopped by the task (for example reload action)
+                continue
+            thread.join(self.JOIN_TIMEOUT)
+            if thread.isAlive():
+                log.warning('%s still performing task' % thread.getName())
+
+    def submit(self, key, function, *args, **kwargs):
+        """Perform function(*args, **kwargs) in one of worker threads."""
+        task = (function, args, kwargs)
+        self.__lock.acquire()
+        try:
+            pending, ready = self.__pending, self.__ready
+            if key in pending:
+                # other task with the same key is performed or waiting
+                pending[key].append(task)
+                return
+            pending[key] = collections.deque([task])
+        finally:
+            self.__lock.release()
+        ready.put(key)
+
+    def __next_task(self, pending, key):
+        """Return next task with given key, or None."""
+        self.__lock.acquire()
+        try:
+            tasks = pending.get(key)
+            if tasks:
+                return tasks[0]
+            pending.pop(key, None)
+            return None
+        finally:
+            self.__lock.release()
+
+    def __done(self, pending, key):
+        """Remove performed task, return True if there are more tasks."""
+        self.__lock.acquire()
+        try:
+            tasks = pending.get(key)
+            if not tasks:
+                return False
+            tasks.popleft()
+            if tasks:
+                return True
+            del pending[key]
+            return False
+        finally:
+            self.__lock.release()
+
+    def __work(self, pending, ready):
+        """Main loop of the worker thread."""
+        while True:
+            key = ready.get()
+            if key is None:
+                break
+            task = self.__next_task(pending, key)
+            if not task:
+                continue
+            function, args, kwargs = task
+            try:
+                function(*args, **kwargs)
+            except Exception, exc:
+                log.exception('Exception %s while performing %s' %
+                              (exc, function))
+            if self.__done(pending, key):
+                # NOTE: next task with the same key waits for any worker
+                ready.put(key)
+
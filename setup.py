@@ -39,7 +39,7 @@ setup(
     tests_require=['nose'],
     entry_points={
         'console_scripts': [
-            'pywo = pywo.main:run',
+            'pywo = pywo.client:run',
         ],
     },
     #scripts = ['bin/pywo'],
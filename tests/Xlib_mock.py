@@ -568,6 +568,13 @@ class RootWindow(AbstractWindow):
             return Value(self._prop('_NET_WORKAREA') * desktops)
         return AbstractWindow.get_full_property(self, property, type, sizehint)
 
+    def get_geometry(self):
+        return Geometry(0, 0, self.screen_width, self.screen_height)
+
+    def change_attributes(self, onerror=None, **keys):
+        # used to set event_mask
+        pass
+
     def send_event(self, event, event_mask=0, propagate=0, onerror=None):
         self.display.send_event(self, event, event_mask, propagate, onerror)
 
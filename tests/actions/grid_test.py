@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from Xlib import X
+
+from pywo.core import Geometry, Gravity
+from pywo.actions import grid_actions, manipulate
+from pywo.actions.grid_actions import CyclerStore
+
+
+class FakeEvent(object):
+
+    def __init__(self, type, **kwargs):
+        self.type = type
+        for name, window in kwargs.items():
+            setattr(self, name, window)
+
+
+class FakeWindow(object):
+
+    def __init__(self, id):
+        self.id = id
+        self.handlers = set()
+
+    def register(self, handler):
+        self.handlers.add(handler)
+
+    def unregister(self, handler=None):
+        self.handlers.discard(handler)
+
+    def destroy(self):
+        """Deliver DestroyNotify like X server does - only to handlers 
+        that selected StructureNotify on the destroyed window."""
+        for handler in list(self.handlers):
+            if X.StructureNotifyMask in handler.masks:
+                handler.handle_event(FakeEvent(X.DestroyNotify, 
+                                               event=self, window=self))
+
+
+class FakeWindowManager(object):
+
+    def __init__(self, windows):
+        self.windows = dict([(win.id, win) for win in windows])
+
+    def get_window(self, win_id):
+        return self.windows[win_id]
+
+
+class FakeIndex(object):
+
+    def __init__(self, geometries):
+        self.geometries_ids = geometries
+
+    def geometries(self, exclude=None):
+        return [geometry for win_id, geometry in self.geometries_ids.items()
+                         if win_id != exclude]
+
+
+class CyclerStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.windows = [FakeWindow(win_id) for win_id in range(3)]
+        self.WM = grid_actions.WM
+        grid_actions.WM = FakeWindowManager(self.windows)
+        self.store = CyclerStore(size=2)
+
+    def tearDown(self):
+        grid_actions.WM = self.WM
+
+    def test_lru(self):
+        first, second, third = self.windows
+        self.store.set(first, 'first')
+        self.store.set(second, 'second')
+        self.assertEqual(self.store.get(first.id), 'first')
+        self.store.set(third, 'third')
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.get(second.id), None)
+        self.assertEqual(second.handlers, set())
+        self.assertEqual(self.store.get(first.id), 'first')
+
+    def test_destroyed(self):
+        first, second, third = self.windows
+        self.store.set(first, 'first')
+        self.store.set(second, 'second')
+        first.destroy()
+        self.assertEqual(self.store.get(first.id), None)
+        self.assertEqual(self.store.get(second.id), 'second')
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(first.handlers, set())
+
+
+class IndexedOthersTests(unittest.TestCase):
+
+    def setUp(self):
+        self.win = FakeWindow(1)
+        self.win.geometry = Geometry(100, 100, 100, 100)
+        manipulate.INDEX = FakeIndex({1: self.win.geometry,
+                                      2: Geometry(300, 0, 100, 600),
+                                      3: Geometry(0, 300, 100, 100)})
+        # NOTE: X server must not be asked for windows
+        self.WM = manipulate.WM
+        manipulate.WM = None
+
+    def tearDown(self):
+        manipulate.INDEX = None
+        manipulate.WM = self.WM
+
+    def test_indexed_others(self):
+        others = manipulate.indexed_others(self.win)
+        self.assertEqual(sorted([(other.x, other.y) for other in others]),
+                         [(0, 300), (300, 0)])
+        self.assertEqual(others[0].geometry, others[0])
+        manipulate.INDEX = None
+        self.assertEqual(manipulate.indexed_others(self.win), None)
+
+    def test_expand(self):
+        expand = manipulate.Expander(workarea=Geometry(0, 0, 800, 600),
+                                     adjacent=False)
+        others = manipulate.indexed_others(self.win)
+        self.assertEqual(expand(self.win, Gravity.parse('RIGHT'), others),
+                         Geometry(100, 100, 200, 100))
+        self.assertEqual(expand(self.win, Gravity.parse('BOTTOM'), others),
+                         Geometry(100, 100, 100, 500))
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [CyclerStoreTests,
+                  IndexedOthersTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
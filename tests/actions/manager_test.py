@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo import actions
+
+
+class ManifestTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_home = os.environ.get('XDG_CACHE_HOME')
+        self.directory = tempfile.mkdtemp()
+        os.environ['XDG_CACHE_HOME'] = self.directory
+
+    def tearDown(self):
+        if self.cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.cache_home
+        shutil.rmtree(self.directory)
+
+    def test_all_actions(self):
+        actions.manager.load()
+        names = sorted([action.name
+                        for action in actions.manager.get_all()])
+        manifest = actions.manager.get_manifest()
+        self.assertEqual(sorted(manifest.keys()), names)
+        # core actions are registered when pywo.actions is imported
+        self.assertTrue('debug' in manifest)
+        self.assertTrue('stats' in manifest)
+        self.assertEqual(manifest['debug'].module, 'pywo.actions.core')
+        self.assertEqual(manifest['put'].module,
+                         'pywo.actions.moveresize_actions')
+
+    def test_stored(self):
+        actions.manager.load()
+        names = sorted([action.name
+                        for action in actions.manager.get_all()])
+        # NOTE: force reading manifest from cache
+        setattr(actions.manager, '__MANIFEST', None)
+        manifest = actions.manager.get_manifest()
+        self.assertEqual(sorted(manifest.keys()), names)
+
+    def test_runtime_actions(self):
+        # NOTE: like exit, and reload registered by the daemon
+        def runtime_action(win):
+            pass
+        actions.register(name='test_runtime')(runtime_action)
+        try:
+            actions.manager.load()
+            self.assertTrue(actions.manager.get('test_runtime'))
+            manifest = actions.manager.get_manifest()
+            self.assertFalse('test_runtime' in manifest)
+            self.assertTrue('debug' in manifest)
+        finally:
+            getattr(actions.manager, '__ACTIONS').pop('test_runtime')
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [ManifestTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
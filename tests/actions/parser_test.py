@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import Gravity, Size, Mode
+from pywo.actions import parser
+
+
+class ParseDictTests(unittest.TestCase):
+
+    def test_parse_dict(self):
+        options = parser.parse_dict({'action': u'put', 'gravity': 'TOP'})
+        self.assertEqual(options.action, 'put')
+        self.assertEqual(options.gravity, Gravity(0.5, 0))
+        self.assertEqual(options.mode, Mode.TOGGLE)
+
+    def test_parse_dict__same_as_parse_args(self):
+        options = parser.parse_dict({'gravity': 'TOP', 'size': ('H', 'F')})
+        args_options, args = parser.parse_args('-g TOP -s H F')
+        for name in ['gravity', 'position', 'direction', 'size']:
+            self.assertEqual(getattr(options, name), 
+                             getattr(args_options, name))
+
+    def test_parse_dict__gravity(self):
+        options = parser.parse_dict({'position': (0.25, 1)})
+        self.assertEqual(options.position, Gravity(0.25, 1))
+        self.assertEqual(options.gravity, Gravity(0.25, 1))
+        self.assertEqual(options.direction, None)
+        options = parser.parse_dict({'direction': '1, 0'})
+        self.assertEqual(options.direction, Gravity(1, 0))
+
+    def test_parse_dict__size(self):
+        options = parser.parse_dict({'size': (0.5, 'T*2')})
+        self.assertEqual(options.size, Size(0.5, 2.0/3))
+        options = parser.parse_dict({'width': 'H, F', 'height': 0.5})
+        self.assertEqual(options.width, Size([0.5, 1.0], 0))
+        self.assertEqual(options.height, Size(0, 0.5))
+
+    def test_parse_dict__mode(self):
+        self.assertEqual(parser.parse_dict({'mode': 'on'}).mode, Mode.SET)
+        self.assertEqual(parser.parse_dict({'mode': 'OFF'}).mode, Mode.UNSET)
+        self.assertEqual(parser.parse_dict({'mode': 2}).mode, Mode.TOGGLE)
+
+    def test_parse_dict__invalid(self):
+        self.assertRaises(parser.ParserException, 
+                          parser.parse_dict, {'foo': 1})
+        self.assertRaises(parser.ParserException, 
+                          parser.parse_dict, {'gravity': 'top'})
+        self.assertRaises(parser.ParserException, 
+                          parser.parse_dict, {'size': (1, )})
+        self.assertRaises(parser.ParserException, 
+                          parser.parse_dict, {'mode': 5})
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [ParseDictTests]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
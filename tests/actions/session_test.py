@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.actions import ActionException
+from pywo.actions import parser, perform, session_actions
+
+
+def record(class_name, name, pid):
+    return {'class': class_name, 'name': name, 'pid': pid,
+            'desktop': 0, 'geometry': [0, 0, 100, 100], 'state': []}
+
+
+class MatchWindowsTests(unittest.TestCase):
+
+    def test_same_name_and_pid(self):
+        records = [record(u'xterm', u'vim', 10), record(u'xterm', u'mutt', 11)]
+        candidates = [(1, u'xterm', u'mutt', 11), (2, u'xterm', u'vim', 10)]
+        matched = session_actions.match_windows(records, candidates)
+        self.assertEqual([(rec['name'], key) for rec, key in matched],
+                         [(u'vim', 2), (u'mutt', 1)])
+
+    def test_best_match_first(self):
+        # NOTE: second record matches name and pid, first only class
+        records = [record(u'xterm', u'top', 5), record(u'xterm', u'vim', 10)]
+        candidates = [(1, u'xterm', u'vim', 10), (2, u'xterm', u'bash', 20)]
+        matched = session_actions.match_windows(records, candidates)
+        self.assertEqual(sorted([(rec['name'], key) for rec, key in matched]),
+                         [(u'top', 2), (u'vim', 1)])
+
+    def test_name_changed(self):
+        records = [record(u'firefox', u'Old title', 30)]
+        candidates = [(1, u'xterm', u'Old title', 31),
+                      (2, u'firefox', u'New title', 30)]
+        matched = session_actions.match_windows(records, candidates)
+        self.assertEqual([key for rec, key in matched], [2])
+
+    def test_no_match(self):
+        records = [record(u'gimp', u'GIMP', 40), record(u'xterm', u'a', 1)]
+        candidates = [(1, u'xterm', u'b', 2)]
+        matched = session_actions.match_windows(records, candidates)
+        self.assertEqual([(rec['class'], key) for rec, key in matched],
+                         [(u'xterm', 1)])
+        self.assertFalse('matched' in records[0])
+        self.assertFalse('matched' in records[1])
+
+
+class DataHomeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.data_home = tempfile.mkdtemp()
+        self.old_data_home = os.environ.get('XDG_DATA_HOME')
+        os.environ['XDG_DATA_HOME'] = self.data_home
+
+    def tearDown(self):
+        if self.old_data_home is None:
+            del os.environ['XDG_DATA_HOME']
+        else:
+            os.environ['XDG_DATA_HOME'] = self.old_data_home
+        shutil.rmtree(self.data_home)
+
+
+class SessionFileTests(DataHomeTests):
+
+    def test_save_load(self):
+        records = [record(u'xterm', u'vim \u2713', 10)]
+        path = session_actions.save('work', records)
+        self.assertEqual(os.path.dirname(path),
+                         os.path.join(self.data_home, 'pywo', 'sessions'))
+        self.assertEqual(session_actions.load('work'), records)
+
+    def test_invalid_name(self):
+        self.assertRaises(ActionException,
+                          session_actions.save, '../work', [])
+        self.assertRaises(ActionException,
+                          session_actions.load, '')
+
+    def test_missing(self):
+        self.assertRaises(ActionException,
+                          session_actions.load, 'missing')
+
+
+class Config(object):
+
+    def alias(self, name):
+        return name
+
+    def section(self, name):
+        return None
+
+
+class SessionActionTests(DataHomeTests):
+
+    def perform(self, args):
+        (options, args) = parser.parse_args(args)
+        perform(options, args, Config(), win_id=1)
+
+    def assertRaisesMessage(self, message, function, *args):
+        try:
+            function(*args)
+        except ActionException, exc:
+            self.assertEqual(str(exc), message)
+        else:
+            self.fail('ActionException not raised')
+
+    def test_restore__missing(self):
+        self.assertRaisesMessage('No such SESSION: missing',
+                                 self.perform,
+                                 ['restore_session', '--session=missing'])
+
+    def test_restore__positional_name(self):
+        self.assertRaisesMessage('No such SESSION: missing',
+                                 self.perform, ['restore_session', 'missing'])
+
+    def test_restore__invalid_file(self):
+        path = session_actions.save('work', [])
+        open(path, 'w').write('{')
+        self.assertRaises(ActionException,
+                          self.perform, ['restore_session', 'work'])
+
+    def test_save__invalid_name(self):
+        self.assertRaisesMessage('Invalid SESSION name: .work',
+                                 self.perform, ['save_session', '.work'])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [MatchWindowsTests,
+                  SessionFileTests,
+                  SessionActionTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import unittest
+
+import os
+import socket
+import tempfile
+import threading
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo import client
+
+
+class ClientTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'pywo.sock')
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def serve(self, response):
+        """Accept one connection, respond, and return received data."""
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(1)
+        received = []
+        def accept():
+            conn, address = server.accept()
+            received.append(conn.makefile().readline())
+            conn.sendall(response)
+            conn.close()
+            server.close()
+        thread = threading.Thread(target=accept)
+        thread.start()
+        return thread, received
+
+    def test_socket_path(self):
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        os.environ['XDG_RUNTIME_DIR'] = '/run/user/1000'
+        try:
+            self.assertEqual(client.socket_path(), '/run/user/1000/pywo.sock')
+        finally:
+            if runtime_dir is None:
+                del os.environ['XDG_RUNTIME_DIR']
+            else:
+                os.environ['XDG_RUNTIME_DIR'] = runtime_dir
+
+    def test_can_forward(self):
+        self.assertTrue(client.can_forward(['grid', 'top', '-g', 'top']))
+        self.assertTrue(client.can_forward(['put', '--position=top']))
+        self.assertFalse(client.can_forward([]))
+        self.assertFalse(client.can_forward(['--daemon']))
+        self.assertFalse(client.can_forward(['grid', 'top', '--debug']))
+        self.assertFalse(client.can_forward(['grid', '--config=pyworc']))
+
+    def test_can_forward__abbreviations(self):
+        # -h is --height, not --help
+        self.assertTrue(client.can_forward(['put', '-h', 'HALF']))
+        self.assertTrue(client.can_forward(['put', '--hei', 'HALF']))
+        self.assertFalse(client.can_forward(['grid', 'top', '--deb']))
+        self.assertFalse(client.can_forward(['grid', '--conf=pyworc']))
+        self.assertFalse(client.can_forward(['--win']))
+        self.assertFalse(client.can_forward(['--he']))
+        self.assertTrue(client.can_forward(['activate', '--', '--win']))
+
+    def test_can_forward__local_actions(self):
+        self.assertFalse(client.can_forward(['debug']))
+        self.assertTrue(client.can_forward(['stats']))
+
+    def test_forward(self):
+        thread, received = self.serve('[0, "", ""]')
+        self.assertEqual(client.forward(['grid', 'top'], self.path),
+                         (0, '', ''))
+        thread.join()
+        self.assertEqual(received, ['["grid", "top"]\n'])
+
+    def test_forward__output(self):
+        thread, received = self.serve('[0, "", "-= Latency =-"]')
+        self.assertEqual(client.forward(['stats'], self.path),
+                         (0, '', '-= Latency =-'))
+        thread.join()
+
+    def test_forward__no_output(self):
+        # older daemon
+        thread, received = self.serve('[0, ""]')
+        self.assertEqual(client.forward(['grid', 'top'], self.path),
+                         (0, '', ''))
+        thread.join()
+
+    def test_forward__error(self):
+        thread, received = self.serve('[2, "Invalid ACTION name: foo"]')
+        self.assertEqual(client.forward(['foo'], self.path), 
+                         (2, 'Invalid ACTION name: foo', ''))
+        thread.join()
+
+    def test_forward__no_daemon(self):
+        self.assertEqual(client.forward(['grid', 'top'], self.path), None)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [ClientTests]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
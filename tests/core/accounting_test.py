@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import accounting
+
+
+class Request(object):
+
+    def __init__(self, size):
+        self._binary = 'x' * size
+
+
+class GetProperty(Request):
+    pass
+
+
+class ConfigureWindow(Request):
+    pass
+
+
+class ProtocolDisplay(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def send_request(self, request, wait_for_response):
+        self.sent.append(request)
+
+    def send_and_recv(self, flush=False, event=False, request=None,
+                      recv=False):
+        pass
+
+
+class Display(object):
+
+    def __init__(self):
+        self.display = ProtocolDisplay()
+
+
+class AccountingTests(unittest.TestCase):
+
+    def setUp(self):
+        accounting.reset()
+        self.display = Display()
+        accounting.install(self.display)
+        self.protocol = self.display.display
+
+    def test_install(self):
+        send_request = self.protocol.send_request
+        accounting.install(self.display)
+        self.assertEqual(self.protocol.send_request, send_request)
+        request = GetProperty(8)
+        self.protocol.send_request(request, True)
+        self.assertEqual(self.protocol.sent, [request])
+
+    def test_other(self):
+        self.protocol.send_request(GetProperty(8), True)
+        self.protocol.send_and_recv(request=1)
+        self.protocol.send_request(ConfigureWindow(12), False)
+        stats = accounting.stats()
+        for name in [accounting.TOTAL, accounting.OTHER]:
+            self.assertEqual(stats[name].requests,
+                             {'GetProperty': 1, 'ConfigureWindow': 1})
+            self.assertEqual(stats[name].total_requests, 2)
+            self.assertEqual(stats[name].round_trips, 1)
+            self.assertEqual(stats[name].bytes, 20)
+
+    def test_scope(self):
+        accounting.begin('action:test')
+        self.protocol.send_request(GetProperty(8), True)
+        self.protocol.send_and_recv(request=1)
+        counters = accounting.end()
+        self.assertEqual(counters.name, 'action:test')
+        self.assertEqual(counters.calls, 1)
+        self.assertEqual(counters.round_trips, 1)
+        self.assertTrue(counters.time >= 0)
+        accounting.begin('action:test')
+        accounting.end()
+        stats = accounting.stats()
+        self.assertEqual(stats['action:test'].calls, 2)
+        self.assertEqual(stats['action:test'].round_trips, 1)
+        self.assertFalse(accounting.OTHER in stats)
+        self.assertEqual(stats[accounting.TOTAL].round_trips, 1)
+
+    def test_round_trips(self):
+        # request with onerror handler is sent with wait_for_response
+        self.protocol.send_request(ConfigureWindow(12), True)
+        self.protocol.send_and_recv(flush=True)
+        self.protocol.send_and_recv(event=True)
+        stats = accounting.stats()
+        self.assertEqual(stats[accounting.TOTAL].total_requests, 1)
+        self.assertEqual(stats[accounting.TOTAL].round_trips, 0)
+        self.protocol.send_request(GetProperty(8), True)
+        self.protocol.send_and_recv(request=2)
+        stats = accounting.stats()
+        self.assertEqual(stats[accounting.TOTAL].total_requests, 2)
+        self.assertEqual(stats[accounting.TOTAL].round_trips, 1)
+
+    def test_nested_scopes(self):
+        accounting.begin('event:handler')
+        self.protocol.send_request(GetProperty(8), True)
+        accounting.begin('action:test')
+        self.protocol.send_request(ConfigureWindow(12), False)
+        action = accounting.end()
+        event = accounting.end()
+        self.assertEqual(action.requests, {'ConfigureWindow': 1})
+        self.assertEqual(event.requests,
+                         {'GetProperty': 1, 'ConfigureWindow': 1})
+        self.assertEqual(accounting.stats()[accounting.TOTAL].bytes, 20)
+
+    def test_reset(self):
+        self.protocol.send_request(GetProperty(8), True)
+        accounting.reset()
+        self.assertEqual(accounting.stats(), {})
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [AccountingTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
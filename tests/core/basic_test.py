@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import random
 import unittest
 
 import sys
@@ -7,6 +8,7 @@ sys.path.insert(0, '../')
 sys.path.insert(0, './')
 
 from pywo.core import Gravity, Size, Position, Geometry, Extents
+from pywo.core import Region
 
 
 class SizeTests(unittest.TestCase):
@@ -39,6 +41,30 @@ class SizeTests(unittest.TestCase):
         self.assertEqual(Size.parse_value(' '), None)
         self.assertRaises(ValueError, Size.parse_value, 'fasdfa')
 
+    def test_parse_value__exact(self):
+        self.assertEqual(Size.parse_value('THIRD*3'), 1.0)
+        self.assertEqual(Size.parse_value('T+T+T'), 1.0)
+        self.assertEqual(Size.parse_value('1/3'), 1.0/3)
+        self.assertEqual(Size.parse_value('0.1*3'), 0.3)
+
+    def test_parse_value__parentheses(self):
+        self.assertEqual(Size.parse_value('(H+Q)*2'), 1.5)
+        self.assertEqual(Size.parse_value('-(H+Q)*2'), -1.5)
+        self.assertEqual(Size.parse_value('2*(1-(H+Q))'), 0.5)
+
+    def test_parse_value__invalid(self):
+        self.assertRaises(ValueError, Size.parse_value, '1/0')
+        self.assertRaises(ValueError, Size.parse_value, 'H+')
+        self.assertRaises(ValueError, Size.parse_value, '(H')
+        self.assertRaises(ValueError, Size.parse_value, 'H)')
+        self.assertRaises(ValueError, Size.parse_value, '__import__')
+        self.assertEqual(Size.parse_value('HALF, 1+'), 0.5)
+
+    def test_parse_value__cached(self):
+        widths = Size.parse_value('HALF, FULL')
+        widths.reverse()
+        self.assertEqual(Size.parse_value('HALF, FULL'), [0.5, 1])
+
     def test_parse(self):
         self.assertEqual(Size.parse('', ''), None)
         self.assertEqual(Size.parse('', 'FULL'), None)
@@ -221,6 +247,13 @@ class GravityTests(unittest.TestCase):
         self.assertRaises(ValueError, Gravity.parse, '1.0')
         self.assertRaises(ValueError, Gravity.parse, '1,2,3')
 
+    def test_parse__cached(self):
+        gravity = Gravity.parse('0.5, 1/3')
+        self.assertEqual(Gravity.parse('0.5, 1/3'), gravity)
+        # NOTE: new object is returned every time
+        self.assertFalse(Gravity.parse('0.5, 1/3') is gravity)
+        self.assertRaises(ValueError, Gravity.parse, '1,2,3')
+
 
 class GeometryTests(unittest.TestCase):
     
@@ -328,13 +361,97 @@ class ExtentsTests(unittest.TestCase):
         self.assertEqual(extents.vertical, 30)
 
 
+def pixels(geometries):
+    return set([(x, y) for geometry in geometries
+                       for x in range(geometry.x, geometry.x2)
+                       for y in range(geometry.y, geometry.y2)])
+
+
+class RegionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.region = Region([Geometry(0, 0, 20, 10),
+                              Geometry(10, 5, 20, 10)])
+
+    def test_bands(self):
+        self.assertEqual(self.region.bands, [(0, 5, (0, 20)),
+                                             (5, 10, (0, 30)),
+                                             (10, 15, (10, 30))])
+        self.assertEqual(Region(Geometry(0, 0, 10, 10)) |
+                         Geometry(0, 10, 10, 10),
+                         Geometry(0, 0, 10, 20))
+        self.assertEqual(Region(Geometry(0, 0, 10, 10)).bands,
+                         [(0, 10, (0, 10))])
+        self.assertEqual(Region().bands, [])
+        self.assertFalse(Region(Geometry(0, 0, 0, 10)))
+
+    def test_operations(self):
+        self.assertEqual(self.region.area, 200 + 200 - 50)
+        self.assertEqual((self.region & Geometry(10, 5, 10, 5)).area, 50)
+        self.assertEqual((self.region - Geometry(10, 5, 10, 5)).area, 300)
+        self.assertEqual(self.region - self.region, Region())
+        self.assertEqual(self.region & Geometry(100, 100, 10, 10), Region())
+        self.assertEqual(self.region.extents, Geometry(0, 0, 30, 15))
+        self.assertEqual(Region().extents, None)
+
+    def test_eq(self):
+        self.assertFalse(Region() == None)
+        self.assertTrue(Region() != None)
+        self.assertFalse(self.region == 'region')
+        self.assertNotEqual(self.region, Region())
+        self.assertEqual(Region(Geometry(0, 0, 10, 10)),
+                         Geometry(0, 0, 10, 10))
+
+    def test_contains(self):
+        self.assertTrue(self.region.contains(Position(0, 0)))
+        self.assertTrue(self.region.contains(Position(29, 14)))
+        self.assertFalse(self.region.contains(Position(0, 10)))
+        self.assertFalse(self.region.contains(Position(20, 0)))
+        self.assertTrue(self.region.contains(Geometry(5, 5, 20, 5)))
+        self.assertFalse(self.region.contains(Geometry(5, 5, 20, 6)))
+        self.assertTrue(self.region.contains(Region()))
+
+    def test_rectangles(self):
+        self.assertEqual(self.region.rectangles(),
+                         [Geometry(0, 0, 20, 5),
+                          Geometry(0, 5, 30, 5),
+                          Geometry(10, 10, 20, 5)])
+        self.assertEqual(list(self.region), self.region.rectangles())
+
+    def test_same_as_pixels(self):
+        generator = random.Random(1)
+        for test in range(20):
+            geometries = [[Geometry(generator.randint(0, 30),
+                                    generator.randint(0, 30),
+                                    generator.randint(0, 15),
+                                    generator.randint(0, 15))
+                           for index in range(generator.randint(0, 6))]
+                          for region in range(2)]
+            region = Region(geometries[0])
+            other = Region(geometries[1])
+            region_pixels = pixels(geometries[0])
+            other_pixels = pixels(geometries[1])
+            self.assertEqual(pixels(region), region_pixels)
+            self.assertEqual(pixels(region | other),
+                             region_pixels | other_pixels)
+            self.assertEqual(pixels(region - other),
+                             region_pixels - other_pixels)
+            self.assertEqual(pixels(region & other),
+                             region_pixels & other_pixels)
+            self.assertEqual((region | other).area,
+                             len(region_pixels | other_pixels))
+            # canonical form - same area, same bands
+            self.assertEqual(region | other, (region - other) | other)
+
+
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
     for suite in [SizeTests, 
                   PostionTests, 
                   GravityTests, 
                   GeometryTests, 
-                  ExtentsTests]:
+                  ExtentsTests,
+                  RegionTests]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
 
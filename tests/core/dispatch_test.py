@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import timing
+from pywo.core.dispatch import EventDispatcher
+from pywo.core.events import EventHandler
+
+
+CREATE, DESTROY, MAPPING = 16, 17, 34
+
+
+class FakeWindow(object):
+
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeDisplay(object):
+
+    class Screen(object):
+        root = FakeWindow(1)
+
+    def screen(self):
+        return self.Screen()
+
+
+class FakeEvent(object):
+
+    def __init__(self, type, **kwargs):
+        self.type = type
+        for name, win_id in kwargs.items():
+            setattr(self, name, FakeWindow(win_id))
+
+
+class FakeHandler(object):
+
+    masks = []
+
+    def __init__(self, *types, **kwargs):
+        self.types = types
+        self.events = []
+        self.callback = kwargs.get('callback', 'FakeHandler')
+
+    def name(self, event_type):
+        return self.callback
+
+    def handle_event(self, event):
+        self.events.append(event)
+
+
+class Callbacks(object):
+
+    def mapping(self, event):
+        pass
+
+
+def mapping(event):
+    pass
+
+
+class DispatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = EventDispatcher(FakeDisplay())
+        # NOTE: don't start dispatcher thread
+        self.dispatcher.isAlive = lambda: True
+        self.dispatch = self.dispatcher._EventDispatcher__dispatch
+
+    def test_reported_on_window(self):
+        root_handler = FakeHandler(CREATE, DESTROY)
+        window_handler = FakeHandler(DESTROY)
+        self.dispatcher.register(FakeWindow(1), root_handler)
+        self.dispatcher.register(FakeWindow(2), window_handler)
+        self.dispatch(FakeEvent(CREATE, parent=1, window=2))
+        self.dispatch(FakeEvent(DESTROY, event=2, window=2))
+        self.dispatch(FakeEvent(DESTROY, event=1, window=2))
+        self.assertEqual([event.type for event in root_handler.events],
+                         [CREATE, DESTROY])
+        self.assertEqual([event.type for event in window_handler.events],
+                         [DESTROY])
+
+    def test_not_registered(self):
+        handler = FakeHandler(DESTROY)
+        self.dispatcher.register(FakeWindow(2), handler)
+        self.dispatch(FakeEvent(DESTROY, event=3, window=2))
+        self.assertEqual(handler.events, [])
+
+    def test_no_window(self):
+        handler = FakeHandler(MAPPING)
+        self.dispatcher.register(FakeWindow(1), handler)
+        self.dispatch(FakeEvent(MAPPING))
+        self.assertEqual(len(handler.events), 1)
+
+    def test_timing_per_callback(self):
+        timing.reset()
+        self.dispatcher.register(FakeWindow(1),
+                                 FakeHandler(MAPPING, callback='first'))
+        self.dispatcher.register(FakeWindow(1),
+                                 FakeHandler(MAPPING, callback='second'))
+        self.dispatch(FakeEvent(MAPPING))
+        self.assertEqual([histogram.scope for histogram in timing.stats()],
+                         ['event:first', 'event:second'])
+        timing.reset()
+
+
+class EventHandlerTests(unittest.TestCase):
+
+    def test_name__method(self):
+        handler = EventHandler([], {}, {MAPPING: Callbacks().mapping})
+        self.assertEqual(handler.name(MAPPING),
+                         '%s.Callbacks.mapping' % __name__)
+
+    def test_name__function(self):
+        handler = EventHandler([], {}, {MAPPING: mapping})
+        self.assertEqual(handler.name(MAPPING), '%s.mapping' % __name__)
+
+    def test_name__no_callback(self):
+        handler = EventHandler([], {}, {MAPPING: None})
+        self.assertEqual(handler.name(MAPPING), 'EventHandler')
+        self.assertEqual(handler.name(CREATE), 'EventHandler')
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [DispatchTests, EventHandlerTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
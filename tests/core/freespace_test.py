@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+import random
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core.basic import Geometry, Position
+from pywo.core import freespace
+
+
+def as_tuples(geometries):
+    return sorted([(geometry.x, geometry.y, geometry.width, geometry.height)
+                   for geometry in geometries])
+
+
+def brute_force(workarea, occupied):
+    """Return all maximal empty rectangles with edges on known coordinates."""
+    xs = sorted(set([workarea.x, workarea.x2] +
+                    [g.x for g in occupied] + [g.x2 for g in occupied]))
+    ys = sorted(set([workarea.y, workarea.y2] +
+                    [g.y for g in occupied] + [g.y2 for g in occupied]))
+    xs = [x for x in xs if workarea.x <= x <= workarea.x2]
+    ys = [y for y in ys if workarea.y <= y <= workarea.y2]
+
+    def empty(x, y, x2, y2):
+        for g in occupied:
+            if g.x < x2 and x < g.x2 and g.y < y2 and y < g.y2:
+                return False
+        return True
+
+    rects = [(x, y, x2, y2) for x in xs for x2 in xs if x < x2
+                            for y in ys for y2 in ys if y < y2
+                            if empty(x, y, x2, y2)]
+    maximal = [rect for rect in rects
+                    if not [other for other in rects
+                                  if other != rect and
+                                     other[0] <= rect[0] and
+                                     other[1] <= rect[1] and
+                                     other[2] >= rect[2] and
+                                     other[3] >= rect[3]]]
+    return sorted([(x, y, x2 - x, y2 - y) for x, y, x2, y2 in maximal])
+
+
+class FreeRectanglesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workarea = Geometry(0, 0, 100, 100)
+
+    def test_empty(self):
+        free = freespace.free_rectangles(self.workarea, [])
+        self.assertEqual(as_tuples(free), [(0, 0, 100, 100)])
+
+    def test_full(self):
+        free = freespace.free_rectangles(self.workarea,
+                                         [Geometry(-10, -10, 200, 200)])
+        self.assertEqual(free, [])
+
+    def test_center(self):
+        free = freespace.free_rectangles(self.workarea,
+                                         [Geometry(25, 25, 50, 50)])
+        self.assertEqual(as_tuples(free), [(0, 0, 25, 100),
+                                           (0, 0, 100, 25),
+                                           (0, 75, 100, 25),
+                                           (75, 0, 25, 100)])
+
+    def test_brute_force(self):
+        generator = random.Random(1)
+        for test in range(10):
+            occupied = [Geometry(generator.randint(-10, 90),
+                                 generator.randint(-10, 90),
+                                 generator.randint(5, 40),
+                                 generator.randint(5, 40))
+                        for index in range(generator.randint(1, 6))]
+            free = freespace.free_rectangles(self.workarea, occupied)
+            self.assertEqual(as_tuples(free),
+                             brute_force(self.workarea, occupied))
+
+
+class QueriesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workarea = Geometry(0, 0, 100, 100)
+        self.occupied = [Geometry(0, 0, 60, 50), Geometry(60, 60, 40, 40)]
+        self.free = freespace.free_rectangles(self.workarea, self.occupied)
+
+    def test_largest(self):
+        self.assertEqual(freespace.largest(self.free),
+                         Geometry(0, 50, 60, 50))
+        self.assertEqual(freespace.largest(self.free,
+                                           Geometry(80, 10, 10, 10)),
+                         Geometry(60, 0, 40, 60))
+        self.assertEqual(freespace.largest([]), None)
+
+    def test_place(self):
+        self.assertEqual(freespace.place(self.workarea, self.occupied,
+                                         30, 30),
+                         Geometry(0, 50, 30, 30))
+        self.assertEqual(freespace.place(self.workarea, self.occupied,
+                                         30, 30, Position(10, 90)),
+                         Geometry(10, 70, 30, 30))
+        self.assertEqual(freespace.place(self.workarea, self.occupied,
+                                         70, 70), None)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [FreeRectanglesTests,
+                  QueriesTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
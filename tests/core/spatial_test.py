@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+import random
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core.basic import Geometry, Gravity
+from pywo.core.spatial import SpatialIndex
+
+
+LEFT = Gravity.parse('LEFT')
+RIGHT = Gravity.parse('RIGHT')
+TOP = Gravity.parse('TOP')
+BOTTOM = Gravity.parse('BOTTOM')
+
+
+class SpatialIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        # 1 | 2 | 3
+        # ---------
+        # 4 |   5
+        self.index = SpatialIndex({1: Geometry(0, 0, 100, 100),
+                                   2: Geometry(100, 0, 100, 100),
+                                   3: Geometry(200, 0, 100, 100),
+                                   4: Geometry(0, 100, 100, 100),
+                                   5: Geometry(100, 100, 200, 100), })
+
+    def test_nearest(self):
+        self.assertEqual(self.index.nearest(self.index.get(1), RIGHT), 2)
+        self.assertEqual(self.index.nearest(self.index.get(3), LEFT), 2)
+        self.assertEqual(self.index.nearest(self.index.get(1), BOTTOM), 4)
+        self.assertEqual(self.index.nearest(self.index.get(3), BOTTOM), 5)
+        self.assertEqual(self.index.nearest(self.index.get(4), TOP), 1)
+        self.assertTrue(self.index.nearest(self.index.get(5), TOP) in [2, 3])
+        self.assertEqual(self.index.nearest(self.index.get(4), RIGHT), 5)
+        self.assertEqual(self.index.nearest(self.index.get(1), LEFT), None)
+        self.assertEqual(self.index.nearest(self.index.get(1), TOP), None)
+
+    def test_prefer_overlapping(self):
+        # 6 is closer, but doesn't overlap vertically
+        self.index.insert(6, Geometry(150, 250, 50, 50))
+        self.assertEqual(self.index.nearest(self.index.get(4), RIGHT), 5)
+
+    def test_exclude(self):
+        geometry = Geometry(0, 0, 150, 100)
+        self.assertEqual(self.index.nearest(geometry, RIGHT), 2)
+        self.assertEqual(self.index.nearest(geometry, RIGHT, exclude=2), 3)
+
+    def test_update(self):
+        self.index.insert(2, Geometry(0, 300, 100, 100))
+        self.assertEqual(self.index.nearest(self.index.get(1), RIGHT), 3)
+        self.index.remove(3)
+        self.index.remove(3)
+        self.assertEqual(self.index.nearest(self.index.get(1), RIGHT), 5)
+        self.assertEqual(len(self.index), 4)
+        self.assertFalse(3 in self.index)
+
+    def test_invalid_direction(self):
+        self.assertRaises(ValueError, self.index.nearest,
+                          self.index.get(1), Gravity.parse('MIDDLE'))
+        self.assertRaises(ValueError, self.index.nearest,
+                          self.index.get(1), Gravity.parse('TOP_LEFT'))
+
+    def test_same_as_linear_scan(self):
+        generator = random.Random(1)
+        geometries = dict([(key, Geometry(generator.randint(0, 1000),
+                                          generator.randint(0, 1000),
+                                          generator.randint(10, 300),
+                                          generator.randint(10, 300)))
+                           for key in range(200)])
+        index = SpatialIndex(geometries)
+        for key, geometry in geometries.items():
+            center = geometry.x + geometry.x2
+            scores = []
+            for other_key, other in geometries.items():
+                other_center = other.x + other.x2
+                if other_center <= center:
+                    continue
+                gap = max(other.y - geometry.y2, geometry.y - other.y2)
+                offset = abs(other.y + other.y2 - geometry.y - geometry.y2)
+                scores.append(((gap >= 0,
+                                other_center - center + 4 * max(gap, 0),
+                                offset),
+                               other_key))
+            expected = scores and min(scores)[0] or None
+            found = index.nearest(geometry, RIGHT, exclude=key)
+            found_score = [score for score, other_key in scores
+                                 if other_key == found]
+            self.assertEqual(found_score and found_score[0] or None,
+                             expected)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [SpatialIndexTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
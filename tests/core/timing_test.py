@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import timing
+
+
+class HistogramTests(unittest.TestCase):
+
+    def test_add(self):
+        histogram = timing.Histogram('action:put', 'total')
+        for duration in [0.1, 1.5, 3, 3, 7000]:
+            histogram.add(duration)
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[2], 1)
+        self.assertEqual(histogram.counts[3], 2)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.max, 7000)
+        self.assertAlmostEqual(histogram.sum, 7007.6)
+
+    def test_percentile(self):
+        histogram = timing.Histogram('action:put', 'total')
+        self.assertEqual(histogram.percentile(50), 0)
+        for duration in range(1, 101):
+            histogram.add(duration / 10.0)
+        self.assertTrue(4.5 <= histogram.percentile(50) <= 5.5)
+        self.assertTrue(5 <= histogram.percentile(95) <= 10)
+        self.assertTrue(histogram.percentile(99) <= histogram.max)
+        self.assertEqual(histogram.percentile(100), 10)
+
+    def test_percentile_inf(self):
+        histogram = timing.Histogram('action:put', 'total')
+        histogram.add(6000)
+        histogram.add(8000)
+        self.assertTrue(5000 <= histogram.percentile(50) <= 8000)
+        self.assertEqual(histogram.percentile(100), 8000)
+
+
+class TimingTests(unittest.TestCase):
+
+    def setUp(self):
+        timing.reset()
+
+    def test_record(self):
+        timing.record('action:put', 'perform', 0.002)
+        timing.record('action:put', 'total', 0.003)
+        timing.record('action:put', 'total', 0.004)
+        stats = timing.stats()
+        self.assertEqual([(histogram.scope, histogram.phase, histogram.count)
+                          for histogram in stats],
+                         [('action:put', 'perform', 1),
+                          ('action:put', 'total', 2)])
+
+    def test_failure(self):
+        timing.failure('action:put')
+        timing.failure('action:put', exception=True)
+        timing.failure('action:put', exception=True)
+        histogram = timing.stats()[0]
+        self.assertEqual(histogram.phase, 'total')
+        self.assertEqual(histogram.failures, 1)
+        self.assertEqual(histogram.exceptions, 2)
+
+    def test_prometheus_text(self):
+        timing.record('action:put', 'total', 0.003)
+        timing.failure('action:put')
+        text = timing.prometheus_text()
+        self.assertTrue('pywo_duration_milliseconds_bucket'
+                        '{scope="action:put",phase="total",le="5"} 1' in text)
+        self.assertTrue('pywo_duration_milliseconds_bucket'
+                        '{scope="action:put",phase="total",le="+Inf"} 1'
+                        in text)
+        self.assertTrue('pywo_duration_milliseconds_count'
+                        '{scope="action:put",phase="total"} 1' in text)
+        self.assertTrue('pywo_failures_total{scope="action:put"} 1' in text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_dump(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'pywo.prom')
+            timing.record('action:put', 'total', 0.003)
+            self.assertEqual(timing.dump(path), path)
+            self.assertEqual(open(path).read(), timing.prometheus_text())
+            self.assertEqual(os.listdir(directory), ['pywo.prom'])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [HistogramTests,
+                  TimingTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
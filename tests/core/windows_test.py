@@ -14,6 +14,7 @@ from tests.common_test import DESKTOPS, DESKTOP_WIDTH, DESKTOP_HEIGHT, VIEWPORTS
 from tests.common_test import WIN_X, WIN_Y, WIN_WIDTH, WIN_HEIGHT
 from pywo.core import Window, WindowManager, State, Type
 from pywo.core import Position, Geometry, Layout
+from pywo.core.windows import WindowSnapshot
 from pywo.core.xlib import XObject
 
 
@@ -597,12 +598,38 @@ class WindowTests_state(MockedXlibTests):
         # Test both - with, and without full=True
 
 
+class Property(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+class WindowSnapshotTests(unittest.TestCase):
+
+    def test_properties(self):
+        properties = {'_NET_WM_NAME': None,
+                      'WM_NAME': Property('xterm'),
+                      'WM_CLASS': Property('xterm\0XTerm\0'),
+                      '_NET_WM_DESKTOP': Property([2]),
+                      '_NET_WM_WINDOW_TYPE': None,
+                      '_NET_WM_STATE': Property([1, 2]), }
+        win = WindowSnapshot(0x123, properties, Geometry(10, 20, 300, 200))
+        self.assertEqual(win.name, 'xterm')
+        self.assertEqual(win.class_name, 'xterm.XTerm')
+        self.assertEqual(win.desktop, 2)
+        self.assertEqual(win.state, (1, 2))
+        self.assertEqual(win.geometry, Geometry(10, 20, 300, 200))
+        win.geometry.set_position(0, 0)
+        self.assertEqual(win.geometry, Geometry(10, 20, 300, 200))
+
+
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
     for suite in [WindowManagerTests, 
                   WindowManagerTests_name_matcher, 
                   WindowTests_properties, 
-                  WindowTests_state, ]:
+                  WindowTests_state,
+                  WindowSnapshotTests, ]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import world
+
+
+class Property(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Root(object):
+
+    """Root window with properties stored in dict."""
+
+    listeners = []
+
+    def __init__(self):
+        self.properties = {}
+        self.handlers = []
+
+    def atom(self, name):
+        return 'atom:%s' % name
+
+    def register(self, handler):
+        self.handlers.append(handler)
+
+    def unregister(self, handler):
+        self.handlers.remove(handler)
+
+    @staticmethod
+    def get_property(root, name):
+        return Property(root.properties.get(name))
+
+    @classmethod
+    def add_send_listener(cls, listener):
+        cls.listeners.append(listener)
+
+    @classmethod
+    def remove_send_listener(cls, listener):
+        cls.listeners.remove(listener)
+
+    def send(self, name):
+        for listener in self.listeners:
+            listener(self.atom(name))
+
+
+class Event(object):
+
+    def __init__(self, atom):
+        self.atom = atom
+
+
+class WorldModelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.xobject = world.XObject
+        world.XObject = Root
+        self.root = Root()
+        self.root.properties['_NET_CURRENT_DESKTOP'] = 0
+        self.world = world.WorldModel()
+        self.world.start(self.root)
+
+    def tearDown(self):
+        self.world.stop()
+        world.XObject = self.xobject
+
+    def notify(self, name):
+        for handler in self.root.handlers:
+            handler.property(Event(self.root.atom(name)))
+
+    def test_start(self):
+        self.assertTrue(self.world.tracks('_NET_CURRENT_DESKTOP'))
+        self.assertEqual(
+                self.world.get_property('_NET_CURRENT_DESKTOP').value, 0)
+        self.assertFalse(self.world.tracks('_NET_WM_NAME'))
+
+    def test_property_changed(self):
+        self.root.properties['_NET_CURRENT_DESKTOP'] = 1
+        self.notify('_NET_CURRENT_DESKTOP')
+        self.assertEqual(
+                self.world.get_property('_NET_CURRENT_DESKTOP').value, 1)
+
+    def test_sent__stale(self):
+        self.root.send('_NET_CURRENT_DESKTOP')
+        self.assertFalse(self.world.tracks('_NET_CURRENT_DESKTOP'))
+        self.assertFalse(self.world.tracks('_NET_ACTIVE_WINDOW'))
+        self.assertTrue(self.world.tracks('_NET_WORKAREA'))
+        self.root.properties['_NET_CURRENT_DESKTOP'] = 1
+        self.notify('_NET_CURRENT_DESKTOP')
+        self.assertTrue(self.world.tracks('_NET_CURRENT_DESKTOP'))
+        self.assertEqual(
+                self.world.get_property('_NET_CURRENT_DESKTOP').value, 1)
+
+    def test_sent__timeout(self):
+        self.world.STALE_TIMEOUT = 0
+        self.root.send('_NET_CURRENT_DESKTOP')
+        self.assertTrue(self.world.tracks('_NET_CURRENT_DESKTOP'))
+
+    def test_sent__other_message(self):
+        self.root.send('_NET_WM_STATE')
+        self.assertTrue(self.world.tracks('_NET_CURRENT_DESKTOP'))
+        self.assertTrue(self.world.tracks('_NET_ACTIVE_WINDOW'))
+
+    def test_stop(self):
+        self.world.stop()
+        self.assertEqual(Root.listeners, [])
+        self.assertEqual(self.root.handlers, [])
+        self.assertFalse(self.world.tracks('_NET_CURRENT_DESKTOP'))
+        self.world.start(self.root)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [WorldModelTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
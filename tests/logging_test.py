@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+import logging
+import Queue
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import pywo
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class LazyValue(object):
+
+    formatted = 0
+
+    def __str__(self):
+        LazyValue.formatted += 1
+        return 'value'
+
+
+class QueueLoggingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.log = logging.getLogger('pywo.tests.queue')
+        self.log.propagate = False
+        self.queue = Queue.Queue()
+        self.queue_handler = pywo.QueueHandler(self.queue)
+        self.log.addHandler(self.queue_handler)
+        self.handler = ListHandler()
+        self.warnings = ListHandler(logging.WARNING)
+        self.listener = pywo.QueueListener(self.queue,
+                                           self.handler, self.warnings,
+                                           respect_handler_level=True)
+        self.listener.start()
+        pywo.set_log_level(logging.INFO, force=True)
+
+    def tearDown(self):
+        self.listener.stop()
+        self.log.removeHandler(self.queue_handler)
+        pywo.set_log_level(logging.NOTSET, force=True)
+
+    def test_listener(self):
+        self.log.info('Message %s %s', 1, [2])
+        self.log.warning('Warning')
+        self.listener.stop()
+        self.assertEqual([record.getMessage()
+                          for record in self.handler.records],
+                         ['Message 1 [2]', 'Warning'])
+        self.assertEqual([record.getMessage()
+                          for record in self.warnings.records],
+                         ['Warning'])
+
+    def test_exception(self):
+        try:
+            raise ValueError('error')
+        except ValueError:
+            self.log.exception('Failed')
+        self.listener.stop()
+        record = self.handler.records[0]
+        self.assertEqual(record.getMessage(), 'Failed')
+        self.assertTrue('ValueError' in record.exc_text)
+
+    def test_level(self):
+        LazyValue.formatted = 0
+        self.log.debug('Debug %s', LazyValue())
+        self.log.info('Info %s', LazyValue())
+        self.listener.stop()
+        self.assertEqual(LazyValue.formatted, 1)
+        self.assertEqual(len(self.handler.records), 1)
+
+    def test_set_log_level(self):
+        pywo_log = logging.getLogger('pywo')
+        pywo.set_log_level('warning', force=False)
+        self.assertEqual(pywo_log.level, logging.INFO)
+        pywo.set_log_level('warning', force=True)
+        self.assertEqual(pywo_log.level, logging.WARNING)
+        self.assertRaises(ValueError, pywo.set_log_level, 'invalid', True)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [QueueLoggingTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
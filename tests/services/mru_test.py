@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.services.mru_service import MRUList
+
+
+class MRUListTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mru = MRUList(size=4)
+
+    def test_activated(self):
+        for win_id in [1, 2, 3, 2]:
+            self.mru.activated(win_id)
+        self.assertEqual(self.mru.ids(), [2, 3, 1])
+        self.assertEqual(self.mru.get(0), 2)
+        self.assertEqual(self.mru.get(1), 3)
+        self.assertEqual(self.mru.get(3), None)
+
+    def test_size(self):
+        for win_id in range(10):
+            self.mru.activated(win_id)
+        self.assertEqual(self.mru.ids(), [9, 8, 7, 6])
+        self.assertEqual(len(self.mru), 4)
+
+    def test_prune(self):
+        for win_id in [1, 2, 3]:
+            self.mru.activated(win_id)
+        self.mru.prune([1, 3, 5])
+        self.assertEqual(self.mru.ids(), [3, 1])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [MRUListTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
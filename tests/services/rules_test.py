@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core import WindowType, Geometry
+from pywo.services import rules_service
+from pywo.services.rules_service import Rule, Rules, PlacedWindow
+
+
+class FakeWindow(object):
+
+    def __init__(self, classes, name=u'', role=u'',
+                 type=(WindowType.NORMAL, )):
+        self.classes = classes
+        self.name = name
+        self.role = role
+        self.type = type
+
+
+class RuleTests(unittest.TestCase):
+
+    def test_options(self):
+        rule = Rule('term', {'class': 'XTerm, urxvt', 'desktop': '2',
+                             'state': 'sticky, above', 'section': 'left'})
+        self.assertEqual(rule.classes, ['xterm', 'urxvt'])
+        self.assertEqual(rule.desktop, 2)
+        self.assertEqual(rule.monitor, None)
+        self.assertEqual(rule.states, ['sticky', 'above'])
+        self.assertEqual(rule.section, 'left')
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, Rule, 'a', {'unknown': 'x'})
+        self.assertRaises(ValueError, Rule, 'a', {'name': '('})
+        self.assertRaises(ValueError, Rule, 'a', {'type': 'invalid'})
+        self.assertRaises(ValueError, Rule, 'a', {'state': 'invalid'})
+        self.assertRaises(ValueError, Rule, 'a', {'desktop': 'x'})
+
+    def test_matches(self):
+        rule = Rule('a', {'name': '^vim', 'role': 'main',
+                          'type': 'normal'})
+        self.assertTrue(rule.matches(FakeWindow([], u'vim foo', u'main')))
+        self.assertFalse(rule.matches(FakeWindow([], u'foo vim', u'main')))
+        self.assertFalse(rule.matches(FakeWindow([], u'vim', u'other')))
+        self.assertFalse(rule.matches(FakeWindow([], u'vim', u'main',
+                                                 (WindowType.DIALOG, ))))
+
+
+class RulesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = Rules([Rule('c-term', {'class': 'xterm'}),
+                            Rule('b-vim', {'class': 'xterm, gvim',
+                                           'name': 'vim'}),
+                            Rule('z-dialogs', {'type': 'dialog'}),
+                            Rule('a-gimp', {'class': 'gimp'}), ])
+
+    def test_find(self):
+        find = lambda *args: getattr(self.rules.find(FakeWindow(*args)),
+                                     'name', None)
+        self.assertEqual(find(['xterm', 'xterm'], u'vim'), 'b-vim')
+        self.assertEqual(find(['xterm', 'xterm'], u'bash'), 'c-term')
+        self.assertEqual(find(['gvim'], u'bash'), None)
+        self.assertEqual(find(['firefox'], u'', u'',
+                              (WindowType.DIALOG, )), 'z-dialogs')
+        self.assertEqual(len(self.rules), 4)
+
+    def test_only_class_bucket_checked(self):
+        checked = []
+        class Window(object):
+            classes = ['firefox']
+            role = u''
+            type = (WindowType.NORMAL, )
+            @property
+            def name(self):
+                checked.append('name')
+                return u'vim'
+        self.assertEqual(self.rules.find(Window()), None)
+        self.assertEqual(checked, [])
+
+
+class PlacedWindowTests(unittest.TestCase):
+
+    def test_geometry(self):
+        window = PlacedWindow(0x123, Geometry(10, 20, 300, 200))
+        geometry = window.geometry
+        self.assertEqual(geometry, Geometry(10, 20, 300, 200))
+        geometry.set_position(0, 0)
+        self.assertEqual(window.geometry, Geometry(10, 20, 300, 200))
+
+
+class Client(object):
+
+    """Window created by client, with map state (None if destroyed)."""
+
+    mapped_states = {}
+    handlers = {}
+
+    def __init__(self, id):
+        self.id = id
+
+    @property
+    def mapped(self):
+        return self.mapped_states.get(self.id)
+
+    def register(self, handler):
+        self.handlers.setdefault(self.id, set()).add(handler)
+
+    def unregister(self, handler):
+        self.handlers.get(self.id, set()).discard(handler)
+
+
+class CreateEvent(object):
+
+    def __init__(self, window_id, override=False):
+        self.window_id = window_id
+        self.override = override
+
+
+class FakeRules(object):
+
+    def __init__(self):
+        self.found = []
+
+    def __len__(self):
+        return 1
+
+    def find(self, properties):
+        self.found.append(properties.window.id)
+
+
+class NewWindowsHandlerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.window = rules_service.Window
+        self.rules = rules_service.RULES
+        rules_service.Window = Client
+        rules_service.RULES = FakeRules()
+        Client.mapped_states.clear()
+        Client.handlers.clear()
+        self.handler = rules_service.NewWindowsHandler()
+
+    def tearDown(self):
+        rules_service.Window = self.window
+        rules_service.RULES = self.rules
+
+    def created(self, window_id, override=False):
+        self.handler._NewWindowsHandler__created(
+                CreateEvent(window_id, override))
+
+    def test_created__not_mapped(self):
+        Client.mapped_states[1] = False
+        self.created(1)
+        self.assertEqual(self.handler.pending, set([1]))
+        self.assertEqual(len(Client.handlers[1]), 2)
+        self.assertEqual(rules_service.RULES.found, [])
+
+    def test_created__mapped(self):
+        Client.mapped_states[1] = True
+        self.created(1)
+        self.assertEqual(self.handler.pending, set())
+        self.assertEqual(Client.handlers[1], set())
+        self.assertEqual(rules_service.RULES.found, [1])
+
+    def test_created__override(self):
+        Client.mapped_states[1] = True
+        self.created(1, override=True)
+        self.assertEqual(self.handler.pending, set())
+        self.assertEqual(Client.handlers, {})
+        self.assertEqual(rules_service.RULES.found, [])
+
+    def test_created__destroyed(self):
+        self.created(1)
+        self.assertEqual(self.handler.pending, set())
+        self.assertEqual(Client.handlers[1], set())
+        self.assertEqual(rules_service.RULES.found, [])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [RuleTests,
+                  RulesTests,
+                  PlacedWindowTests,
+                  NewWindowsHandlerTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+
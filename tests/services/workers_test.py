@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import unittest
+
+import threading
+import time
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.services.workers import OrderedWorkers
+
+
+class OrderedWorkersTests(unittest.TestCase):
+
+    def setUp(self):
+        self.workers = OrderedWorkers('Test Worker', size=4)
+        self.workers.start()
+        self.performed = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.workers.stop()
+
+    def task(self, key, number, delay=0):
+        time.sleep(delay)
+        self.lock.acquire()
+        try:
+            self.performed.append((key, number))
+        finally:
+            self.lock.release()
+
+    def wait(self, count, timeout=5):
+        end = time.time() + timeout
+        while len(self.performed) < count and time.time() < end:
+            time.sleep(0.01)
+
+    def test_submit(self):
+        self.workers.submit(1, self.task, 1, 1)
+        self.wait(1)
+        self.assertEqual(self.performed, [(1, 1)])
+
+    def test_submit__same_key_ordered(self):
+        for number in range(20):
+            self.workers.submit('key', self.task, 'key', number, 
+                                delay=0.01 * (number % 3))
+        self.wait(20)
+        self.assertEqual(self.performed, 
+                         [('key', number) for number in range(20)])
+
+    def test_submit__different_keys_concurrent(self):
+        start = time.time()
+        for key in range(4):
+            self.workers.submit(key, self.task, key, 0, delay=0.2)
+        self.wait(4)
+        self.assertEqual(len(self.performed), 4)
+        self.assertTrue(time.time() - start < 0.6)
+
+    def test_submit__exception(self):
+        def fail():
+            raise ValueError()
+        self.workers.submit('key', fail)
+        self.workers.submit('key', self.task, 'key', 1)
+        self.wait(1)
+        self.assertEqual(self.performed, [('key', 1)])
+
+    def test_stop__restart(self):
+        event = threading.Event()
+        self.workers.submit('key', event.wait, 5)
+        self.workers.submit('key', self.task, 'key', 0)
+        time.sleep(0.1)
+        stopper = threading.Thread(target=self.workers.stop)
+        stopper.start()
+        time.sleep(0.1)
+        # NOTE: new task is submitted while old one is still performed
+        self.workers.submit('key', self.task, 'key', 1)
+        event.set()
+        stopper.join()
+        time.sleep(0.1)
+        self.workers.start()
+        self.wait(1)
+        time.sleep(0.1)
+        self.assertEqual(self.performed, [('key', 1)])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [OrderedWorkersTests]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
+